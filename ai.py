@@ -0,0 +1,179 @@
+"""
+Стратегии компьютера без привязки к интерфейсу.
+
+Каждая стратегия получает engine.Board и генератор случайных чисел и возвращает
+номер клетки для ходящего игрока. Ими пользуются оба окна игры и безголовый
+симулятор партий.
+"""
+
+import random
+import time
+
+import book
+
+AI_TIME_LIMIT = 0.2  # Бюджет сложного ИИ на ход для больших полей, секунды
+DEFAULT_STRENGTH = 0.5  # Сила настраиваемого уровня: 0 — как medium, 1 — как hard
+
+
+def easy_move(board, rng=random, stats=None):
+    """
+    Случайный свободный ход.
+    :param stats: stats.SearchStats или None
+    :return: номер клетки или None
+    """
+    moves = board.legal_moves()
+    if stats is not None:
+        stats.source = "random"
+    return rng.choice(moves) if moves else None
+
+
+def winning_or_blocking_move(board):
+    """
+    Ход, который сразу выигрывает, иначе — блокирующий победу соперника.
+    :return: номер клетки или None
+    """
+    player = board.to_move
+    other = "O" if player == "X" else "X"
+    for who in (player, other):
+        for cell in board.legal_moves():
+            board.make(cell, who)
+            won = board.wins_through(cell, who)
+            board.unmake(cell)
+            if won:
+                return cell
+    return None
+
+
+def medium_move(board, rng=random, stats=None):
+    """
+    Выиграть, заблокировать, иначе случайный ход.
+    """
+    started = time.perf_counter() if stats is not None else 0.0
+    move = winning_or_blocking_move(board)
+    if move is None:
+        move = easy_move(board, rng)
+    if stats is not None:
+        stats.source = "rules"
+        stats.nodes += 2 * len(board.legal_moves())
+        stats.elapsed = time.perf_counter() - started
+    return move
+
+
+def hard_move(board, rng=random, time_limit=AI_TIME_LIMIT, cancel=None, stats=None):
+    """
+    Идеальная игра на 3×3 по таблице ходов, на больших полях — альфа-бета поиск,
+    на кубе — поиск по пространству угроз (cube.py).
+    :param cancel: worker.CancelToken для досрочной остановки поиска
+    :param stats: stats.SearchStats для счётчиков поиска или None
+    """
+    started = time.perf_counter() if stats is not None else 0.0
+    if board.geo.is_classic:
+        move = book.best_move(board, stats)
+    elif board.dims == 3:
+        import cube  # Поиски больших полей нужны только сложному уровню
+        move = cube.best_move(board, time_limit, cancel=cancel, stats=stats)
+    else:
+        import search
+        move = search.best_move(board, time_limit, cancel=cancel, stats=stats)
+    if stats is not None:
+        stats.elapsed = time.perf_counter() - started
+    return move
+
+
+def mcts_move(board, rng=random, time_limit=AI_TIME_LIMIT, iterations=None, workers=None,
+              cancel=None, stats=None):
+    """
+    Поиск Монте-Карло по дереву в пределах бюджета времени или итераций.
+    Немедленная победа или блок делаются без поиска.
+    :param workers: число параллельных деревьев (1 — без пула процессов)
+    :param cancel: worker.CancelToken для досрочной остановки поиска
+    :param stats: stats.SearchStats для счётчиков поиска или None
+    """
+    started = time.perf_counter() if stats is not None else 0.0
+    move = winning_or_blocking_move(board)
+    if move is None:
+        import mcts
+        move = mcts.best_move(board, time_limit, iterations, workers, rng, cancel, stats)
+    elif stats is not None:
+        stats.source = "rules"
+    if stats is not None:
+        stats.elapsed = time.perf_counter() - started
+    return move
+
+
+def engine_move(board, rng=random, time_limit=AI_TIME_LIMIT, cancel=None, stats=None):
+    """
+    Ход движка в отдельном процессе по текстовому протоколу (protocol.py):
+    внешнего из TTT_ENGINE или встроенного. Процессы движков переиспользуются.
+    Если движок не запустился или не ответил, ход делает hard_move.
+    :param cancel: worker.CancelToken; при отмене движку посылается stop
+    """
+    import protocol  # protocol сам импортирует ai для встроенного движка
+    started = time.perf_counter() if stats is not None else 0.0
+    try:
+        move = protocol.best_move(board, time_limit, cancel=cancel, stats=stats)
+    except protocol.EngineError:
+        return hard_move(board, rng, time_limit, cancel, stats)
+    if stats is not None:
+        stats.elapsed = time.perf_counter() - started
+    return move
+
+
+def tuned_move(board, rng=random, strength=DEFAULT_STRENGTH, time_limit=AI_TIME_LIMIT,
+               cancel=None, stats=None):
+    """
+    Настраиваемая сила между medium_move и hard_move: с вероятностью strength
+    ход как у hard_move, иначе — выигрыш или блокировка, а если их нет,
+    нарочно неоптимальный, но не проигрывающий ход по оценкам analysis
+    (если такого нет — случайный).
+    :param strength: от 0 до 1
+    :param time_limit: бюджет на ход, в том числе на оценки analysis, секунды
+    """
+    if rng.random() < strength:
+        return hard_move(board, rng, time_limit, cancel, stats)
+    started = time.perf_counter() if stats is not None else 0.0
+    move = winning_or_blocking_move(board)
+    source = "rules"
+    if move is None:
+        import analysis  # Анализатор нужен только настраиваемому уровню
+        scores = analysis.analyzer.move_scores(board, cancel, time_limit=time_limit)
+        if scores is None:
+            # Оценки не уложились в бюджет и не размечаются: случайный ход рядом с фигурами
+            move = rng.choice(analysis.analyzer.candidates(board))
+            source = "random"
+        else:
+            weaker = [cell for cell in sorted(scores)
+                      if analysis.classify(scores, cell, board.geo) == analysis.GOOD]
+            move = rng.choice(weaker) if weaker else easy_move(board, rng)
+            source = "analysis" if weaker else "random"
+    if stats is not None:
+        stats.source = source
+        stats.elapsed = time.perf_counter() - started
+    return move
+
+
+LEVELS = {
+    "easy": easy_move,
+    "medium": medium_move,
+    "tuned": tuned_move,
+    "hard": hard_move,
+    "mcts": mcts_move,
+    "engine": engine_move,
+}
+
+# Уровни, которым нужен бюджет времени и на поле 3×3
+SEARCH_LEVELS = ("mcts", "engine")
+# Уровни, умеющие играть на кубе: движку по протоколу и анализу (tuned) нужны плоские поля
+CUBE_LEVELS = ("easy", "medium", "hard", "mcts")
+
+
+def choose_move(level, board, rng=random):
+    """
+    Ход стратегии по названию уровня.
+    :param level: название уровня из LEVELS
+    """
+    try:
+        strategy = LEVELS[level]
+    except KeyError:
+        raise ValueError(f"Неизвестный уровень ИИ: {level}") from None
+    return strategy(board, rng)
@@ -0,0 +1,207 @@
+"""
+Анализ позиций: оценки всех ходов, подсказки и разбор партии.
+
+Оценки ходов позиции считаются один раз и хранятся в кэше LRU ограниченного
+размера, поэтому окно может заранее посчитать их в фоне, пока игрок думает,
+а подсказка и разбор партии потом берут готовый результат.
+
+На 3×3 оценки точные (solver.move_scores: >0 — выигрыш, 0 — ничья, <0 —
+проигрыш, быстрее — больше по модулю). На больших полях каждый ход-кандидат
+оценивается альфа-бета поиском за соперника в пределах общего бюджета
+времени; ходы вдали от фигур оцениваются по запросу. Если бюджета не хватило
+даже на глубину 1, оценки ненадёжны: они не кэшируются и не размечаются.
+
+Ход считается лучшим, если его оценка равна лучшей; ошибкой — если он меняет
+исход (упускает выигрыш или ведёт к проигрышу), а на больших полях ещё и
+если уступает лучшему ходу не меньше открытой линии без одной фигуры;
+остальные ходы — хорошие.
+"""
+
+import collections
+import threading
+import time
+
+import engine
+import search
+import solver
+
+CACHE_SIZE = 4096  # Позиций в кэше оценок
+TIME_LIMIT = 0.5  # Бюджет оценки всех ходов позиции на больших полях, секунды
+MAX_DEPTH = 3  # Глубина поиска за соперника на больших полях
+
+BEST, GOOD, BLUNDER = "best", "good", "blunder"
+LABELS = {BEST: "лучший", GOOD: "хороший", BLUNDER: "ошибка"}
+
+
+def outcome(score, geo):
+    """
+    Исход по оценке хода: 1 — выигрыш, 0 — неясно или ничья, -1 — проигрыш.
+    """
+    if geo.is_classic:
+        return (score > 0) - (score < 0)
+    if score >= search.WIN_SCORE - geo.cells:
+        return 1
+    if score <= -search.WIN_SCORE + geo.cells:
+        return -1
+    return 0
+
+
+def classify(scores, cell, geo):
+    """
+    Оценка сыгранного хода: BEST, GOOD или BLUNDER.
+    :param scores: оценки ходов позиции (Analyzer.move_scores)
+    """
+    best = max(scores.values())
+    score = scores[cell]
+    if score == best:
+        return BEST
+    if outcome(score, geo) != outcome(best, geo):
+        return BLUNDER
+    # Вес открытой линии из win_length - 1 фигур в эвристике search.py
+    if not geo.is_classic and best - score >= 10 ** (geo.win_length - 2):
+        return BLUNDER
+    return GOOD
+
+
+class Analyzer:
+    """
+    Оценки ходов позиций с кэшем LRU. Потокобезопасен: им пользуются
+    фоновые потоки окна и ИИ одновременно.
+    """
+
+    def __init__(self, capacity=CACHE_SIZE, time_limit=TIME_LIMIT):
+        self.capacity = capacity
+        self.time_limit = time_limit
+        self._cache = collections.OrderedDict()  # (геометрия, x, o) -> {клетка: оценка}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, board):
+        """
+        Оценки из кэша или None, без вычислений.
+        """
+        key = (board.geo, board.x, board.o)
+        with self._lock:
+            scores = self._cache.get(key)
+            if scores is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            return scores
+
+    def move_scores(self, board, cancel=None, extra=(), time_limit=None):
+        """
+        Оценки ходов ходящего игрока: больше — лучше.
+        :param cancel: worker.CancelToken; прерванный расчёт не кэшируется
+        :param extra: клетки, которые нужно оценить, даже если они не кандидаты
+        :param time_limit: бюджет на большом поле, секунды (по умолчанию — self.time_limit)
+        :return: словарь {клетка: оценка} или None, если расчёт отменён или
+                 не уложился в бюджет
+        """
+        scores = self.cached(board)
+        missing = [cell for cell in extra if scores is None or cell not in scores]
+        if scores is not None and not missing:
+            return scores
+        with self._lock:
+            self.misses += 1
+        board = board.copy()
+        if board.geo.is_classic:
+            scores = solver.move_scores(board)
+        else:
+            scores = dict(scores or {})
+            cells = [cell for cell in self.candidates(board) if cell not in scores]
+            cells += [cell for cell in missing if cell not in cells]
+            searched = self._search_scores(board, cells, cancel, time_limit or self.time_limit)
+            if searched is None:
+                return None
+            scores.update(searched)
+        if cancel is not None and cancel.cancelled:
+            return None
+        key = (board.geo, board.x, board.o)
+        with self._lock:
+            self._cache[key] = scores
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+        return scores
+
+    @staticmethod
+    def candidates(board):
+        return search.AlphaBeta(board, 0).candidates()
+
+    @staticmethod
+    def _search_scores(board, cells, cancel, time_limit):
+        """
+        Оценки клеток поиском за соперника. Остаток бюджета делится поровну
+        между неоценёнными клетками, так что быстрые поиски отдают время остальным.
+        :return: словарь {клетка: оценка} или None, если поиск какой-то клетки
+                 не дошёл до глубины 1
+        """
+        player = board.to_move
+        deadline = time.perf_counter() + time_limit
+        scores = {}
+        for i, cell in enumerate(cells):
+            board.make(cell, player)
+            try:
+                if board.wins_through(cell, player):
+                    scores[cell] = search.WIN_SCORE - 1
+                    continue
+                budget = (deadline - time.perf_counter()) / (len(cells) - i)
+                # Оценка за соперника с его стороны, со сдвигом на один полуход
+                move, score, depth = search.AlphaBeta(board, max(budget, 0.0), MAX_DEPTH,
+                                                      cancel).run()
+                if move is not None and depth == 0:
+                    return None  # Таймаут: оценка 0 выдала бы ход за равный лучшему
+                if outcome(score, board.geo):
+                    score -= 1 if score > 0 else -1
+                scores[cell] = -score
+            finally:
+                board.unmake(cell)
+        return scores
+
+    def best_move(self, board, cancel=None):
+        """
+        Подсказка: ход с наибольшей оценкой (при равенстве — меньший номер).
+        Если оценки не уложились в бюджет, подсказкой служит ход поиска search.py.
+        :return: номер клетки или None, если ходов нет
+        """
+        if board.is_terminal():
+            return None
+        scores = self.move_scores(board, cancel)
+        if scores is None:
+            if cancel is not None and cancel.cancelled:
+                return None
+            return search.best_move(board, self.time_limit, cancel=cancel)
+        return max(sorted(scores), key=scores.get) if scores else None
+
+    def review(self, moves, size=engine.SIZE, win_length=None, players=engine.PLAYERS,
+               cancel=None):
+        """
+        Разбор партии: каждый ход игроков players помечается как лучший,
+        хороший или ошибка. Ходы, оценки позиций которых не уложились
+        в бюджет, не размечаются.
+        :param moves: номера клеток по порядку, X ходит первым
+        :return: список (номер хода с 1, игрок, клетка, метка, лучший ход)
+        """
+        board = engine.Board(size=size, win_length=win_length)
+        result = []
+        for number, cell in enumerate(moves, 1):
+            player = board.to_move
+            if player in players:
+                scores = self.move_scores(board, cancel, extra=(cell,))
+                if cancel is not None and cancel.cancelled:
+                    break
+                if scores is None:
+                    board.make(cell, player)
+                    continue
+                best = max(sorted(scores), key=scores.get)
+                result.append((number, player, cell, classify(scores, cell, board.geo), best))
+            board.make(cell, player)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+analyzer = Analyzer()  # Общий для окна и ИИ, чтобы фоновые расчёты не повторялись
@@ -0,0 +1,157 @@
+"""
+Пакетная оценка позиций на NumPy для аналитики и обучения.
+
+Доски передаются массивом формы (N, size*size) типа int8: 0 — пустая клетка,
+1 — крестик, 2 — нолик (как в троичном индексе book.py). Победа находится
+редукцией по линиям: клетки всех линий выбираются одним индексированием
+массива, затем all по клеткам линии и any по линиям — без цикла Python по
+доскам. Результаты совпадают с engine.Board (is_win, is_full, legal_moves,
+winner), на 3×3 дополнительно считается значение позиции при идеальной игре.
+Коды вне 0–2 и невозможные в партии позиции (неверное число фигур, линии
+у обоих игроков, на 3×3 — партия, продолженная после победы) отклоняются
+с ValueError.
+
+Модуль требует numpy; остальная игра от него не зависит.
+"""
+
+import numpy as np
+
+import engine
+import solver
+from book import TERNARY
+
+EMPTY, X_CELL, O_CELL = 0, 1, 2
+# Коды победителя: 0 — нет, 1 — X, 2 — O (совпадают с кодами клеток)
+NO_WINNER = EMPTY
+
+_line_cells = {}  # Геометрия -> массив (линии, длина линии) номеров клеток
+_values = None  # Значения всех 3^9 позиций 3×3, строятся при первом запросе
+_reachable_table = None  # Возможна ли каждая из 3^9 позиций в партии
+
+
+def line_cells(geo):
+    """
+    Номера клеток каждой выигрышной линии поля.
+    """
+    cells = _line_cells.get(geo)
+    if cells is None:
+        cells = _line_cells[geo] = np.array(
+            [engine.cells_of(line) for line in geo.lines], dtype=np.intp)
+    return cells
+
+
+def encode(boards):
+    """
+    Переводит список engine.Board одного варианта в массив (N, size*size).
+    """
+    cells = boards[0].cells if boards else engine.CELLS
+    rows = [[(board.x >> k & 1) * X_CELL + (board.o >> k & 1) * O_CELL for k in range(cells)]
+            for board in boards]
+    return np.array(rows, dtype=np.int8).reshape(len(boards), cells)
+
+
+def _check(boards, size):
+    boards = np.asarray(boards)
+    if boards.ndim != 2 or boards.shape[1] != size * size:
+        raise ValueError(f"Ожидается массив формы (N, {size * size})")
+    if boards.size and (not np.issubdtype(boards.dtype, np.integer)
+                        or boards.min() < EMPTY or boards.max() > O_CELL):
+        raise ValueError("Коды клеток должны быть 0 (пусто), 1 (X) или 2 (O)")
+    return boards.astype(np.int8, copy=False)
+
+
+def _reject(bad, reason):
+    """
+    ValueError с номером первой невозможной доски, если такие есть.
+    :param bad: массив bool формы (N,)
+    """
+    if bad.any():
+        raise ValueError(f"Доска {int(np.argmax(bad))}: {reason}")
+
+
+def wins(boards, geo, code):
+    """
+    Есть ли на каждой доске целая линия игрока с кодом code.
+    :return: массив bool формы (N,)
+    """
+    return (boards[:, line_cells(geo)] == code).all(axis=2).any(axis=1)
+
+
+def values(boards):
+    """
+    Значение позиций 3×3 при идеальной игре с точки зрения крестиков в шкале
+    solver.evaluate: >0 — X выигрывает (быстрее — больше), 0 — ничья,
+    <0 — выигрывает O.
+    :param boards: массив (N, 9)
+    :return: массив int8 формы (N,)
+    :raises ValueError: неверные коды или позиция, невозможная в партии
+    """
+    boards = _check(boards, engine.SIZE)
+    index = boards.astype(np.int32) @ (3 ** np.arange(engine.CELLS, dtype=np.int32))
+    table = _value_table()
+    _reject(~_reachable_table[index], "позиция невозможна в партии")
+    return table[index]
+
+
+def _value_table():
+    global _values, _reachable_table
+    if _values is None:
+        table = np.zeros(3 ** engine.CELLS, dtype=np.int8)
+        reachable = np.zeros(3 ** engine.CELLS, dtype=bool)
+        for x in range(engine.FULL + 1):
+            free = engine.FULL & ~x
+            # Перебор подмасок свободных клеток — все позиции с крестиками x
+            o = free
+            while True:
+                if _reachable(x, o):
+                    score = solver.evaluate(engine.Board(x, o))
+                    x_to_move = x.bit_count() == o.bit_count()
+                    table[TERNARY[x] + 2 * TERNARY[o]] = score if x_to_move else -score
+                    reachable[TERNARY[x] + 2 * TERNARY[o]] = True
+                if not o:
+                    break
+                o = (o - 1) & free
+        _reachable_table = reachable
+        _values = table
+    return _values
+
+
+def _reachable(x, o):
+    """
+    Позиция возможна в партии: фигур поровну или крестиков на одну больше,
+    и у ходящего нет готовой линии (отсюда же — не у обоих сразу).
+    """
+    diff = x.bit_count() - o.bit_count()
+    if diff not in (0, 1):
+        return False
+    return not engine.WIN_TABLE[x if diff == 0 else o]
+
+
+def evaluate(boards, size=engine.SIZE, win_length=None):
+    """
+    Пакетная оценка досок.
+    :param boards: массив int8 формы (N, size*size): 0 — пусто, 1 — X, 2 — O
+    :param size: размер поля
+    :param win_length: длина линии для победы (по умолчанию — размер поля)
+    :return: словарь массивов: winner (N,) int8 — 0, 1 (X) или 2 (O), как Board.winner;
+             terminal (N,) bool; legal (N, size*size) bool — свободные клетки,
+             как Board.legal_moves; value (N,) int8 — только для 3×3, иначе None
+    :raises ValueError: неверные коды клеток или позиция, невозможная в партии
+    """
+    geo = engine.geometry(size, win_length)
+    boards = _check(boards, size)
+    diff = (boards == X_CELL).sum(axis=1) - (boards == O_CELL).sum(axis=1)
+    _reject((diff < 0) | (diff > 1), "крестиков должно быть столько же или на одну больше")
+    x_won = wins(boards, geo, X_CELL)
+    o_won = wins(boards, geo, O_CELL)
+    _reject(x_won & o_won, "готовые линии у обоих игроков")
+    legal = boards == EMPTY
+    full = ~legal.any(axis=1)
+    # Board.winner проверяет крестики первыми
+    winner = np.where(x_won, X_CELL, np.where(o_won, O_CELL, NO_WINNER)).astype(np.int8)
+    return {
+        "winner": winner,
+        "terminal": x_won | o_won | full,
+        "legal": legal,
+        "value": values(boards) if geo.is_classic else None,
+    }
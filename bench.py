@@ -0,0 +1,242 @@
+"""
+Замеры скорости ИИ и проверки победы без запуска окна.
+
+Методы TicTacToe вызываются на экземпляре, созданном без __init__, поэтому
+tk.Tk не создаётся. Для каждого замера печатаются операции в секунду и
+задержки p50/p99; результаты сохраняются в JSON и сравниваются с базовой
+линией — замедление больше порога считается регрессией (код возврата 1).
+Замеры startup/* запускают интерпретатор заново и показывают время старта
+каждого режима: ядро без окна, окно (импорт tkinter), партия и консоль.
+
+Базовая линия зависит от машины, поэтому не хранится в репозитории
+(bench_baseline.json рядом с bench.py в .gitignore): на новой машине или
+после свежего клонирования её нужно один раз записать через --save-baseline
+на исходной версии кода. Без неё замеры печатаются, но не сравниваются.
+
+Запуск:
+    python bench.py                       # замер и сравнение с bench_baseline.json
+    python bench.py --save-baseline       # записать текущие результаты как базовую линию
+    python bench.py --output results.json --filter minimax
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import ai
+import engine
+import main
+import main_DeepSeek
+import solver
+
+try:
+    import batch
+except ImportError:  # Пакетная оценка требует numpy
+    batch = None
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+DEFAULT_BUDGET = 0.5  # Время на один замер, секунды
+DEFAULT_THRESHOLD = 0.2  # Допустимое замедление относительно базовой линии
+MIN_SAMPLES = 3  # Наименьшее число пачек
+SAMPLE_CALLS = 64  # Вызовов за круг, замеряемых по одному для p50/p99
+BATCH_SIZE = 10000  # Досок в одном вызове пакетной оценки
+
+# Код, выполняемый новым интерпретатором для замеров времени старта
+STARTUP = {
+    "python": "pass",
+    "core": "import ai, engine",
+    "match": "import cli; cli.play_match('hard', 'hard', out=lambda *a: None)",
+    "repl": "import cli, io; cli.repl(io.StringIO('move 4\\nai\\nquit\\n'), out=lambda *a: None)",
+    "gui": "import main_DeepSeek; main_DeepSeek.load_tk()",
+}
+
+
+def position(moves, size=3, win_length=3):
+    """
+    Доска после последовательности ходов (X ходит первым).
+    :param moves: номера клеток
+    """
+    board = engine.Board(size=size, win_length=win_length)
+    player = engine.X
+    for cell in moves:
+        board.make(cell, player)
+        player = engine.opponent(player)
+    return board
+
+
+POSITIONS = {
+    "empty": position([]),
+    "mid": position([4, 0, 2]),
+    "near_terminal": position([4, 0, 2, 6, 3]),
+}
+
+
+def headless(cls, board):
+    """
+    Экземпляр окна без __init__: только доска, без tk.Tk.
+    """
+    game = cls.__new__(cls)
+    game.board = board.copy()
+    game.winning_cells = None
+    game.ai_level = "hard"
+    return game
+
+
+def measure(func, budget=DEFAULT_BUDGET):
+    """
+    Замеряет func: ops_per_sec — по пачкам, размер которых подбирается так,
+    чтобы накладные расходы таймера были малы по сравнению с вызовами;
+    p50/p99 — по отдельно замеренным вызовам (с накладными расходами таймера,
+    заметными для самых быстрых операций).
+    :return: словарь с ops_per_sec, p50_us, p99_us, calls
+    """
+    inner = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(inner):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= 0.001 or inner >= 1 << 20:
+            break
+        inner *= 4
+    samples = []
+    rounds = 0
+    total_calls = 0
+    total_time = 0.0
+    single = min(inner, SAMPLE_CALLS) if inner > 1 else 0  # Пачка из одного вызова — уже замер
+    timer = time.perf_counter
+    deadline = timer() + budget
+    while rounds < MIN_SAMPLES or timer() < deadline:
+        started = timer()
+        for _ in range(inner):
+            func()
+        elapsed = timer() - started
+        rounds += 1
+        total_calls += inner
+        total_time += elapsed
+        if not single:
+            samples.append(elapsed)
+        for _ in range(single):
+            started = timer()
+            func()
+            samples.append(timer() - started)
+    samples.sort()
+    return {
+        "ops_per_sec": total_calls / total_time,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6,
+        "calls": total_calls,
+    }
+
+
+def startup(code):
+    """
+    Запуск интерпретатора с кодом из STARTUP в каталоге игры.
+    """
+    subprocess.run([sys.executable, "-c", code], check=True,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+def benchmarks():
+    """
+    Список замеров: (имя, функция без аргументов).
+    """
+    cases = []
+    for name, board in POSITIONS.items():
+        deepseek = headless(main_DeepSeek.TicTacToe, board)
+        classic = headless(main.TicTacToe, board)
+        cases += [
+            (f"check_winner/{name}", lambda g=deepseek: g.check_winner("O")),
+            (f"is_board_full/{name}", deepseek.is_board_full),
+            (f"minimax/{name}", lambda g=deepseek, o=board.to_move == engine.O: g.minimax(0, o)),
+            (f"hard_ai_move/{name}", lambda g=deepseek, b=board: g.hard_ai_move(b)),
+            (f"find_best_move/{name}", classic.find_best_move),
+            (f"easy_ai_move/{name}", lambda g=deepseek, b=board: g.easy_ai_move(b)),
+            (f"solver_warm/{name}", lambda b=board: solver.best_move(b)),
+        ]
+    empty = POSITIONS["empty"]
+    cases += [
+        ("solver_cold/empty", lambda: (solver.clear_cache(), solver.best_move(empty))),
+        ("hard_ai_move/5x5", lambda b=position([12], 5, 4): ai.hard_move(b, time_limit=0.05)),
+    ]
+    if batch is not None:
+        boards = batch.encode(list(POSITIONS.values()) * (BATCH_SIZE // len(POSITIONS)))
+        cases.append((f"batch_evaluate/{len(boards)}", lambda a=boards: batch.evaluate(a)))
+    for name, code in STARTUP.items():
+        if name == "gui" and importlib.util.find_spec("tkinter") is None:
+            continue
+        cases.append((f"startup/{name}", lambda c=code: startup(c)))
+    return cases
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Сравнивает ops/sec с базовой линией.
+    :return: список (имя, отношение текущего к базовому) для регрессий
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        ratio = result["ops_per_sec"] / base["ops_per_sec"]
+        result["vs_baseline"] = ratio
+        if ratio < 1 - threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры скорости ИИ Крестиков-Ноликов")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="время на замер, секунды")
+    parser.add_argument("--filter", default="", help="запускать только замеры, содержащие строку")
+    parser.add_argument("--output", help="куда сохранить результаты в JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="файл базовой линии")
+    parser.add_argument("--save-baseline", action="store_true", help="записать результаты как базовую линию")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимое замедление (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, func in benchmarks():
+        if args.filter not in name:
+            continue
+        results[name] = measure(func, args.budget)
+        r = results[name]
+        print(f"{name:32} {r['ops_per_sec']:>14,.0f} оп/с   p50 {r['p50_us']:>12.2f} мкс"
+              f"   p99 {r['p99_us']:>12.2f} мкс")
+
+    regressions = []
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        print(f"Внимание: нет базовой линии {args.baseline}, сравнение пропущено "
+              "(создать: python bench.py --save-baseline)", file=sys.stderr)
+    elif not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, ratio in regressions:
+            print(f"РЕГРЕССИЯ {name}: {ratio:.2f}× от базовой линии")
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": time.time(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Базовая линия записана в {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,113 @@
+"""
+Таблица идеальных ходов для всех позиций 3×3 (дебютная книга).
+
+Таблица заранее строится скриптом gen_book.py и хранится в book.bin:
+заголовок с контрольной суммой и по одному байту на каждую позицию,
+индекс которой — номер доски в троичной системе (0 — пусто, 1 — X, 2 — O).
+Файл отображается в память, ход находится одним чтением байта. Если файла
+нет или он повреждён, используется поиск solver.best_move.
+"""
+
+import mmap
+import os
+import struct
+import zlib
+
+from engine import CELLS, FULL
+
+MAGIC = b"TTTB"
+VERSION = 1
+# magic, версия, размер доски, резерв, число записей, crc32 записей
+HEADER = struct.Struct("<4sBBHII")
+ENTRIES = 3 ** CELLS
+NO_MOVE = 0xFF
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+# TERNARY[mask] — вклад маски в троичный индекс позиции (маска без младшего бита
+# плюс вклад этого бита)
+_ternary = [0] * (FULL + 1)
+for _mask in range(1, FULL + 1):
+    _low = _mask & -_mask
+    _ternary[_mask] = _ternary[_mask ^ _low] + 3 ** (_low.bit_length() - 1)
+TERNARY = tuple(_ternary)
+del _ternary, _mask, _low
+
+_table = None  # mmap с файлом книги, False — книга недоступна
+
+
+def index(board):
+    """
+    Троичный индекс позиции.
+    :param board: engine.Board
+    """
+    return TERNARY[board.x] + 2 * TERNARY[board.o]
+
+
+def pack(moves):
+    """
+    Собирает содержимое файла книги.
+    :param moves: bytes/bytearray длиной ENTRIES
+    :return: bytes
+    """
+    return HEADER.pack(MAGIC, VERSION, 3, 0, len(moves), zlib.crc32(moves)) + bytes(moves)
+
+
+def load(path=DEFAULT_PATH):
+    """
+    Отображает файл книги в память и проверяет контрольную сумму.
+    :return: True, если книга загружена
+    """
+    global _table
+    _table = False
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return False
+    if len(data) != HEADER.size + ENTRIES:
+        data.close()
+        return False
+    magic, version, size, _, entries, crc = HEADER.unpack_from(data)
+    if (magic != MAGIC or version != VERSION or size != 3 or entries != ENTRIES
+            or zlib.crc32(data[HEADER.size:]) != crc):
+        data.close()
+        return False
+    _table = data
+    return True
+
+
+def is_loaded():
+    return bool(_table)
+
+
+def lookup(board):
+    """
+    Ход из книги для ходящего игрока.
+    :param board: engine.Board
+    :return: номер клетки или None, если книга недоступна или позиция терминальная
+    """
+    if _table is None:
+        load()
+    if not _table:
+        return None
+    move = _table[HEADER.size + index(board)]
+    return None if move == NO_MOVE else move
+
+
+def best_move(board, stats=None):
+    """
+    Лучший ход: из книги, а при её отсутствии — живым поиском.
+    :param board: engine.Board
+    :param stats: stats.SearchStats или None
+    :return: номер клетки или None
+    """
+    move = lookup(board)
+    if move is None and not _table:
+        import solver
+        move = solver.best_move(board, stats)
+    elif stats is not None:
+        stats.source = "book"
+        if move is not None:  # В терминальной позиции хода в книге нет
+            stats.cache_hits += 1
+    return move
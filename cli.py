@@ -0,0 +1,165 @@
+"""
+Точка входа командной строки: окно, партия компьютер против компьютера или
+консоль движка.
+
+    python main_DeepSeek.py                         # окно (по умолчанию)
+    python main_DeepSeek.py --match hard mcts --size 5 --win 4
+    python main_DeepSeek.py --repl                  # консоль движка
+    python main_DeepSeek.py --match engine hard --engine "./my_engine --fast"
+
+Модули окон импортируют tkinter только при создании окна, а таблицы ИИ
+строятся при первом обращении, поэтому безголовые режимы стартуют за
+миллисекунды (замер — bench.py --filter startup).
+"""
+
+import argparse
+import os
+import random
+import sys
+
+import ai
+import engine
+import solver
+
+REPL_HELP = """Команды:
+  new [размер [длина]]  — новая партия
+  move <клетка>         — ход: номер клетки или строка,столбец
+  ai [уровень]          — ход компьютера (easy, medium, tuned, hard, mcts, engine)
+  undo                  — отменить последний ход
+  show                  — показать поле
+  eval                  — оценка позиции для ходящего (только 3×3)
+  help, quit"""
+
+
+def format_board(board):
+    """
+    Поле построчно: '.' — пусто.
+    """
+    return "\n".join(
+        " ".join(board.get(row, col) or "." for col in range(board.size))
+        for row in range(board.size)
+    )
+
+
+def play_match(first, second, games=1, size=3, win_length=None, seed=None, out=print):
+    """
+    Партии first (крестики) против second (нолики) с выводом в out.
+    :return: словарь {'X': победы, 'O': победы, 'draw': ничьи}
+    """
+    rng = random.Random(seed)
+    totals = {engine.X: 0, engine.O: 0, "draw": 0}
+    for game in range(games):
+        board = engine.Board(size=size, win_length=win_length)
+        levels = {engine.X: first, engine.O: second}
+        player = engine.X
+        moves = []
+        while True:
+            cell = ai.choose_move(levels[player], board, rng)
+            board.make(cell, player)
+            moves.append(cell)
+            if board.wins_through(cell, player):
+                winner = player
+                break
+            if board.is_full():
+                winner = None
+                break
+            player = engine.opponent(player)
+        totals[winner or "draw"] += 1
+        if games == 1:
+            out(format_board(board))
+        out(f"Партия {game + 1}: {winner or 'ничья'}, ходы {moves}")
+    return totals
+
+
+def repl(stream=sys.stdin, out=print):
+    """
+    Консоль движка: партия ведётся командами из stream.
+    """
+    board = engine.Board()
+    history = []
+    out(REPL_HELP)
+    for line in stream:
+        words = line.split()
+        if not words:
+            continue
+        command, args = words[0].lower(), words[1:]
+        try:
+            if command in ("quit", "exit"):
+                break
+            if command == "help":
+                out(REPL_HELP)
+                continue
+            if command == "new":
+                size = int(args[0]) if args else board.size
+                win_length = int(args[1]) if len(args) > 1 else None
+                board = engine.Board(size=size, win_length=win_length)
+                history = []
+            elif command == "move":
+                if "," in args[0]:
+                    row, col = (int(part) for part in args[0].split(","))
+                    cell = board.cell_of(row, col)
+                else:
+                    cell = int(args[0])
+                if board.is_terminal() or not 0 <= cell < board.cells or not board.is_empty(cell):
+                    out("Недопустимый ход")
+                    continue
+                history.append(cell)
+                board.make(cell, board.to_move)
+            elif command == "ai":
+                if board.is_terminal():
+                    out("Партия окончена")
+                    continue
+                cell = ai.choose_move(args[0] if args else "hard", board)
+                history.append(cell)
+                board.make(cell, board.to_move)
+                out(f"Ход компьютера: {cell}")
+            elif command == "undo":
+                if history:
+                    board.unmake(history.pop())
+            elif command == "eval":
+                if not board.geo.is_classic:
+                    out("Оценка доступна только для 3×3")
+                else:
+                    out(f"Оценка: {solver.evaluate(board)}, ходы: {solver.move_scores(board)}")
+                continue
+            elif command != "show":
+                out(f"Неизвестная команда: {command}")
+                continue
+        except (IndexError, ValueError) as error:
+            out(f"Ошибка: {error}")
+            continue
+        out(format_board(board))
+        winner = board.winner()
+        if winner is not None:
+            out(f"Победил: {winner}")
+        elif board.is_full():
+            out("Ничья")
+
+
+def main(run_gui, argv=None):
+    """
+    Разбирает аргументы и запускает выбранный режим.
+    :param run_gui: функция без аргументов, открывающая окно игры
+    """
+    parser = argparse.ArgumentParser(description="Крестики-Нолики")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--gui", action="store_true", help="открыть окно (по умолчанию)")
+    group.add_argument("--match", nargs=2, metavar=("X", "O"), choices=sorted(ai.LEVELS),
+                       help="партия компьютер против компьютера без окна")
+    group.add_argument("--repl", action="store_true", help="консоль движка без окна")
+    parser.add_argument("-n", "--games", type=int, default=1, help="число партий для --match")
+    parser.add_argument("--size", type=int, default=3, help="размер поля для --match")
+    parser.add_argument("--win", type=int, default=None, help="длина линии для --match")
+    parser.add_argument("--seed", type=int, default=None, help="зерно для --match")
+    parser.add_argument("--engine", help="команда внешнего движка для уровня engine (protocol.py)")
+    args = parser.parse_args(argv)
+    if args.engine:
+        # Через окружение команду видят и процессы, запущенные игрой
+        os.environ["TTT_ENGINE"] = args.engine
+    if args.match:
+        totals = play_match(*args.match, args.games, args.size, args.win, args.seed)
+        print(f"X: {totals['X']}, O: {totals['O']}, ничьих: {totals['draw']}")
+    elif args.repl:
+        repl()
+    else:
+        run_gui()
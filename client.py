@@ -0,0 +1,71 @@
+"""
+Тонкий клиент игрового сервера для окна tkinter.
+
+Сокет читается в фоновом потоке, входящие сообщения складываются
+в потокобезопасную очередь, которую окно разбирает через root.after.
+Вся логика партии остаётся на сервере: клиент только отправляет ходы
+и показывает то, что прислал сервер.
+"""
+
+import json
+import queue
+import socket
+import threading
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class NetworkClient:
+    """
+    Подключение к server.GameServer.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=3.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.settimeout(None)
+        self.messages = queue.Queue()
+        self._thread = threading.Thread(target=self._read, name="net-client", daemon=True)
+        self._thread.start()
+
+    def send(self, op, **fields):
+        """
+        Отправляет сообщение серверу.
+        :return: False, если соединение потеряно
+        """
+        fields["op"] = op
+        try:
+            self.sock.sendall(json.dumps(fields, separators=(",", ":")).encode() + b"\n")
+        except OSError:
+            return False
+        return True
+
+    def poll(self):
+        """
+        Все сообщения, пришедшие с прошлого опроса.
+        """
+        received = []
+        while True:
+            try:
+                received.append(self.messages.get_nowait())
+            except queue.Empty:
+                return received
+
+    def close(self):
+        # shutdown нужен, чтобы разбудить поток чтения: makefile держит сокет открытым
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def _read(self):
+        try:
+            for line in self.sock.makefile("rb"):
+                try:
+                    self.messages.put(json.loads(line))
+                except ValueError:
+                    continue
+        except OSError:
+            pass
+        self.messages.put({"op": "disconnected"})
@@ -0,0 +1,274 @@
+"""
+Поиск хода на кубе (3×3×3 и 4×4×4 «Qubic»): поиск по пространству угроз.
+
+Полный перебор куба невозможен даже с альфа-бета отсечением, поэтому сложный
+ИИ строится на форсированных вариантах. Угроза — линия, где у игрока на одну
+фигуру меньше выигрыша и нет фигур соперника: соперник обязан закрыть
+последнюю клетку. Поиск угроз перебирает только ходы, создающие угрозу, а за
+соперника — единственный ответ (блок), поэтому глубокие форсированные
+варианты просматриваются за доли секунды. Двойная угроза — выигрыш.
+
+Ход выбирается так:
+    1) выигрыш одним ходом, иначе блок угрозы соперника;
+    2) свой форсированный выигрыш поиском угроз с итеративным углублением;
+    3) лучший по оценке ход, после которого у соперника нет форсированного
+       выигрыша (первым проверяется ход из найденного выигрыша соперника).
+Оценка хода — по таблице линий через клетку (у каждой клетки свой набор
+из 4–7 линий в 4×4×4): открытые линии с фигурами игрока или соперника.
+
+Число фигур каждого игрока на каждой линии обновляется при ходе только по
+линиям через клетку. Результаты поиска угроз хранятся в таблице
+транспозиций между ходами партии.
+"""
+
+import time
+
+from engine import X, O, cells_of
+
+DEFAULT_TIME_LIMIT = 0.2  # Бюджет на ход, секунды
+ATTACK_SHARE = 0.5  # Доля бюджета на поиск своего выигрыша, остальное — на защиту
+CHECK_EVERY = 64  # Как часто (в узлах) сверяться с часами
+SAFETY_MARGIN = 0.1  # Доля бюджета, оставляемая на накладные расходы
+TT_LIMIT = 500_000  # Записей в таблице транспозиций, при переполнении она очищается
+PROVEN = 1 << 10  # Глубина записи с найденным выигрышем: верна для любой глубины
+
+_tables = {}  # Геометрия -> (линии через клетку, таблица транспозиций)
+
+
+class Timeout(Exception):
+    """
+    Бюджет времени на ход исчерпан или поиск отменён.
+    """
+
+
+def tables(geo):
+    """
+    Номера линий через каждую клетку и таблица транспозиций для геометрии.
+    Таблица: (крестики, нолики, атакующий) -> (глубина, первый ход выигрыша или None).
+    """
+    found = _tables.get(geo)
+    if found is None:
+        cell_lines = tuple(
+            tuple(i for i, line in enumerate(geo.lines) if line >> k & 1) for k in range(geo.cells)
+        )
+        found = _tables[geo] = (cell_lines, {})
+    return found
+
+
+class ThreatSearch:
+    """
+    Один поиск хода для заданной позиции.
+    """
+
+    def __init__(self, board, time_limit=DEFAULT_TIME_LIMIT, cancel=None, stats=None):
+        self.board = board.copy()
+        self.cancel = cancel  # worker.CancelToken или None
+        self.stats = stats  # stats.SearchStats или None
+        self.started = time.perf_counter()
+        self.budget = time_limit * (1 - SAFETY_MARGIN)
+        self.deadline = self.started + self.budget
+        self.nodes = 0
+        geo = board.geo
+        self.lines = geo.lines
+        self.k = geo.win_length
+        self.cell_lines, self.tt = tables(geo)
+        if len(self.tt) > TT_LIMIT:
+            self.tt.clear()
+        # Фигур игрока на каждой линии
+        self.counts = {
+            X: [(board.x & line).bit_count() for line in self.lines],
+            O: [(board.o & line).bit_count() for line in self.lines],
+        }
+        # Ход атакующего — не больше половины свободных клеток
+        self.max_depth = (geo.cells - board.occupied.bit_count() + 1) // 2
+
+    def make(self, cell, player):
+        self.board.make(cell, player)
+        counts = self.counts[player]
+        for i in self.cell_lines[cell]:
+            counts[i] += 1
+
+    def unmake(self, cell, player):
+        self.board.unmake(cell)
+        counts = self.counts[player]
+        for i in self.cell_lines[cell]:
+            counts[i] -= 1
+
+    def winning_cells(self, player, lines=None):
+        """
+        Маска клеток, ход в которые сразу выигрывает.
+        :param lines: номера линий для проверки (по умолчанию — все)
+        """
+        mine = self.counts[player]
+        theirs = self.counts[O if player == X else X]
+        need = self.k - 1
+        free = ~self.board.occupied
+        cells = 0
+        for i in range(len(self.lines)) if lines is None else lines:
+            if mine[i] == need and not theirs[i]:
+                cells |= self.lines[i] & free
+        return cells
+
+    def threat_moves(self, player):
+        """
+        Ходы, создающие угрозу: сначала клетки, где сходится больше таких линий
+        (кандидаты в двойную угрозу).
+        """
+        mine = self.counts[player]
+        theirs = self.counts[O if player == X else X]
+        need = self.k - 2
+        free = ~self.board.occupied
+        lines_at = {}
+        for i, line in enumerate(self.lines):
+            if mine[i] == need and not theirs[i]:
+                for cell in cells_of(line & free):
+                    lines_at[cell] = lines_at.get(cell, 0) + 1
+        return sorted(lines_at, key=lambda cell: (-lines_at[cell], cell))
+
+    def threat_search(self, attacker, depth):
+        """
+        Форсированный выигрыш атакующего не больше чем за depth ходов-угроз.
+        Атакующий ходит; на одиночную угрозу защитник обязан ответить блоком.
+        :return: первый ход выигрыша или None
+        """
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0 and (
+                time.perf_counter() > self.deadline
+                or self.cancel is not None and self.cancel.cancelled):
+            raise Timeout
+        board = self.board
+        key = (board.x, board.o, attacker)
+        entry = self.tt.get(key)
+        if entry is not None and (entry[1] is not None or entry[0] >= depth):
+            if self.stats is not None:
+                self.stats.cache_hits += 1
+            return entry[1]
+        if self.stats is not None:
+            self.stats.cache_misses += 1
+
+        defender = O if attacker == X else X
+        result = None
+        wins = self.winning_cells(attacker)
+        forced = self.winning_cells(defender)
+        if wins:
+            result = (wins & -wins).bit_length() - 1
+        elif depth > 0 and not forced & (forced - 1):
+            # На угрозу защитника атакующий отвечает блоком — годится, только если он же угрожает
+            moves = cells_of(forced) if forced else self.threat_moves(attacker)
+            for cell in moves:
+                self.make(cell, attacker)
+                try:
+                    threats = self.winning_cells(attacker, self.cell_lines[cell])
+                    # Если у защитника есть выигрыш одним ходом, он не блокирует, а выигрывает
+                    if threats and not self.winning_cells(defender):
+                        if threats & (threats - 1):
+                            result = cell
+                        else:
+                            reply = threats.bit_length() - 1
+                            self.make(reply, defender)
+                            try:
+                                if self.threat_search(attacker, depth - 1) is not None:
+                                    result = cell
+                            finally:
+                                self.unmake(reply, defender)
+                finally:
+                    # Доска восстанавливается и при Timeout: поиск продолжается с корня
+                    self.unmake(cell, attacker)
+                if result is not None:
+                    break
+        self.tt[key] = (PROVEN if result is not None else depth, result)
+        return result
+
+    def forced_win(self, attacker):
+        """
+        Форсированный выигрыш с итеративным углублением.
+        :return: первый ход выигрыша или None
+        """
+        for depth in range(1, self.max_depth + 1):
+            move = self.threat_search(attacker, depth)
+            if move is not None:
+                if self.stats is not None:
+                    self.stats.max_depth = max(self.stats.max_depth, depth)
+                return move
+        return None
+
+    def rank(self, player):
+        """
+        Свободные клетки по убыванию оценки: открытые линии через клетку,
+        свои — для нападения, соперника — для защиты.
+        """
+        mine = self.counts[player]
+        theirs = self.counts[O if player == X else X]
+        keyed = []
+        for cell in cells_of(self.board.geo.full & ~self.board.occupied):
+            value = 0
+            for i in self.cell_lines[cell]:
+                if not theirs[i]:
+                    value += 4 ** mine[i]
+                if not mine[i]:
+                    value += 4 ** theirs[i] // 2
+            keyed.append((-value, cell))
+        keyed.sort()
+        return [cell for _, cell in keyed]
+
+    def run(self):
+        """
+        :return: номер клетки или None, если ходов нет
+        """
+        board = self.board
+        if board.is_terminal():
+            return None
+        player = board.to_move
+        other = O if player == X else X
+        for who in (player, other):
+            cells = self.winning_cells(who)
+            if cells:
+                return (cells & -cells).bit_length() - 1
+        ranked = self.rank(player)
+        best = ranked[0]
+        hard_deadline = self.deadline
+        self.deadline = self.started + self.budget * ATTACK_SHARE
+        try:
+            move = self.forced_win(player)
+            if move is not None:
+                return move
+        except Timeout:
+            pass
+        self.deadline = hard_deadline
+        try:
+            # Ход, с которого соперник начал бы свой выигрыш, проверяется первым
+            threat = self.threat_search(other, self.max_depth)
+            if threat is not None:
+                ranked.remove(threat)
+                ranked.insert(0, threat)
+            for cell in ranked:
+                best = cell
+                self.make(cell, player)
+                try:
+                    lost = self.threat_search(other, self.max_depth) is not None
+                finally:
+                    self.unmake(cell, player)
+                if not lost:
+                    return cell
+            return ranked[0]  # Проигрыш при любом ходе
+        except Timeout:
+            return best
+
+    def result(self):
+        move = self.run()
+        if self.stats is not None:
+            self.stats.source = "threats"
+            self.stats.nodes += self.nodes
+        return move
+
+
+def best_move(board, time_limit=DEFAULT_TIME_LIMIT, cancel=None, stats=None):
+    """
+    Лучший ход для ходящего игрока на кубе в пределах бюджета времени.
+    :param board: engine.Board с dims=3
+    :param time_limit: бюджет на ход, секунды
+    :param cancel: worker.CancelToken для досрочной остановки
+    :param stats: stats.SearchStats для счётчиков поиска или None
+    :return: номер клетки или None, если ходов нет
+    """
+    return ThreatSearch(board, time_limit, cancel, stats).result()
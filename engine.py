@@ -0,0 +1,347 @@
+"""
+Игровой движок Крестиков-Ноликов на битбордах.
+
+Каждый игрок хранится как битовая маска занятых им клеток (клетка k = row*size + col).
+Поддерживаются доски N×N с победой при K в ряд (3×3, 4×4 на 3 в ряд, 5×5 на 4,
+15×15 гомоку) и кубы N×N×N (3×3×3 и 4×4×4 «Qubic»). В кубе слои идут друг
+за другом: клетка k = (layer*size + row)*size + col, а строка из row_col —
+сквозная по всем слоям. Для 3×3 проверка победы — обращение к заранее
+посчитанной таблице по маске игрока, список ходов — по маске занятых клеток.
+Для больших досок победа проверяется сдвигами маски по 4 направлениям (в кубе —
+по 13): K битовых операций независимо от размера поля. Модуль не зависит от
+tkinter и может использоваться из скриптов, тестов и серверов.
+"""
+
+import itertools
+
+X = "X"
+O = "O"
+PLAYERS = (X, O)
+
+SIZE = 3
+CELLS = SIZE * SIZE
+FULL = (1 << CELLS) - 1
+
+# Варианты игры: (размер поля, длина линии для победы)
+VARIANTS = ((3, 3), (4, 3), (5, 4), (15, 5))
+# Варианты на кубе: (размер ребра, длина линии для победы)
+CUBE_VARIANTS = ((3, 3), (4, 4))
+
+# Направления линий: на плоскости — строки, столбцы и две диагонали, в кубе —
+# 13 направлений (первая ненулевая координата положительна)
+DIRECTIONS = {
+    2: ((0, 1), (1, 0), (1, 1), (1, -1)),
+    3: tuple(d for d in itertools.product((-1, 0, 1), repeat=3) if d > (0, 0, 0)),
+}
+
+# Маски 8 выигрышных линий: 3 строки, 3 столбца, 2 диагонали
+LINES = tuple(
+    sum(1 << cell for cell in line)
+    for line in (
+        (0, 1, 2), (3, 4, 5), (6, 7, 8),
+        (0, 3, 6), (1, 4, 7), (2, 5, 8),
+        (0, 4, 8), (2, 4, 6),
+    )
+)
+
+# WIN_TABLE[mask] — есть ли в маске целая линия: для каждой линии отмечаются
+# все маски, её содержащие (перебором подмасок остальных клеток)
+_wins = bytearray(FULL + 1)
+for _line in LINES:
+    _rest = FULL & ~_line
+    _sub = _rest
+    while True:
+        _wins[_sub | _line] = 1
+        if not _sub:
+            break
+        _sub = (_sub - 1) & _rest
+WIN_TABLE = tuple(map(bool, _wins))
+del _wins, _line, _rest, _sub
+
+# MOVES_TABLE[occupied] — свободные клетки по возрастанию
+MOVES_TABLE = tuple(
+    tuple(k for k in range(CELLS) if not occupied >> k & 1) for occupied in range(FULL + 1)
+)
+
+
+def opponent(player):
+    """
+    Возвращает соперника игрока.
+    :param player: 'X' или 'O'
+    :return: 'O' или 'X'
+    """
+    return O if player == X else X
+
+
+def cell_of(row, col, size=SIZE):
+    """
+    Номер клетки по строке и столбцу.
+    """
+    return row * size + col
+
+
+def row_col(cell, size=SIZE):
+    """
+    Строка и столбец по номеру клетки.
+    """
+    return divmod(cell, size)
+
+
+def line_cells(line, size=SIZE):
+    """
+    Переводит маску линии в список координат (row, col).
+    """
+    return [row_col(k, size) for k in range(size * size) if line >> k & 1]
+
+
+def cells_of(mask):
+    """
+    Номера установленных битов маски по возрастанию.
+    """
+    cells = []
+    while mask:
+        low = mask & -mask
+        cells.append(low.bit_length() - 1)
+        mask ^= low
+    return cells
+
+
+class Geometry:
+    """
+    Неизменяемые таблицы для поля size×size (куба size×size×size при dims=3)
+    с победой при win_length в ряд.
+    """
+    __slots__ = ("size", "win_length", "dims", "cells", "full", "lines", "cell_lines",
+                 "directions")
+
+    def __init__(self, size, win_length, dims=2):
+        if not 1 <= win_length <= size:
+            raise ValueError(f"Длина линии {win_length} не помещается на поле {size}×{size}")
+        if dims not in DIRECTIONS:
+            raise ValueError(f"Поле размерности {dims} не поддерживается")
+        self.size = size
+        self.win_length = win_length
+        self.dims = dims
+        self.cells = size ** dims
+        self.full = (1 << self.cells) - 1
+        # Для каждого направления: сдвиг между соседними клетками линии и маска
+        # клеток, с которых линия может начаться без выхода за край поля
+        self.directions = []
+        lines = []
+        for direction in DIRECTIONS[dims]:
+            step = 0
+            for d in direction:
+                step = step * size + d
+            start = 0
+            for k, coords in enumerate(itertools.product(range(size), repeat=dims)):
+                if all(0 <= c + d * (win_length - 1) < size for c, d in zip(coords, direction)):
+                    start |= 1 << k
+                    lines.append(sum(1 << (k + i * step) for i in range(win_length)))
+            self.directions.append((step, start))
+        self.lines = tuple(lines)
+        # cell_lines[k] — маски линий, проходящих через клетку k
+        self.cell_lines = tuple(
+            tuple(line for line in self.lines if line >> k & 1) for k in range(self.cells)
+        )
+
+    @property
+    def is_classic(self):
+        return self.size == SIZE and self.win_length == SIZE and self.dims == 2
+
+    def win_start(self, mask):
+        """
+        Ищет линию в маске сдвигами по 4 направлениям.
+        :return: (начальная клетка, шаг) или None
+        """
+        for step, start in self.directions:
+            run = mask & start
+            for i in range(1, self.win_length):
+                if not run:
+                    break
+                run &= mask >> (i * step)
+            if run:
+                return (run & -run).bit_length() - 1, step
+        return None
+
+
+_geometries = {}
+
+
+def geometry(size=SIZE, win_length=None, dims=2):
+    """
+    Таблицы для варианта игры (создаются один раз на вариант).
+    :param size: размер поля
+    :param win_length: длина линии, по умолчанию равна размеру поля
+    :param dims: 2 — плоское поле, 3 — куб
+    """
+    key = (size, win_length or size, dims)
+    geo = _geometries.get(key)
+    if geo is None:
+        geo = _geometries[key] = Geometry(*key)
+    return geo
+
+
+class Board:
+    """
+    Состояние доски: маска крестиков, маска ноликов и геометрия поля.
+    """
+    __slots__ = ("x", "o", "geo")
+
+    def __init__(self, x=0, o=0, size=SIZE, win_length=None, geo=None, dims=2):
+        self.x = x  # Клетки с крестиками
+        self.o = o  # Клетки с ноликами
+        self.geo = geo or geometry(size, win_length, dims)
+
+    @property
+    def size(self):
+        return self.geo.size
+
+    @property
+    def win_length(self):
+        return self.geo.win_length
+
+    @property
+    def dims(self):
+        return self.geo.dims
+
+    @property
+    def cells(self):
+        return self.geo.cells
+
+    def copy(self):
+        """
+        Возвращает независимую копию доски.
+        """
+        return Board(self.x, self.o, geo=self.geo)
+
+    def mask(self, player):
+        """
+        Маска клеток игрока.
+        :param player: 'X' или 'O'
+        """
+        return self.x if player == X else self.o
+
+    @property
+    def occupied(self):
+        return self.x | self.o
+
+    @property
+    def to_move(self):
+        """
+        Чей ход: крестики ходят первыми, поэтому при равном числе фигур ходит X.
+        """
+        return X if self.x.bit_count() == self.o.bit_count() else O
+
+    def cell_of(self, row, col):
+        return row * self.geo.size + col
+
+    def row_col(self, cell):
+        return divmod(cell, self.geo.size)
+
+    def get(self, row, col):
+        """
+        Содержимое клетки.
+        :return: None, 'X' или 'O'
+        """
+        bit = 1 << (row * self.geo.size + col)
+        if self.x & bit:
+            return X
+        if self.o & bit:
+            return O
+        return None
+
+    def is_empty(self, cell):
+        return not self.occupied >> cell & 1
+
+    def make(self, cell, player):
+        """
+        Ставит фигуру игрока в клетку.
+        :param cell: номер клетки
+        :param player: 'X' или 'O'
+        """
+        if player == X:
+            self.x |= 1 << cell
+        else:
+            self.o |= 1 << cell
+
+    def unmake(self, cell):
+        """
+        Убирает фигуру из клетки (отмена хода).
+        :param cell: номер клетки
+        """
+        bit = ~(1 << cell)
+        self.x &= bit
+        self.o &= bit
+
+    def legal_moves(self):
+        """
+        Свободные клетки по возрастанию номера.
+        """
+        if self.geo.is_classic:
+            return MOVES_TABLE[self.x | self.o]
+        return cells_of(self.geo.full & ~(self.x | self.o))
+
+    def is_win(self, player):
+        """
+        Проверяет, собрал ли игрок линию.
+        :param player: 'X' или 'O'
+        :return: True, если есть победа
+        """
+        mask = self.x if player == X else self.o
+        if self.geo.is_classic:
+            return WIN_TABLE[mask]
+        return self.geo.win_start(mask) is not None
+
+    def wins_through(self, cell, player):
+        """
+        Есть ли у игрока линия через клетку: проверяются только линии,
+        проходящие через неё (удобно сразу после хода в эту клетку).
+        """
+        mask = self.x if player == X else self.o
+        for line in self.geo.cell_lines[cell]:
+            if mask & line == line:
+                return True
+        return False
+
+    def winning_line(self, player):
+        """
+        Выигрышная линия игрока.
+        :param player: 'X' или 'O'
+        :return: список (row, col) или None
+        """
+        mask = self.x if player == X else self.o
+        found = self.geo.win_start(mask)
+        if found is None:
+            return None
+        start, step = found
+        return [self.row_col(start + i * step) for i in range(self.geo.win_length)]
+
+    def is_full(self):
+        return self.x | self.o == self.geo.full
+
+    def winner(self):
+        """
+        Победитель позиции.
+        :return: 'X', 'O' или None
+        """
+        if self.is_win(X):
+            return X
+        if self.is_win(O):
+            return O
+        return None
+
+    def is_terminal(self):
+        return self.is_win(X) or self.is_win(O) or self.x | self.o == self.geo.full
+
+    def __eq__(self, other):
+        return (isinstance(other, Board) and self.x == other.x and self.o == other.o
+                and self.geo is other.geo)
+
+    def __hash__(self):
+        return hash((self.x, self.o))
+
+    def __repr__(self):
+        rows = []
+        for row in range(self.cells // self.size):
+            rows.append("".join(self.get(row, col) or "." for col in range(self.size)))
+        return "Board(%s)" % "/".join(rows)
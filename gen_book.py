@@ -0,0 +1,47 @@
+"""
+Генерирует book.bin — лучший ход для каждой достижимой позиции 3×3.
+
+Запуск: python gen_book.py [путь]
+"""
+
+import sys
+
+import book
+import engine
+import solver
+
+
+def generate():
+    """
+    Обходит все достижимые позиции и записывает ход решателя для каждой нетерминальной.
+    :return: (ходы — bytearray длиной book.ENTRIES, число обойдённых позиций)
+    """
+    moves = bytearray([book.NO_MOVE]) * book.ENTRIES
+    seen = set()
+    stack = [engine.Board()]
+    while stack:
+        board = stack.pop()
+        key = (board.x, board.o)
+        if key in seen:
+            continue
+        seen.add(key)
+        if board.is_terminal():
+            continue
+        moves[book.index(board)] = solver.best_move(board)
+        player = board.to_move
+        for cell in board.legal_moves():
+            child = board.copy()
+            child.make(cell, player)
+            stack.append(child)
+    return moves, len(seen)
+
+
+def main(path=book.DEFAULT_PATH):
+    moves, positions = generate()
+    with open(path, "wb") as f:
+        f.write(book.pack(moves))
+    print(f"{path}: {positions} позиций, {book.HEADER.size + len(moves)} байт")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -1,5 +1,12 @@
-import tkinter as tk
-import random
+import time
+
+import ai
+import book
+import engine
+import records
+import store
+import worker
+from stats import SearchStats
 
 # Цвета для современного оформления
 BG_COLOR = "#222831"         # Цвет фона окна
@@ -9,15 +16,54 @@ X_COLOR = "#f38181"         # Цвет крестика
 O_COLOR = "#fce38a"         # Цвет нолика
 LABEL_COLOR = "#eeeeee"     # Цвет текста
 
+AI_TIME_LIMIT = 0.2  # Бюджет компьютера на ход для больших полей, секунды
+AI_DELAY = 400  # Минимальная пауза перед ходом компьютера, мс (0 — без паузы)
+AI_POLL_INTERVAL = 15  # Период опроса фонового поиска, мс
+
+tk = None  # Модуль tkinter; импортируется при создании окна, чтобы логика игры работала без Tk
+
+
+def load_tk():
+    """
+    Импортирует tkinter при первом обращении.
+    :return: модуль tkinter
+    """
+    global tk
+    if tk is None:
+        import tkinter
+        tk = tkinter
+    return tk
+
+
+def run_gui():
+    """
+    Загружает таблицу ходов, создаёт окно и запускает игру.
+    """
+    load_tk()
+    book.load()
+    root = tk.Tk()
+    game = TicTacToe(root)
+    root.mainloop()
+    game.close()
+
 class TicTacToe:
     """
     Класс реализует игру Крестики-Нолики с графическим интерфейсом на tkinter.
     Поддерживаются два режима: два игрока и игра против компьютера с выбором сложности.
     """
-    def __init__(self, root):
+    def __init__(self, root, size=3, win_length=3, ai_delay=AI_DELAY, debug=False,
+                 log_path=records.DEFAULT_PATH, store_path=store.DEFAULT_PATH, profile=None):
         """
         Инициализация главного окна и стартового состояния игры.
+        :param size: размер поля
+        :param win_length: сколько фигур в ряд нужно для победы
+        :param ai_delay: минимальная пауза перед ходом компьютера, мс (0 — без паузы)
+        :param debug: показывать отладочную панель со статистикой поиска (переключается F3)
+        :param log_path: файл журнала партий (None — партии не записываются)
+        :param store_path: файл хранилища итогов и недоигранной партии (None — не сохранять)
+        :param profile: имя профиля (по умолчанию — имя пользователя системы)
         """
+        load_tk()
         self.status_label = None
         self.restart_button = None
         self.menu_button = None
@@ -27,19 +73,59 @@ class TicTacToe:
         self.root.configure(bg=BG_COLOR)
         self.mode = None  # Режим игры: 'human' или 'ai'
         self.ai_level = None  # Уровень сложности: 'easy' или 'hard'
+        self.size = size  # Размер поля
+        self.win_length = win_length  # Длина линии для победы
         self.current_player = "X"  # Текущий игрок
-        self.board = [[None for _ in range(3)] for _ in range(3)]  # Игровое поле
-        self.buttons = [[None for _ in range(3)] for _ in range(3)]  # Кнопки поля
+        self.board = engine.Board(size=size, win_length=win_length)  # Игровое поле (битборды)
+        self.buttons = []  # Кнопки поля
         self.game_over = False  # Флаг окончания игры
+        self.ai_delay = ai_delay  # Минимальная пауза перед ходом компьютера, мс
+        self.ai_worker = worker.AIWorker()  # Фоновый поток для поиска хода
+        self.ai_token = None  # Токен отмены текущего поиска
+        self.ai_started = 0.0  # Время запуска текущего поиска
+        self.debug_overlay = debug  # Выключенная панель ничего не замеряет
+        self.last_stats = None  # SearchStats последнего хода компьютера
+        self.game_log = records.GameLog(log_path) if log_path else None  # Журнал партий
+        self.moves = []  # Ходы текущей партии (номера клеток)
+        self.game_started = 0  # Время начала текущей партии
+        self.game_saved = True  # Текущая партия уже записана в журнал
+        self.store = store.open_store(store_path, profile) if store_path else None  # Итоги профиля
+        self.debug_label = None
+        self.screens = {}  # Экраны, созданные один раз: 'mode', 'ai_level', 'game'
+        self.current_screen = None  # Имя показанного экрана
+        self.boards = {}  # Поля по размеру: size -> (рамка, кнопки)
+        self.board_frame = None  # Показанное поле
+        self.changed_cells = set()  # Клетки, изменённые с начала партии
+        self.root.bind("<F3>", self.toggle_debug_overlay)
+        self.create_screens()
         self.create_mode_selection()  # Показываем меню выбора режима
+        self.resume_game()  # Недоигранная партия прошлого запуска продолжается
 
-    def create_mode_selection(self):
+    def create_screens(self):
         """
-        Отображает меню выбора режима игры.
+        Создаёт все экраны один раз; дальше они только переключаются.
+        """
+        self.screens["mode"] = self.create_mode_frame()
+        self.screens["ai_level"] = self.create_ai_level_frame()
+        self.screens["game"] = self.create_widgets()
+
+    def show_screen(self, name):
+        """
+        Показывает экран, скрывая текущий через pack_forget.
+        :param name: имя экрана из self.screens
+        """
+        if self.current_screen == name:
+            return
+        if self.current_screen is not None:
+            self.screens[self.current_screen].pack_forget()
+        self.screens[name].pack(pady=0 if name == "game" else 40)
+        self.current_screen = name
+
+    def create_mode_frame(self):
+        """
+        Создаёт меню выбора режима игры.
         """
-        self.clear_window()
         frame = tk.Frame(self.root, bg=BG_COLOR)
-        frame.pack(pady=40)
         label = tk.Label(frame, text="Выберите режим игры", font=("Arial", 18, "bold"), bg=BG_COLOR, fg=LABEL_COLOR)
         label.pack(pady=10)
         # Кнопка для режима "два игрока"
@@ -48,14 +134,42 @@ class TicTacToe:
         # Кнопка для режима "с компьютером" (открывает выбор сложности)
         btn2 = tk.Button(frame, text="С компьютером", font=("Arial", 16), bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, width=15, command=self.create_ai_level_selection)
         btn2.pack(pady=5)
+        # Кнопка выбора варианта поля (переключает варианты по кругу)
+        self.variant_button = tk.Button(frame, text=self.get_variant_name(), font=("Arial", 12), bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, width=20, command=self.next_variant)
+        self.variant_button.pack(pady=15)
+        return frame
 
-    def create_ai_level_selection(self):
+    def create_mode_selection(self):
         """
-        Отображает меню выбора уровня сложности для игры с компьютером.
+        Отображает меню выбора режима игры.
+        """
+        self.cancel_ai_move()  # Выход в меню прерывает незаконченный поиск
+        self.save_game()
+        self.show_screen("mode")
+
+    def next_variant(self):
+        """
+        Переключает размер поля и длину линии на следующий вариант из engine.VARIANTS.
+        """
+        variants = list(engine.VARIANTS)
+        current = (self.size, self.win_length)
+        index = variants.index(current) + 1 if current in variants else 0
+        self.size, self.win_length = variants[index % len(variants)]
+        self.variant_button["text"] = self.get_variant_name()
+
+    def get_variant_name(self):
+        """
+        Подпись текущего варианта поля.
+        """
+        if self.size == self.win_length:
+            return f"Поле: {self.size}×{self.size}"
+        return f"Поле: {self.size}×{self.size}, {self.win_length} в ряд"
+
+    def create_ai_level_frame(self):
+        """
+        Создаёт меню выбора уровня сложности для игры с компьютером.
         """
-        self.clear_window()
         frame = tk.Frame(self.root, bg=BG_COLOR)
-        frame.pack(pady=40)
         label = tk.Label(frame, text="Выберите уровень сложности", font=("Arial", 18, "bold"), bg=BG_COLOR, fg=LABEL_COLOR)
         label.pack(pady=10)
         btn_easy = tk.Button(frame, text="Лёгкий", font=("Arial", 16), bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, width=15, command=lambda: self.start_ai_game("easy"))
@@ -64,6 +178,13 @@ class TicTacToe:
         btn_hard.pack(pady=5)
         btn_back = tk.Button(frame, text="Назад", font=("Arial", 12), bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, width=10, command=self.create_mode_selection)
         btn_back.pack(pady=10)
+        return frame
+
+    def create_ai_level_selection(self):
+        """
+        Отображает меню выбора уровня сложности для игры с компьютером.
+        """
+        self.show_screen("ai_level")
 
     def start_ai_game(self, level):
         """
@@ -77,43 +198,104 @@ class TicTacToe:
         Запускает игру в выбранном режиме.
         :param mode: 'human' или 'ai'
         """
+        self.save_game()
         self.mode = mode
         self.current_player = "X"
-        self.board = [[None for _ in range(3)] for _ in range(3)]
+        self.board = engine.Board(size=self.size, win_length=self.win_length)
         self.game_over = False
-        self.clear_window()
-        self.create_widgets()
-
-    def clear_window(self):
-        """
-        Очищает все виджеты из главного окна.
-        """
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.new_record()
+        if self.store is not None:
+            self.store.clear_game()
+        self.reset_cells()  # Очищаем прошлую партию до смены поля
+        self.show_board()
+        self.status_label["text"] = "Ходит: X"
+        self.show_screen("game")
 
     def create_widgets(self):
         """
-        Создаёт игровое поле, статус и кнопки управления.
+        Создаёт экран игры: место для поля, статус и кнопки управления.
         """
         frame = tk.Frame(self.root, bg=BG_COLOR)
-        frame.pack()
-        for i in range(3):
-            for j in range(3):
-                # Создаём кнопку для каждой клетки поля
-                btn = tk.Button(frame, text="", font=("Arial", 40, "bold"), width=5, height=2,
-                                bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE,
-                                command=lambda row=i, col=j: self.on_click(row, col))
-                btn.grid(row=i, column=j, padx=3, pady=3)
-                self.buttons[i][j] = btn
+        # Рамка, в которой показывается поле текущего размера
+        self.board_holder = tk.Frame(frame, bg=BG_COLOR)
+        self.board_holder.pack()
         # Статус текущего игрока
-        self.status_label = tk.Label(self.root, text="Ходит: X", font=("Arial", 16), bg=BG_COLOR, fg=LABEL_COLOR)
+        self.status_label = tk.Label(frame, text="Ходит: X", font=("Arial", 16), bg=BG_COLOR, fg=LABEL_COLOR)
         self.status_label.pack(pady=10)
         # Кнопка перезапуска
-        self.restart_button = tk.Button(self.root, text="Перезапустить", font=("Arial", 14), bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, command=self.restart)
+        self.restart_button = tk.Button(frame, text="Перезапустить", font=("Arial", 14), bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, command=self.restart)
         self.restart_button.pack(pady=5)
         # Кнопка возврата в меню
-        self.menu_button = tk.Button(self.root, text="В меню", font=("Arial", 12), bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, command=self.create_mode_selection)
+        self.menu_button = tk.Button(frame, text="В меню", font=("Arial", 12), bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, command=self.create_mode_selection)
         self.menu_button.pack(pady=5)
+        # Отладочная панель (показывается, только если включена)
+        self.debug_label = tk.Label(frame, text="", font=("Courier", 10), bg=BG_COLOR, fg=BTN_ACTIVE)
+        if self.debug_overlay:
+            self.debug_label.pack(pady=5)
+        return frame
+
+    def create_board(self, size):
+        """
+        Создаёт поле size×size.
+        :return: (рамка, кнопки по строкам)
+        """
+        frame = tk.Frame(self.board_holder, bg=BG_COLOR)
+        # Клетки уменьшаются пропорционально размеру поля
+        scale = 3 / size
+        font_size = max(8, int(40 * scale))
+        width = max(2, round(5 * scale))
+        height = 2 if size <= 3 else 1
+        pad = 3 if size <= 5 else 1
+        buttons = [[None for _ in range(size)] for _ in range(size)]
+        for i in range(size):
+            for j in range(size):
+                # Создаём кнопку для каждой клетки поля
+                btn = tk.Button(frame, text="", font=("Arial", font_size, "bold"), width=width, height=height,
+                                bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE,
+                                command=lambda row=i, col=j: self.on_click(row, col))
+                btn.grid(row=i, column=j, padx=pad, pady=pad)
+                buttons[i][j] = btn
+        return frame, buttons
+
+    def show_board(self):
+        """
+        Показывает поле текущего размера; оно строится при первой партии на нём.
+        """
+        if self.size not in self.boards:
+            self.boards[self.size] = self.create_board(self.size)
+        frame, self.buttons = self.boards[self.size]
+        if frame is not self.board_frame:
+            if self.board_frame is not None:
+                self.board_frame.pack_forget()
+            frame.pack()
+            self.board_frame = frame
+
+    def reset_cells(self):
+        """
+        Очищает только клетки, изменённые за партию.
+        """
+        for i, j in self.changed_cells:
+            self.buttons[i][j].config(text="", bg=BTN_COLOR, fg=LABEL_COLOR)
+        self.changed_cells.clear()
+
+    def toggle_debug_overlay(self, event=None):
+        """
+        Включает или выключает отладочную панель статистики поиска.
+        """
+        self.debug_overlay = not self.debug_overlay
+        if self.debug_label is None:
+            return
+        if self.debug_overlay:
+            self.debug_label.pack(pady=5)
+        else:
+            self.debug_label.pack_forget()
+
+    def show_debug(self, text):
+        """
+        Выводит строку статистики на отладочную панель.
+        """
+        if self.debug_label is not None:
+            self.debug_label["text"] = text
 
     def on_click(self, row, col):
         """
@@ -121,14 +303,16 @@ class TicTacToe:
         :param row: строка
         :param col: столбец
         """
-        if self.game_over or self.board[row][col] is not None:
+        if self.game_over or self.board.get(row, col) is not None:
             return  # Игнорируем, если игра окончена или клетка занята
+        if self.mode == "ai" and self.current_player == "O":
+            return  # Компьютер ещё думает
         self.make_move(row, col, self.current_player)
         if self.game_over:
             return
         # Если режим с компьютером и сейчас ход O, запускаем AI
         if self.mode == "ai" and self.current_player == "O":
-            self.root.after(400, self.ai_move)
+            self.ai_move()
 
     def make_move(self, row, col, player):
         """
@@ -137,113 +321,237 @@ class TicTacToe:
         :param col: столбец
         :param player: 'X' или 'O'
         """
-        self.board[row][col] = player
-        self.buttons[row][col]["text"] = player
-        self.buttons[row][col]["fg"] = X_COLOR if player == "X" else O_COLOR
+        started = time.perf_counter() if self.debug_overlay else 0.0
+        self.board.make(self.board.cell_of(row, col), player)
+        self.moves.append(self.board.cell_of(row, col))
+        self.buttons[row][col].config(text=player, fg=X_COLOR if player == "X" else O_COLOR)
+        self.changed_cells.add((row, col))
         if self.check_winner(player):
             self.status_label["text"] = f"Победил: {player}!"
             self.game_over = True
+            self.winning_cells = self.board.winning_line(player)
             self.highlight_winner(player)
-        elif all(all(cell is not None for cell in row) for row in self.board):
+        elif self.board.is_full():
             self.status_label["text"] = "Ничья!"
             self.game_over = True
         else:
             self.current_player = "O" if self.current_player == "X" else "X"
             self.status_label["text"] = f"Ходит: {self.current_player}"
+        if self.game_over:
+            self.save_game()
+            self.store_result(player if self.board.winner() else None)
+        else:
+            self.store_position()
+        if self.debug_overlay:
+            # Время обновления окна отделяет задержки интерфейса от времени поиска
+            ui_time = time.perf_counter() - started
+            if self.last_stats is not None and player == "O" and self.mode == "ai":
+                self.last_stats.ui_time = ui_time
+                self.show_debug(self.last_stats.summary())
+            else:
+                self.show_debug(f"{player}: окно {ui_time * 1000:.2f} мс")
 
     def ai_move(self):
         """
-        Делает ход компьютера в зависимости от выбранного уровня сложности.
+        Запускает поиск хода компьютера в фоновом потоке и начинает опрос результата.
         """
         if self.game_over:
             return
-        if self.ai_level == "hard":
-            move = self.find_best_move()
-            if move:
-                row, col = move
-            else:
-                empty = [(i, j) for i in range(3) for j in range(3) if self.board[i][j] is None]
-                row, col = random.choice(empty)
+        self.ai_started = time.perf_counter()
+        self.last_stats = SearchStats() if self.debug_overlay else None
+        self.ai_token = self.ai_worker.submit(self.compute_ai_move, self.board.copy(),
+                                              stats=self.last_stats)
+        self.root.after(AI_POLL_INTERVAL, self.poll_ai_move, self.ai_token)
+
+    def poll_ai_move(self, token):
+        """
+        Проверяет, готов ли ход компьютера; если нет — опрашивает снова через after().
+        :param token: токен поиска, результат которого ожидается
+        """
+        if token is not self.ai_token:
+            return  # Поиск отменён перезапуском или выходом в меню
+        ready, cell = self.ai_worker.poll(token)
+        if not ready:
+            self.root.after(AI_POLL_INTERVAL, self.poll_ai_move, token)
+            return
+        # Пауза дополняет время поиска до ai_delay, а не добавляется к нему
+        remaining = self.ai_delay - int((time.perf_counter() - self.ai_started) * 1000)
+        if remaining > 0:
+            self.root.after(remaining, self.finish_ai_move, token, cell)
         else:
-            empty = [(i, j) for i in range(3) for j in range(3) if self.board[i][j] is None]
-            row, col = random.choice(empty)
+            self.finish_ai_move(token, cell)
+
+    def finish_ai_move(self, token, cell):
+        """
+        Делает найденный ход компьютера, если поиск не был отменён.
+        """
+        if token is not self.ai_token:
+            return
+        self.ai_token = None
+        row, col = self.board.row_col(cell)
         self.make_move(row, col, "O")
 
-    def find_best_move(self):
+    def cancel_ai_move(self):
         """
-        Находит лучший ход для компьютера (выиграть или заблокировать игрока).
+        Отменяет текущий поиск хода компьютера, если он идёт.
+        """
+        if self.ai_token is not None:
+            self.ai_token.cancel()
+            self.ai_token = None
+
+    def compute_ai_move(self, board, cancel=None, stats=None):
+        """
+        Выбирает ход компьютера в зависимости от уровня сложности.
+        Выполняется в фоновом потоке на копии доски.
+        :param stats: SearchStats для отладочной панели или None
+        :return: номер клетки
+        """
+        if self.ai_level == "hard":
+            move = self.find_best_move(board, cancel, stats)
+            if move:
+                return board.cell_of(*move)
+        return ai.easy_move(board, stats=stats)
+
+    def find_best_move(self, board=None, cancel=None, stats=None):
+        """
+        Находит лучший ход для компьютера по таблице идеальных ходов (book.bin).
+        Если таблица недоступна, ход ищется полным перебором. На больших полях
+        ход ищется альфа-бета поиском в пределах AI_TIME_LIMIT.
+        :param board: доска (по умолчанию — текущая)
+        :param cancel: worker.CancelToken для досрочной остановки поиска
+        :param stats: SearchStats для счётчиков поиска или None
         :return: (row, col) или None
         """
-        # 1. Попробовать выиграть
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] is None:
-                    self.board[i][j] = "O"
-                    if self.check_winner("O"):
-                        self.board[i][j] = None
-                        return (i, j)
-                    self.board[i][j] = None
-        # 2. Заблокировать игрока
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] is None:
-                    self.board[i][j] = "X"
-                    if self.check_winner("X"):
-                        self.board[i][j] = None
-                        return (i, j)
-                    self.board[i][j] = None
-        # 3. Нет критических ходов
-        return None
+        board = board or self.board
+        move = ai.hard_move(board, time_limit=AI_TIME_LIMIT, cancel=cancel, stats=stats)
+        if move is None:
+            return None
+        return board.row_col(move)
 
     def check_winner(self, player):
         """
-        Проверяет, выиграл ли указанный игрок.
+        Проверяет, выиграл ли указанный игрок (битовая проверка по таблице линий).
         :param player: 'X' или 'O'
         :return: True, если есть победа
         """
-        for i in range(3):
-            # Проверка строк
-            if all(self.board[i][j] == player for j in range(3)):
-                self.winning_cells = [(i, j) for j in range(3)]
-                return True
-            # Проверка столбцов
-            if all(self.board[j][i] == player for j in range(3)):
-                self.winning_cells = [(j, i) for j in range(3)]
-                return True
-        # Проверка главной диагонали
-        if all(self.board[i][i] == player for i in range(3)):
-            self.winning_cells = [(i, i) for i in range(3)]
-            return True
-        # Проверка побочной диагонали
-        if all(self.board[i][2 - i] == player for i in range(3)):
-            self.winning_cells = [(i, 2 - i) for i in range(3)]
-            return True
-        return False
+        return self.board.is_win(player)
 
     def highlight_winner(self, player):
         """
         Подсвечивает выигрышную линию.
         """
-        for i, j in getattr(self, 'winning_cells', []):
+        for i, j in self.winning_cells or []:
             self.buttons[i][j]["bg"] = BTN_ACTIVE
 
+    def new_record(self):
+        """
+        Начинает запись ходов новой партии.
+        """
+        self.moves = []
+        self.game_started = time.time()
+        self.game_saved = False
+
+    def save_game(self):
+        """
+        Дописывает текущую партию в журнал, если она ещё не записана.
+        Недоигранная партия сохраняется при перезапуске, выходе в меню или закрытии окна,
+        если её не продолжит хранилище (см. close).
+        """
+        if self.game_saved:
+            return
+        self.game_saved = True
+        if self.game_log is None or not self.moves:
+            return
+        difficulty = self.ai_level if self.mode == "ai" else None
+        self.game_log.append(records.GameRecord(
+            self.mode, difficulty, self.board.size, self.board.win_length,
+            records.result_of(self.board), self.game_started, time.time(), self.moves))
+
+    def close_log(self):
+        """
+        Сохраняет текущую партию и сбрасывает буфер журнала на диск.
+        """
+        self.save_game()
+        if self.game_log is not None:
+            self.game_log.close()
+
+    def close(self):
+        """
+        Закрывает журнал и хранилище при выходе.
+        Недоигранную партию хранит хранилище: она продолжится при следующем запуске
+        и попадёт в журнал один раз, целиком.
+        """
+        if self.store is not None and self.mode in ("human", "ai") and not self.game_over:
+            self.game_saved = True
+        self.close_log()
+        if self.store is not None:
+            self.store.close()
+
+    def store_position(self):
+        """
+        Сохраняет недоигранную партию в хранилище (запись — в фоновом потоке).
+        """
+        if self.store is None or self.mode not in ("human", "ai"):
+            return
+        difficulty = self.ai_level if self.mode == "ai" else None
+        self.store.save_game(self.mode, difficulty, None, self.board.size, self.board.win_length,
+                             self.moves, self.game_started)
+
+    def store_result(self, winner):
+        """
+        Записывает итог партии в профиль; в игре вдвоём итог считается за крестики.
+        :param winner: 'X', 'O' или None при ничьей
+        """
+        if self.store is None or self.mode not in ("human", "ai"):
+            return
+        if winner is None:
+            outcome = store.DRAW
+        else:
+            outcome = store.WIN if winner == "X" else store.LOSS
+        difficulty = self.ai_level if self.mode == "ai" else None
+        self.store.add_result(self.mode, difficulty, self.board.size, self.board.win_length, outcome)
+        self.store.clear_game()
+
+    def resume_game(self):
+        """
+        Продолжает недоигранную партию прошлого запуска с того же хода.
+        Партии вариантов и уровней, которых нет в этом окне, не продолжаются.
+        """
+        saved = self.store.saved_game if self.store is not None else None
+        if saved is None or saved.mode not in ("human", "ai") or not saved.moves:
+            return
+        if saved.dims != 2 or (saved.size, saved.win_length) not in engine.VARIANTS or (
+                saved.mode == "ai" and saved.difficulty not in ("easy", "hard")):
+            return
+        self.size, self.win_length = saved.size, saved.win_length
+        self.variant_button["text"] = self.get_variant_name()
+        self.ai_level = saved.difficulty
+        self.start_game(saved.mode)
+        self.game_started = saved.started
+        for cell in saved.moves:
+            if self.game_over or cell >= self.board.cells or not self.board.is_empty(cell):
+                break
+            row, col = self.board.row_col(cell)
+            self.make_move(row, col, self.current_player)
+        if self.mode == "ai" and self.current_player == "O" and not self.game_over:
+            self.ai_move()
+
     def restart(self):
         """
         Перезапускает игру, очищая поле и сбрасывая статус.
         """
+        self.save_game()
+        self.cancel_ai_move()
         self.current_player = "X"
-        self.board = [[None for _ in range(3)] for _ in range(3)]
+        self.board = engine.Board(size=self.size, win_length=self.win_length)
         self.game_over = False
-        for i in range(3):
-            for j in range(3):
-                btn = self.buttons[i][j]
-                btn["text"] = ""
-                btn["bg"] = BTN_COLOR
-                btn["fg"] = LABEL_COLOR
+        self.new_record()
+        if self.store is not None:
+            self.store.clear_game()
+        self.reset_cells()
         self.status_label["text"] = "Ходит: X"
 
 if __name__ == "__main__":
-    # Точка входа: создаём окно и запускаем игру
-    root = tk.Tk()
-    game = TicTacToe(root)
-    root.mainloop()
+    # Точка входа: окно, партия компьютер против компьютера (--match) или консоль (--repl)
+    import cli
+    cli.main(run_gui)
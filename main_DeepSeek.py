@@ -1,5 +1,16 @@
-import tkinter as tk
-import random
+import collections
+import time
+
+import ai
+import book
+import engine
+import records
+import store
+import worker
+from stats import SearchStats
+
+tk = None  # tkinter импортируется при создании окна, см. load_tk
+analysis = None  # Анализатор импортируется при первой подсказке или разборе, см. load_analysis
 
 BG_COLOR = "#222831"
 BTN_COLOR = "#393e46"
@@ -7,102 +18,370 @@ BTN_ACTIVE = "#00adb5"
 X_COLOR = "#f38181"
 O_COLOR = "#fce38a"
 LABEL_COLOR = "#eeeeee"
+HINT_COLOR = "#3e7c59"
+
+AI_TIME_LIMIT = 0.2  # Бюджет сложного ИИ на ход для больших полей, секунды
+AI_DELAY = 400  # Минимальная пауза перед ходом компьютера, мс (0 — без паузы)
+AI_POLL_INTERVAL = 15  # Период опроса фонового поиска, мс
+NET_POLL_INTERVAL = 30  # Период опроса сообщений сервера, мс
+REPLAY_GAMES = 100  # Сколько последних партий доступно в повторе
+
+def load_tk():
+    global tk
+    if tk is None:
+        import tkinter
+        tk = tkinter
+    return tk
+
+
+def load_analysis():
+    global analysis
+    if analysis is None:
+        import analysis as module
+        analysis = module
+    return analysis
+
+
+def run_gui():
+    load_tk()
+    book.load()
+    root = tk.Tk()
+    game = TicTacToe(root)
+    root.mainloop()
+    game.close()
+
 
 class TicTacToe:
-    def __init__(self, root):
+    def __init__(self, root, size=3, win_length=3, ai_delay=AI_DELAY,
+                 server_address=None, debug=False,
+                 log_path=records.DEFAULT_PATH, store_path=store.DEFAULT_PATH, profile=None):
+        load_tk()
         self.root = root
         self.root.title("Крестики-Нолики")
         self.root.configure(bg=BG_COLOR)
         self.mode = None
         self.difficulty = None
+        self.size = size
+        self.win_length = win_length
+        self.dims = 2  # 3 — куб, слои которого показываются рядом
         self.current_player = "X"
-        self.board = [[None for _ in range(3)] for _ in range(3)]
-        self.buttons = [[None for _ in range(3)] for _ in range(3)]
+        self.board = engine.Board(size=size, win_length=win_length)
+        self.buttons = []
         self.game_over = False
+        self.winning_cells = None
+        self.ai_delay = ai_delay
+        self.ai_worker = worker.AIWorker()
+        self.ai_token = None
+        self.ai_started = 0.0
+        self.strength = ai.DEFAULT_STRENGTH  # Сила настраиваемого уровня
+        # Подсказки и разбор партии: оценки ходов считаются заранее в своём потоке
+        self.analyzer = None  # analysis.analyzer, см. load_analysis
+        self.analysis_worker = worker.AIWorker()
+        self.analysis_token = None
+        self.hint_token = None
+        self.hint_cell = None
+        self.server_address = server_address  # None — адрес по умолчанию из client
+        self.net = None
+        self.network_mark = None
+        # Журнал партий (None — не записывать) и ходы текущей партии
+        self.log_path = log_path
+        self.game_log = records.GameLog(log_path) if log_path else None
+        self.moves = []
+        self.game_started = 0
+        self.game_saved = True
+        self.replays = []
+        self.replay_index = 0
+        self.replay_move = 0
+        # Профиль, итоги и недоигранная партия (None — не сохранять)
+        self.store = store.open_store(store_path, profile) if store_path else None
+        # Отладочная панель со статистикой поиска (F3); выключенная ничего не замеряет
+        self.debug_overlay = debug
+        self.last_stats = None
+        self.debug_label = None
+        # Экраны и поля создаются один раз и дальше только переключаются
+        self.screens = {}
+        self.current_screen = None
+        self.boards = {}  # (размер поля, размерность) -> (рамка, кнопки)
+        self.board_frame = None
+        self.changed_cells = set()  # Клетки, изменённые с начала партии
+        self.disabled_cells = set()  # Свободные клетки, выключенные на ход соперника
+        self.root.bind("<F3>", self.toggle_debug_overlay)
+        self.create_screens()
         self.create_mode_selection()
+        self.resume_game()
 
-    def create_mode_selection(self):
-        self.clear_window()
+    def create_screens(self):
+        self.screens["mode"] = self.create_mode_frame()
+        self.screens["difficulty"] = self.create_difficulty_frame()
+        self.screens["game"] = self.create_widgets()
+        self.screens["analysis"] = self.create_analysis_frame()
+
+    def show_screen(self, name):
+        if self.current_screen == name:
+            return
+        if self.current_screen is not None:
+            self.screens[self.current_screen].pack_forget()
+        self.screens[name].pack(pady=0 if name == "game" else 40)
+        self.current_screen = name
+
+    def create_mode_frame(self):
         frame = tk.Frame(self.root, bg=BG_COLOR)
-        frame.pack(pady=40)
         label = tk.Label(frame, text="Выберите режим игры", font=("Arial", 18, "bold"), bg=BG_COLOR, fg=LABEL_COLOR)
         label.pack(pady=10)
+        self.summary_label = tk.Label(frame, text="", font=("Arial", 11), bg=BG_COLOR, fg=LABEL_COLOR)
+        self.summary_label.pack()
         btn1 = tk.Button(frame, text="Два игрока", font=("Arial", 16), bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, width=15, command=lambda: self.start_game("human"))
         btn1.pack(pady=5)
         btn2 = tk.Button(frame, text="С компьютером", font=("Arial", 16), bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, width=15, command=self.create_difficulty_selection)
         btn2.pack(pady=5)
+        btn3 = tk.Button(frame, text="По сети", font=("Arial", 16), bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, width=15, command=self.start_network_game)
+        btn3.pack(pady=5)
+        btn4 = tk.Button(frame, text="Повтор партий", font=("Arial", 16), bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, width=15, command=self.start_replay)
+        btn4.pack(pady=5)
+        self.menu_status = tk.Label(frame, text="", font=("Arial", 11), bg=BG_COLOR, fg=X_COLOR)
+        self.menu_status.pack()
+        self.variant_button = tk.Button(frame, text=self.get_variant_name(), font=("Arial", 12), bg=BTN_COLOR, fg=LABEL_COLOR,
+                                        activebackground=BTN_ACTIVE, width=20, command=self.next_variant)
+        self.variant_button.pack(pady=15)
+        return frame
 
-    def create_difficulty_selection(self):
-        self.clear_window()
+    def create_mode_selection(self):
+        self.cancel_ai_move()
+        self.close_network()
+        self.save_game()
+        self.menu_status["text"] = ""
+        self.update_summary()
+        self.show_screen("mode")
+
+    def next_variant(self):
+        variants = [(size, win, 2) for size, win in engine.VARIANTS]
+        variants += [(size, win, 3) for size, win in engine.CUBE_VARIANTS]
+        current = (self.size, self.win_length, self.dims)
+        index = variants.index(current) + 1 if current in variants else 0
+        self.size, self.win_length, self.dims = variants[index % len(variants)]
+        self.variant_button["text"] = self.get_variant_name()
+
+    def get_variant_name(self):
+        if self.dims == 3:
+            name = f"Куб: {self.size}×{self.size}×{self.size}"
+            return name if self.size == self.win_length else f"{name}, {self.win_length} в ряд"
+        if self.size == self.win_length:
+            return f"Поле: {self.size}×{self.size}"
+        return f"Поле: {self.size}×{self.size}, {self.win_length} в ряд"
+
+    def create_difficulty_frame(self):
         frame = tk.Frame(self.root, bg=BG_COLOR)
-        frame.pack(pady=40)
         label = tk.Label(frame, text="Выберите сложность", font=("Arial", 18, "bold"), bg=BG_COLOR, fg=LABEL_COLOR)
         label.pack(pady=10)
         
         difficulties = [
             ("Легкий", "easy"),
             ("Средний", "medium"),
-            ("Сложный", "hard")
+            ("Сложный", "hard"),
+            ("Монте-Карло", "mcts"),
+            ("Движок", "engine"),
+            ("Настраиваемый", "tuned")
         ]
         
+        self.difficulty_buttons = {}
         for text, diff in difficulties:
             btn = tk.Button(frame, text=text, font=("Arial", 16), bg=BTN_COLOR, fg=LABEL_COLOR, 
                            activebackground=BTN_ACTIVE, width=15,
                            command=lambda d=diff: self.start_game("ai", d))
             btn.pack(pady=5)
+            self.difficulty_buttons[diff] = btn
+        # 0 — как средний уровень, 100 — как сложный
+        self.strength_scale = tk.Scale(frame, from_=0, to=100, orient=tk.HORIZONTAL, length=200,
+                                       label="Сила настраиваемого, %", font=("Arial", 11),
+                                       bg=BG_COLOR, fg=LABEL_COLOR, highlightthickness=0)
+        self.strength_scale.set(int(ai.DEFAULT_STRENGTH * 100))
+        self.strength_scale.pack(pady=5)
+        return frame
+
+    def create_difficulty_selection(self):
+        # На кубе доступны только уровни из ai.CUBE_LEVELS
+        for diff, btn in self.difficulty_buttons.items():
+            btn["state"] = tk.NORMAL if self.dims == 2 or diff in ai.CUBE_LEVELS else tk.DISABLED
+        self.show_screen("difficulty")
 
     def start_game(self, mode, difficulty=None):
+        self.save_game()
         self.mode = mode
         self.difficulty = difficulty
+        if difficulty == "tuned":
+            self.strength = self.strength_scale.get() / 100
         self.current_player = "X"
-        self.board = [[None for _ in range(3)] for _ in range(3)]
+        self.board = engine.Board(size=self.size, win_length=self.win_length, dims=self.dims)
         self.game_over = False
-        self.clear_window()
-        self.create_widgets()
-
-    def clear_window(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.new_record()
+        if self.store is not None:
+            self.store.clear_game()
+        self.reset_cells()
+        self.show_board()
+        self.replay_controls.pack_forget()
+        # Подсказки в сетевой игре были бы нечестны, а анализ куба не поддерживается
+        if mode == "network" or self.dims == 3:
+            self.analysis_controls.pack_forget()
+        else:
+            self.analysis_controls.pack(pady=5, before=self.restart_button)
+        self.review_button["state"] = tk.DISABLED
+        self.mode_label["text"] = self.get_mode_text()
+        self.status_label["text"] = "Ходит: X"
+        self.show_screen("game")
+        self.precompute_analysis()
 
     def create_widgets(self):
         frame = tk.Frame(self.root, bg=BG_COLOR)
-        frame.pack()
-        for i in range(3):
-            for j in range(3):
-                btn = tk.Button(frame, text="", font=("Arial", 40, "bold"), width=5, height=2,
-                                bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE,
-                                command=lambda row=i, col=j: self.on_click(row, col))
-                btn.grid(row=i, column=j, padx=3, pady=3)
-                self.buttons[i][j] = btn
+        # Рамка, в которой показывается поле текущего размера
+        self.board_holder = tk.Frame(frame, bg=BG_COLOR)
+        self.board_holder.pack()
         
-        mode_text = "Режим: " + ("2 игрока" if self.mode == "human" else f"Компьютер ({self.get_difficulty_name()})")
-        self.mode_label = tk.Label(self.root, text=mode_text, font=("Arial", 12), bg=BG_COLOR, fg=LABEL_COLOR)
+        self.mode_label = tk.Label(frame, text="", font=("Arial", 12), bg=BG_COLOR, fg=LABEL_COLOR)
         self.mode_label.pack(pady=5)
         
-        self.status_label = tk.Label(self.root, text="Ходит: X", font=("Arial", 16), bg=BG_COLOR, fg=LABEL_COLOR)
+        self.status_label = tk.Label(frame, text="Ходит: X", font=("Arial", 16), bg=BG_COLOR, fg=LABEL_COLOR)
         self.status_label.pack(pady=10)
         
-        self.restart_button = tk.Button(self.root, text="Перезапустить", font=("Arial", 14), 
+        # Управление повтором: показывается только в режиме повтора
+        self.replay_controls = tk.Frame(frame, bg=BG_COLOR)
+        for text, command in (("<< Партия", lambda: self.replay_game(-1)),
+                              ("< Ход", lambda: self.replay_step(-1)),
+                              ("Ход >", lambda: self.replay_step(1)),
+                              ("Партия >>", lambda: self.replay_game(1))):
+            btn = tk.Button(self.replay_controls, text=text, font=("Arial", 11), bg=BTN_COLOR, fg=LABEL_COLOR,
+                            activebackground=BTN_ACTIVE, width=9, command=command)
+            btn.pack(side=tk.LEFT, padx=2)
+        
+        # Подсказка и разбор партии: скрыты в сетевой игре и в повторе
+        self.analysis_controls = tk.Frame(frame, bg=BG_COLOR)
+        self.hint_button = tk.Button(self.analysis_controls, text="Подсказка", font=("Arial", 12),
+                                     bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE,
+                                     width=12, command=self.show_hint)
+        self.hint_button.pack(side=tk.LEFT, padx=2)
+        self.review_button = tk.Button(self.analysis_controls, text="Разбор партии", font=("Arial", 12),
+                                       bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE,
+                                       width=12, command=self.show_review)
+        self.review_button.pack(side=tk.LEFT, padx=2)
+        
+        self.restart_button = tk.Button(frame, text="Перезапустить", font=("Arial", 14), 
                                       bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, 
                                       command=self.restart)
         self.restart_button.pack(pady=5)
         
-        self.menu_button = tk.Button(self.root, text="В меню", font=("Arial", 12), 
+        self.menu_button = tk.Button(frame, text="В меню", font=("Arial", 12), 
                                    bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE, 
                                    command=self.create_mode_selection)
         self.menu_button.pack(pady=5)
+        
+        self.debug_label = tk.Label(frame, text="", font=("Courier", 10), bg=BG_COLOR, fg=BTN_ACTIVE)
+        if self.debug_overlay:
+            self.debug_label.pack(pady=5)
+        return frame
+
+    def create_analysis_frame(self):
+        frame = tk.Frame(self.root, bg=BG_COLOR)
+        label = tk.Label(frame, text="Разбор партии", font=("Arial", 18, "bold"), bg=BG_COLOR, fg=LABEL_COLOR)
+        label.pack(pady=10)
+        self.review_text = tk.Text(frame, width=44, height=16, font=("Courier", 11), bg=BTN_COLOR,
+                                   fg=LABEL_COLOR, state=tk.DISABLED)
+        self.review_text.pack(pady=5)
+        btn = tk.Button(frame, text="Назад", font=("Arial", 14), bg=BTN_COLOR, fg=LABEL_COLOR,
+                        activebackground=BTN_ACTIVE, width=15, command=lambda: self.show_screen("game"))
+        btn.pack(pady=5)
+        return frame
+
+    def create_board(self, size, dims=2):
+        frame = tk.Frame(self.board_holder, bg=BG_COLOR)
+        # Слои куба стоят рядом слева направо; строка кнопок куба сквозная,
+        # как в engine.Board.row_col: слой * size + строка слоя
+        layers = size if dims == 3 else 1
+        # Клетки уменьшаются пропорционально ширине поля
+        span = size * layers
+        scale = 3 / span
+        font_size = max(8, int(40 * scale))
+        width = max(2, round(5 * scale))
+        height = 2 if span <= 3 else 1
+        pad = 3 if span <= 5 else 1
+        buttons = [[None for _ in range(size)] for _ in range(size * layers)]
+        for layer in range(layers):
+            top = 0
+            if layers > 1:
+                label = tk.Label(frame, text=f"Слой {layer + 1}", font=("Arial", 11), bg=BG_COLOR, fg=LABEL_COLOR)
+                label.grid(row=0, column=layer * size, columnspan=size)
+                top = 1
+            for i in range(size):
+                for j in range(size):
+                    row = layer * size + i
+                    btn = tk.Button(frame, text="", font=("Arial", font_size, "bold"), width=width, height=height,
+                                    bg=BTN_COLOR, fg=LABEL_COLOR, activebackground=BTN_ACTIVE,
+                                    command=lambda row=row, col=j: self.on_click(row, col))
+                    # Между слоями — просвет
+                    left = pad + 8 if layer and j == 0 else pad
+                    btn.grid(row=top + i, column=layer * size + j, padx=(left, pad), pady=pad)
+                    buttons[row][j] = btn
+        return frame, buttons
+
+    def show_board(self, size=None, dims=None):
+        # Поле каждого варианта строится при первой партии на нём
+        key = (size or self.size, dims or self.dims)
+        if key not in self.boards:
+            self.boards[key] = self.create_board(*key)
+        frame, self.buttons = self.boards[key]
+        if frame is not self.board_frame:
+            if self.board_frame is not None:
+                self.board_frame.pack_forget()
+            frame.pack()
+            self.board_frame = frame
+
+    def reset_cells(self):
+        # Сбрасываются только клетки, изменённые за партию
+        for i, j in self.changed_cells | self.disabled_cells:
+            self.buttons[i][j].config(text="", bg=BTN_COLOR, fg=LABEL_COLOR, state=tk.NORMAL)
+        self.changed_cells.clear()
+        self.disabled_cells.clear()
+        self.hint_cell = None
+
+    def get_mode_text(self):
+        if self.mode == "human":
+            mode_text = "Режим: 2 игрока"
+        elif self.mode == "network":
+            mode_text = "Режим: по сети"
+        else:
+            mode_text = f"Режим: Компьютер ({self.get_difficulty_name()})"
+        return mode_text + " — " + self.get_variant_name()
+
+    def toggle_debug_overlay(self, event=None):
+        self.debug_overlay = not self.debug_overlay
+        if self.debug_label is None:
+            return
+        if self.debug_overlay:
+            self.debug_label.pack(pady=5)
+        else:
+            self.debug_label.pack_forget()
+
+    def show_debug(self, text):
+        if self.debug_label is not None:
+            self.debug_label["text"] = text
 
     def get_difficulty_name(self):
         names = {
             "easy": "Легкий",
             "medium": "Средний",
-            "hard": "Сложный"
+            "hard": "Сложный",
+            "mcts": "Монте-Карло",
+            "engine": "Движок",
+            "tuned": f"Настраиваемый, {round(self.strength * 100)}%"
         }
         return names.get(self.difficulty, "Неизвестно")
 
     def on_click(self, row, col):
+        if self.mode == "replay":
+            return
+        if self.mode == "network":
+            self.on_network_click(row, col)
+            return
         if (self.game_over or 
-            self.board[row][col] is not None or
+            self.board.get(row, col) is not None or
             (self.mode == "ai" and self.current_player == "O")):
             return
             
@@ -113,14 +392,25 @@ class TicTacToe:
             
         if self.mode == "ai" and self.current_player == "O":
             self.disable_buttons()
-            self.root.after(400, self.ai_move)
+            self.ai_move()
 
     def make_move(self, row, col, player):
-        self.board[row][col] = player
-        self.buttons[row][col]["text"] = player
-        self.buttons[row][col]["fg"] = X_COLOR if player == "X" else O_COLOR
+        started = time.perf_counter() if self.debug_overlay else 0.0
+        self.board.make(self.board.cell_of(row, col), player)
+        self.moves.append(self.board.cell_of(row, col))
+        options = {"text": player, "fg": X_COLOR if player == "X" else O_COLOR}
+        if self.hint_cell == (row, col):
+            options["bg"] = BTN_COLOR
+            self.hint_cell = None
+        self.clear_hint()
+        if (row, col) in self.disabled_cells:
+            self.disabled_cells.discard((row, col))
+            options["state"] = tk.NORMAL
+        self.buttons[row][col].config(**options)
+        self.changed_cells.add((row, col))
         
         if self.check_winner(player):
+            self.winning_cells = self.board.winning_line(player)
             self.status_label["text"] = f"Победил: {player}!"
             self.game_over = True
             self.highlight_winner(player)
@@ -130,72 +420,280 @@ class TicTacToe:
         else:
             self.current_player = "O" if self.current_player == "X" else "X"
             self.status_label["text"] = f"Ходит: {self.current_player}"
+        if self.game_over:
+            self.save_game()
+            self.store_result(player if self.board.winner() else None)
+            self.review_button["state"] = tk.NORMAL
+        else:
+            self.store_position()
+            if self.is_human_turn():
+                self.precompute_analysis()
+        
+        if self.debug_overlay:
+            ui_time = time.perf_counter() - started
+            if self.last_stats is not None and player == "O" and self.mode == "ai":
+                self.last_stats.ui_time = ui_time
+                self.show_debug(self.last_stats.summary())
+            else:
+                self.show_debug(f"{player}: окно {ui_time * 1000:.2f} мс")
 
     def ai_move(self):
+        # Поиск идёт в фоновом потоке, результат забирается опросом через after()
         if self.game_over:
             return
-            
-        if self.difficulty == "easy":
-            self.easy_ai_move()
-        elif self.difficulty == "medium":
-            self.medium_ai_move()
-        elif self.difficulty == "hard":
-            self.hard_ai_move()
-            
+        strategies = {
+            "easy": self.easy_ai_move,
+            "medium": self.medium_ai_move,
+            "hard": self.hard_ai_move,
+            "mcts": self.mcts_ai_move,
+            "engine": self.engine_ai_move,
+            "tuned": self.tuned_ai_move,
+        }
+        self.ai_started = time.perf_counter()
+        self.last_stats = SearchStats() if self.debug_overlay else None
+        self.ai_token = self.ai_worker.submit(strategies[self.difficulty], self.board.copy(),
+                                              stats=self.last_stats)
+        self.root.after(AI_POLL_INTERVAL, self.poll_ai_move, self.ai_token)
+
+    def poll_ai_move(self, token):
+        if token is not self.ai_token:
+            return  # Поиск отменён перезапуском или выходом в меню
+        ready, cell = self.ai_worker.poll(token)
+        if not ready:
+            self.root.after(AI_POLL_INTERVAL, self.poll_ai_move, token)
+            return
+        # Пауза дополняет время поиска до ai_delay, а не добавляется к нему
+        remaining = self.ai_delay - int((time.perf_counter() - self.ai_started) * 1000)
+        if remaining > 0:
+            self.root.after(remaining, self.finish_ai_move, token, cell)
+        else:
+            self.finish_ai_move(token, cell)
+
+    def finish_ai_move(self, token, cell):
+        if token is not self.ai_token:
+            return
+        self.ai_token = None
+        self.play_ai_cell(cell)
         if not self.game_over:
             self.enable_buttons()
 
-    def easy_ai_move(self):
-        empty = [(i, j) for i in range(3) for j in range(3) if self.board[i][j] is None]
-        if empty:
-            row, col = random.choice(empty)
+    def cancel_ai_move(self):
+        if self.ai_token is not None:
+            self.ai_token.cancel()
+            self.ai_token = None
+        self.cancel_analysis()
+
+    # Подсказки и разбор партии
+    def is_human_turn(self):
+        if self.mode == "human":
+            return True
+        return self.mode == "ai" and self.current_player == "X"
+
+    def precompute_analysis(self):
+        # Пока игрок думает, оценки ходов позиции попадают в кэш анализатора
+        if (self.mode not in ("human", "ai") or self.board.dims == 3 or self.game_over
+                or not self.is_human_turn()):
+            return
+        if self.analysis_token is not None:
+            self.analysis_token.cancel()
+        self.analyzer = load_analysis().analyzer
+        self.analysis_token = self.analysis_worker.submit(self.analyze_position, self.board.copy())
+
+    def analyze_position(self, board, cancel=None):
+        self.analyzer.move_scores(board, cancel)
+
+    def cancel_analysis(self):
+        for token in (self.analysis_token, self.hint_token):
+            if token is not None:
+                token.cancel()
+        self.analysis_token = self.hint_token = None
+
+    def show_hint(self):
+        if (self.game_over or self.hint_token is not None or not self.is_human_turn()
+                or self.board.dims == 3):
+            return
+        self.analyzer = load_analysis().analyzer
+        if self.analyzer.cached(self.board) is not None:
+            self.highlight_hint(self.analyzer.best_move(self.board))
+            return
+        self.status_label["text"] = "Подсказка считается..."
+        self.hint_token = self.analysis_worker.submit(self.analyzer.best_move, self.board.copy())
+        self.root.after(AI_POLL_INTERVAL, self.poll_hint, self.hint_token)
+
+    def poll_hint(self, token):
+        if token is not self.hint_token:
+            return  # Партия сменилась или ход уже сделан
+        ready, cell = self.analysis_worker.poll(token)
+        if not ready:
+            self.root.after(AI_POLL_INTERVAL, self.poll_hint, token)
+            return
+        self.hint_token = None
+        self.status_label["text"] = f"Ходит: {self.current_player}"
+        self.highlight_hint(cell)
+
+    def highlight_hint(self, cell):
+        self.clear_hint()
+        if cell is None:
+            return
+        row, col = self.board.row_col(cell)
+        self.buttons[row][col]["bg"] = HINT_COLOR
+        self.changed_cells.add((row, col))
+        self.hint_cell = (row, col)
+
+    def clear_hint(self):
+        if self.hint_token is not None:
+            self.hint_token.cancel()
+            self.hint_token = None
+        if self.hint_cell is not None:
+            row, col = self.hint_cell
+            self.buttons[row][col]["bg"] = BTN_COLOR
+            self.hint_cell = None
+
+    def show_review(self):
+        if (not self.game_over or self.mode not in ("human", "ai") or not self.moves
+                or self.board.dims == 3):
+            return
+        players = ("X",) if self.mode == "ai" else engine.PLAYERS
+        self.review_button["state"] = tk.DISABLED
+        self.analyzer = load_analysis().analyzer
+        self.analysis_token = self.analysis_worker.submit(
+            self.analyzer.review, list(self.moves), self.board.size, self.board.win_length, players)
+        self.root.after(AI_POLL_INTERVAL, self.poll_review, self.analysis_token)
+
+    def poll_review(self, token):
+        if token is not self.analysis_token:
+            return
+        ready, review = self.analysis_worker.poll(token)
+        if not ready:
+            self.root.after(AI_POLL_INTERVAL, self.poll_review, token)
+            return
+        self.analysis_token = None
+        self.review_button["state"] = tk.NORMAL
+        lines = []
+        counts = dict.fromkeys(analysis.LABELS, 0)
+        for number, player, cell, label, best in review:
+            row, col = self.board.row_col(cell)
+            line = f"{number:>3}. {player} ({row + 1},{col + 1}) — {analysis.LABELS[label]}"
+            if label != analysis.BEST:
+                best_row, best_col = self.board.row_col(best)
+                line += f", лучше ({best_row + 1},{best_col + 1})"
+            lines.append(line)
+            counts[label] += 1
+        lines.append("")
+        lines.append(", ".join(f"{analysis.LABELS[label]}: {n}" for label, n in counts.items()))
+        self.review_text.config(state=tk.NORMAL)
+        self.review_text.delete("1.0", tk.END)
+        self.review_text.insert(tk.END, "\n".join(lines))
+        self.review_text.config(state=tk.DISABLED)
+        self.show_screen("analysis")
+
+    # Стратегии выполняются в фоновом потоке на копии доски
+    def easy_ai_move(self, board, cancel=None, stats=None):
+        return ai.easy_move(board, stats=stats)
+
+    def medium_ai_move(self, board, cancel=None, stats=None):
+        # Попытка выиграть, затем блокировка игрока, иначе случайный ход
+        return ai.medium_move(board, stats=stats)
+
+    def hard_ai_move(self, board, cancel=None, stats=None):
+        # 3×3 — ход из книги идеальной игры, большие поля — альфа-бета в пределах бюджета
+        return ai.hard_move(board, time_limit=AI_TIME_LIMIT, cancel=cancel, stats=stats)
+
+    def mcts_ai_move(self, board, cancel=None, stats=None):
+        # Поиск Монте-Карло по дереву; дерево переиспользуется между ходами партии
+        return ai.mcts_move(board, time_limit=AI_TIME_LIMIT, cancel=cancel, stats=stats)
+
+    def engine_ai_move(self, board, cancel=None, stats=None):
+        # Движок в отдельном процессе по protocol.py; если он недоступен, ходит встроенный ИИ
+        return ai.engine_move(board, time_limit=AI_TIME_LIMIT, cancel=cancel, stats=stats)
+
+    def tuned_ai_move(self, board, cancel=None, stats=None):
+        # Сила выбирается ползунком на экране сложности
+        return ai.tuned_move(board, strength=self.strength, time_limit=AI_TIME_LIMIT,
+                             cancel=cancel, stats=stats)
+
+    def play_ai_cell(self, cell):
+        if cell is not None:
+            row, col = self.board.row_col(cell)
             self.make_move(row, col, "O")
 
-    def medium_ai_move(self):
-        # Попытка выиграть
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] is None:
-                    self.board[i][j] = "O"
-                    if self.check_winner("O"):
-                        self.board[i][j] = None
-                        self.make_move(i, j, "O")
-                        return
-                    self.board[i][j] = None
-        
-        # Блокировка игрока
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] is None:
-                    self.board[i][j] = "X"
-                    if self.check_winner("X"):
-                        self.board[i][j] = None
-                        self.make_move(i, j, "O")
-                        return
-                    self.board[i][j] = None
-        
-        # Случайный ход
-        self.easy_ai_move()
+    # Сетевая игра: ходы проверяет сервер, окно только показывает их
+    def start_network_game(self):
+        import client  # Сокеты нужны только сетевой игре
+        address = self.server_address or (client.DEFAULT_HOST, client.DEFAULT_PORT)
+        try:
+            self.net = client.NetworkClient(*address)
+        except OSError:
+            self.menu_status["text"] = "Сервер недоступен"
+            return
+        self.start_game("network")
+        self.find_network_opponent()
+        self.root.after(NET_POLL_INTERVAL, self.poll_network, self.net)
 
-    def hard_ai_move(self):
-        best_score = float('-inf')
-        best_move = None
-        
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] is None:
-                    self.board[i][j] = "O"
-                    score = self.minimax(0, False)
-                    self.board[i][j] = None
-                    
-                    if score > best_score:
-                        best_score = score
-                        best_move = (i, j)
-        
-        if best_move:
-            self.make_move(best_move[0], best_move[1], "O")
+    def find_network_opponent(self):
+        self.network_mark = None
+        self.status_label["text"] = "Поиск соперника..."
+        self.disable_buttons()
+        self.net.send("queue", size=self.size, win=self.win_length, dims=self.dims)
+
+    def poll_network(self, net):
+        if net is not self.net:
+            return  # Соединение закрыто выходом в меню
+        for message in net.poll():
+            op = message.get("op")
+            if op == "start":
+                self.network_mark = message["you"]
+                self.mode_label["text"] = f"Режим: по сети, вы играете за {self.network_mark}"
+                self.update_network_turn()
+            elif op == "moved":
+                row, col = self.board.row_col(message["cell"])
+                self.make_move(row, col, message["player"])
+                self.update_network_turn()
+            elif op == "left":
+                self.game_over = True
+                self.status_label["text"] = "Соперник покинул игру"
+                self.disable_buttons()
+            elif op == "error":
+                self.status_label["text"] = message.get("msg", "Ошибка сервера")
+                self.update_network_turn()
+            elif op == "disconnected":
+                self.game_over = True
+                self.status_label["text"] = "Соединение с сервером потеряно"
+                self.disable_buttons()
+                self.close_network()
+                return
+        self.root.after(NET_POLL_INTERVAL, self.poll_network, net)
+
+    def update_network_turn(self):
+        if self.game_over:
+            return
+        if self.current_player == self.network_mark:
+            self.enable_buttons()
+            self.status_label["text"] = f"Ваш ход ({self.network_mark})"
+        else:
+            self.disable_buttons()
+            self.status_label["text"] = "Ход соперника"
+
+    def on_network_click(self, row, col):
+        if (self.game_over or self.net is None or
+            self.board.get(row, col) is not None or
+            self.current_player != self.network_mark):
+            return
+        # Ход появится на поле, когда сервер его подтвердит
+        self.disable_buttons()
+        self.net.send("move", cell=self.board.cell_of(row, col))
+
+    def close_network(self):
+        if self.net is not None:
+            self.net.close()
+            self.net = None
 
-    def minimax(self, depth, is_maximizing):
+    def minimax(self, depth, is_maximizing, stats=None):
+        if stats is not None:
+            stats.source = "minimax"
+            stats.nodes += 1
+            if depth > stats.max_depth:
+                stats.max_depth = depth
         if self.check_winner("O"):
             return 10 - depth
         if self.check_winner("X"):
@@ -203,80 +701,216 @@ class TicTacToe:
         if self.is_board_full():
             return 0
         
-        if is_maximizing:
-            best_score = float('-inf')
-            for i in range(3):
-                for j in range(3):
-                    if self.board[i][j] is None:
-                        self.board[i][j] = "O"
-                        score = self.minimax(depth + 1, False)
-                        self.board[i][j] = None
-                        best_score = max(score, best_score)
-            return best_score
-        else:
-            best_score = float('inf')
-            for i in range(3):
-                for j in range(3):
-                    if self.board[i][j] is None:
-                        self.board[i][j] = "X"
-                        score = self.minimax(depth + 1, True)
-                        self.board[i][j] = None
-                        best_score = min(score, best_score)
-            return best_score
+        player = "O" if is_maximizing else "X"
+        best_score = float('-inf') if is_maximizing else float('inf')
+        for cell in self.board.legal_moves():
+            self.board.make(cell, player)
+            score = self.minimax(depth + 1, not is_maximizing, stats)
+            self.board.unmake(cell)
+            if is_maximizing:
+                best_score = max(score, best_score)
+            else:
+                best_score = min(score, best_score)
+        return best_score
 
     def is_board_full(self):
-        for row in self.board:
-            for cell in row:
-                if cell is None:
-                    return False
-        return True
+        return self.board.is_full()
 
     def check_winner(self, player):
-        for i in range(3):
-            if all(self.board[i][j] == player for j in range(3)):
-                self.winning_cells = [(i, j) for j in range(3)]
-                return True
-            if all(self.board[j][i] == player for j in range(3)):
-                self.winning_cells = [(j, i) for j in range(3)]
-                return True
-        if all(self.board[i][i] == player for i in range(3)):
-            self.winning_cells = [(i, i) for i in range(3)]
-            return True
-        if all(self.board[i][2 - i] == player for i in range(3)):
-            self.winning_cells = [(i, 2 - i) for i in range(3)]
-            return True
-        return False
+        return self.board.is_win(player)
 
     def highlight_winner(self, player):
-        for i, j in getattr(self, 'winning_cells', []):
+        for i, j in self.winning_cells or []:
             self.buttons[i][j]["bg"] = BTN_ACTIVE
 
     def disable_buttons(self):
-        for row in self.buttons:
-            for btn in row:
-                btn.config(state=tk.DISABLED)
+        # Занятые клетки и так не принимают ходов: выключаются только свободные,
+        # и только те, что ещё включены
+        for cell in self.board.legal_moves():
+            key = self.board.row_col(cell)
+            if key not in self.disabled_cells:
+                self.buttons[key[0]][key[1]].config(state=tk.DISABLED)
+                self.disabled_cells.add(key)
 
     def enable_buttons(self):
-        for row in self.buttons:
-            for btn in row:
-                btn.config(state=tk.NORMAL)
+        for i, j in self.disabled_cells:
+            self.buttons[i][j].config(state=tk.NORMAL)
+        self.disabled_cells.clear()
+
+    # Журнал партий: партия сохраняется при окончании, а недоигранная — при перезапуске,
+    # выходе в меню или закрытии окна, если её не продолжит хранилище
+    def new_record(self):
+        self.moves = []
+        self.game_started = time.time()
+        self.game_saved = False
+
+    def save_game(self):
+        if self.game_saved or self.mode == "replay":
+            return
+        self.game_saved = True
+        if self.game_log is None or not self.moves:
+            return
+        self.game_log.append(records.GameRecord(
+            self.mode, self.difficulty, self.board.size, self.board.win_length,
+            records.result_of(self.board), self.game_started, time.time(), self.moves,
+            self.board.dims))
+
+    def close_log(self):
+        self.save_game()
+        if self.game_log is not None:
+            self.game_log.close()
+
+    def close(self):
+        # Недоигранную партию продолжит хранилище — в журнал она попадёт один раз, целиком
+        if self.store is not None and self.mode in ("human", "ai") and not self.game_over:
+            self.game_saved = True
+        self.close_log()
+        if self.store is not None:
+            self.store.close()
+
+    # Хранилище: итоги профиля и недоигранная партия, запись — в фоновом потоке
+    def update_summary(self):
+        if self.store is None:
+            return
+        wins, draws, losses = self.store.totals("ai")
+        if wins or draws or losses:
+            self.summary_label["text"] = (f"{self.store.profile_name} против компьютера: "
+                                          f"побед {wins}, ничьих {draws}, поражений {losses}")
+
+    def store_position(self):
+        if self.store is None or self.mode not in ("human", "ai"):
+            return
+        strength = self.strength if self.difficulty == "tuned" else None
+        self.store.save_game(self.mode, self.difficulty, strength, self.board.size,
+                             self.board.win_length, self.moves, self.game_started, self.board.dims)
+
+    def store_result(self, winner):
+        if self.store is None or self.mode not in ("human", "ai", "network"):
+            return
+        # В игре вдвоём итог считается за крестики
+        mark = self.network_mark if self.mode == "network" else "X"
+        if winner is None:
+            outcome = store.DRAW
+        else:
+            outcome = store.WIN if winner == mark else store.LOSS
+        self.store.add_result(self.mode, self.difficulty, self.board.size, self.board.win_length,
+                              outcome, self.board.dims)
+        self.store.clear_game()
+
+    def resume_game(self):
+        # Недоигранная партия прошлого запуска продолжается с того же хода
+        saved = self.store.saved_game if self.store is not None else None
+        if saved is None or saved.mode not in ("human", "ai") or not saved.moves:
+            return
+        variants = engine.CUBE_VARIANTS if saved.dims == 3 else engine.VARIANTS
+        levels = ai.CUBE_LEVELS if saved.dims == 3 else ai.LEVELS
+        if (saved.size, saved.win_length) not in variants or (
+                saved.mode == "ai" and saved.difficulty not in levels):
+            return
+        self.size, self.win_length, self.dims = saved.size, saved.win_length, saved.dims
+        self.variant_button["text"] = self.get_variant_name()
+        if saved.strength is not None:
+            self.strength_scale.set(round(saved.strength * 100))
+        self.start_game(saved.mode, saved.difficulty)
+        self.game_started = saved.started
+        for cell in saved.moves:
+            if self.game_over or cell >= self.board.cells or not self.board.is_empty(cell):
+                break
+            row, col = self.board.row_col(cell)
+            self.make_move(row, col, self.current_player)
+        if self.mode == "ai" and self.current_player == "O" and not self.game_over:
+            self.disable_buttons()
+            self.ai_move()
+
+    # Повтор партий из журнала
+    def start_replay(self):
+        self.save_game()
+        if self.game_log is None:
+            self.menu_status["text"] = "Журнал партий отключён"
+            return
+        self.game_log.flush()
+        # Журнал читается потоком, в памяти остаются только последние партии
+        recent = collections.deque(records.read_records(self.log_path), maxlen=REPLAY_GAMES)
+        if not recent:
+            self.menu_status["text"] = "Нет сохранённых партий"
+            return
+        self.mode = "replay"
+        self.difficulty = None
+        self.game_over = True
+        self.replays = list(recent)
+        self.replay_index = len(self.replays) - 1
+        self.analysis_controls.pack_forget()
+        self.replay_controls.pack(pady=5, before=self.restart_button)
+        self.show_replay_game()
+        self.show_screen("game")
+
+    def show_replay_game(self):
+        record = self.replays[self.replay_index]
+        self.reset_cells()
+        self.show_board(record.size, record.dims)
+        mode_names = {"human": "2 игрока", "network": "по сети", "ai": "компьютер"}
+        text = f"Повтор {self.replay_index + 1}/{len(self.replays)}: {mode_names[record.mode]}"
+        if record.difficulty is not None:
+            self.difficulty = record.difficulty
+            text += f" ({self.get_difficulty_name()})"
+        shape = "×".join([str(record.size)] * record.dims)
+        self.mode_label["text"] = text + f" — поле {shape}"
+        self.show_replay_position(0)
+
+    def show_replay_position(self, move):
+        record = self.replays[self.replay_index]
+        self.reset_cells()
+        self.board = engine.Board(size=record.size, win_length=record.win_length, dims=record.dims)
+        player = "X"
+        for cell in record.moves[:move]:
+            self.board.make(cell, player)
+            row, col = self.board.row_col(cell)
+            self.buttons[row][col].config(text=player, fg=X_COLOR if player == "X" else O_COLOR)
+            self.changed_cells.add((row, col))
+            player = "O" if player == "X" else "X"
+        self.replay_move = move
+        status = f"Ход {move} из {len(record.moves)}"
+        winner = self.board.winner()
+        if winner is not None:
+            self.winning_cells = self.board.winning_line(winner)
+            self.highlight_winner(winner)
+            status += f" — победил: {winner}"
+        elif move == len(record.moves):
+            status += " — ничья" if record.result == records.DRAW else " — партия не доиграна"
+        self.status_label["text"] = status
+
+    def replay_step(self, delta):
+        move = self.replay_move + delta
+        if 0 <= move <= len(self.replays[self.replay_index].moves):
+            self.show_replay_position(move)
+
+    def replay_game(self, delta):
+        index = self.replay_index + delta
+        if 0 <= index < len(self.replays):
+            self.replay_index = index
+            self.show_replay_game()
 
     def restart(self):
+        if self.mode == "replay":
+            self.show_replay_position(0)
+            return
+        self.save_game()
+        self.cancel_ai_move()
         self.current_player = "X"
-        self.board = [[None for _ in range(3)] for _ in range(3)]
+        self.board = engine.Board(size=self.size, win_length=self.win_length, dims=self.dims)
         self.game_over = False
-        
-        for i in range(3):
-            for j in range(3):
-                btn = self.buttons[i][j]
-                btn["text"] = ""
-                btn["bg"] = BTN_COLOR
-                btn["fg"] = LABEL_COLOR
-                btn["state"] = tk.NORMAL
-                
+        self.new_record()
+        if self.store is not None:
+            self.store.clear_game()
+        self.reset_cells()
+        self.review_button["state"] = tk.DISABLED
         self.status_label["text"] = "Ходит: X"
+        if self.mode == "network" and self.net is not None:
+            self.net.send("leave")
+            self.find_network_opponent()
+        else:
+            self.precompute_analysis()
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    game = TicTacToe(root)
-    root.mainloop()
\ No newline at end of file
+    import cli
+    cli.main(run_gui)
\ No newline at end of file
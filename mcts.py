@@ -0,0 +1,341 @@
+"""
+Поиск хода методом Монте-Карло по дереву (MCTS) с бюджетом времени или итераций.
+
+Каждая итерация спускается по дереву по формуле UCT, добавляет один новый
+узел и доигрывает партию случайными ходами; результат поднимается к корню.
+Поиск можно прервать в любой момент: ход — самый посещённый ребёнок корня.
+
+Параллельность — по корню: несколько процессов строят независимые деревья
+от одной позиции с разными зёрнами, а счётчики детей корня суммируются.
+По умолчанию поиск идёт в одном потоке: окно вызывает его из фонового потока,
+где порождать процессы через fork небезопасно. Пул включается явным workers
+и запускает процессы через spawn.
+Дерево сохраняется между ходами (своё в каждом потоке и в каждом процессе
+пула): если новая позиция получается из корня прошлого поиска, поиск
+продолжается с соответствующего поддерева.
+"""
+
+import math
+import random
+import threading
+import time
+
+import engine
+from engine import X, O, cells_of
+
+DEFAULT_TIME_LIMIT = 0.2  # Бюджет на ход, секунды
+DEFAULT_WORKERS = 1  # Деревьев по умолчанию; пул процессов — только по явному запросу
+EXPLORATION = 1.4  # Константа исследования в UCT
+MAX_NODES = 200_000  # Предел размера дерева; дальше только доигрывания
+CHECK_EVERY = 16  # Как часто (в итерациях) сверяться с часами и токеном отмены
+SAFETY_MARGIN = 0.1  # Доля бюджета, оставляемая на накладные расходы
+POLL_INTERVAL = 0.01  # Как часто проверять токен отмены, ожидая процессы пула, секунды
+
+_local = threading.local()  # Дерево прошлого поиска в этом потоке
+_pool = None  # Пул процессов, создаётся при первом параллельном поиске
+_pool_workers = 0
+_neighbors = {}  # Геометрия -> маски соседей клеток
+
+
+class Node:
+    """
+    Узел дерева: позиция после хода move игрока player.
+    """
+    __slots__ = ("move", "player", "parent", "children", "untried", "visits", "wins", "nodes")
+
+    def __init__(self, move, player, parent, untried):
+        self.move = move
+        self.player = player  # Кто сделал ход, ведущий в узел
+        self.parent = parent
+        self.children = []
+        self.untried = untried  # Ещё не добавленные в дерево ходы
+        self.visits = 0
+        self.wins = 0.0  # Очки игрока player: 1 за победу, 0.5 за ничью
+        self.nodes = 1  # Узлов в поддереве, включая этот
+
+    def select(self):
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda c: c.wins / c.visits
+                   + EXPLORATION * math.sqrt(log_visits / c.visits))
+
+
+def neighbor_masks(geo):
+    """
+    Маски клеток на расстоянии 1 от каждой клетки (для больших полей).
+    """
+    masks = _neighbors.get(geo)
+    if masks is None:
+        masks = []
+        for k in range(geo.cells):
+            row, col = divmod(k, geo.size)
+            mask = 0
+            for r in range(max(0, row - 1), min(geo.size, row + 2)):
+                for c in range(max(0, col - 1), min(geo.size, col + 2)):
+                    mask |= 1 << (r * geo.size + c)
+            masks.append(mask)
+        masks = _neighbors[geo] = masks
+    return masks
+
+
+class Tree:
+    """
+    Дерево поиска от позиции board.
+    """
+
+    def __init__(self, board):
+        self.board = board.copy()
+        self.root = Node(None, engine.opponent(board.to_move), None, self.candidates(self.board))
+        self.size = 1
+
+    def candidates(self, board):
+        """
+        Ходы, которые добавляются в дерево. На 3×3 и на кубе — все свободные клетки,
+        на больших полях — клетки рядом с фигурами (на пустом поле — центр).
+        """
+        if board.is_terminal():
+            return []
+        if board.geo.is_classic or board.dims == 3:
+            return list(board.legal_moves())
+        occupied = board.occupied
+        if not occupied:
+            center = board.size // 2
+            return [center * board.size + center]
+        near = 0
+        masks = neighbor_masks(board.geo)
+        for k in cells_of(occupied):
+            near |= masks[k]
+        return cells_of(near & ~occupied & board.geo.full)
+
+    def advance(self, board):
+        """
+        Переносит корень в позицию board, если она получается из корня ходами,
+        уже добавленными в дерево.
+        :return: True, если поддерево найдено
+        """
+        current = self.board
+        if board.geo is not current.geo or current.x & ~board.x or current.o & ~board.o:
+            return False
+        node = self.root
+        position = current.copy()
+        while position != board:
+            player = position.to_move
+            added = board.mask(player) & ~position.mask(player)
+            child = next((c for c in node.children if added >> c.move & 1), None)
+            if child is None:
+                return False
+            position.make(child.move, player)
+            node = child
+        node.parent = None
+        node.move = None
+        self.root = node
+        self.board = position
+        self.size = node.nodes  # Остальные ветви освобождаются
+        return True
+
+    def iterate(self, rng):
+        """
+        Одна итерация: выбор, расширение, случайное доигрывание, обновление.
+        :return: глубина добавленного узла
+        """
+        board = self.board.copy()
+        node = self.root
+        depth = 0
+        added = 0
+        while not node.untried and node.children:
+            node = node.select()
+            board.make(node.move, node.player)
+            depth += 1
+        if node.untried and self.size < MAX_NODES:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            player = engine.opponent(node.player)
+            board.make(move, player)
+            node = Node(move, player, node, self.candidates(board))
+            node.parent.children.append(node)
+            self.size += 1
+            depth += 1
+            added = 1
+        winner = self.rollout(board, rng)
+        node.nodes -= added  # Новый узел уже посчитан в себе
+        while node is not None:
+            node.nodes += added
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.player:
+                node.wins += 1
+            node = node.parent
+        return depth
+
+    @staticmethod
+    def rollout(board, rng):
+        """
+        Доигрывает партию случайными ходами.
+        :return: 'X', 'O' или None при ничьей
+        """
+        winner = board.winner()
+        if winner is not None:
+            return winner
+        moves = cells_of(board.geo.full & ~board.occupied)
+        rng.shuffle(moves)
+        player = board.to_move
+        for move in moves:
+            board.make(move, player)
+            if board.wins_through(move, player):
+                return player
+            player = O if player == X else X
+        return None
+
+    def search(self, rng, time_limit=None, iterations=None, cancel=None, stats=None):
+        """
+        Итерации до исчерпания бюджета или отмены.
+        :return: число выполненных итераций
+        """
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        done = 0
+        while iterations is None or done < iterations:
+            if done % CHECK_EVERY == 0 and (
+                    deadline is not None and time.perf_counter() > deadline
+                    or cancel is not None and cancel.cancelled):
+                break
+            depth = self.iterate(rng)
+            done += 1
+            if stats is not None and depth > stats.max_depth:
+                stats.max_depth = depth
+        return done
+
+    def root_counts(self):
+        """
+        Счётчики детей корня: ход -> (посещения, очки).
+        """
+        return {c.move: (c.visits, c.wins) for c in self.root.children}
+
+
+def local_tree(board, stats=None):
+    """
+    Дерево этого потока, перенесённое в позицию board, или новое.
+    """
+    tree = getattr(_local, "tree", None)
+    reused = tree is not None and tree.advance(board)
+    if not reused:
+        tree = _local.tree = Tree(board)
+    if stats is not None:
+        if reused:
+            stats.cache_hits += 1
+        else:
+            stats.cache_misses += 1
+    return tree
+
+
+def search_root(task):
+    """
+    Поиск в процессе пула.
+    Срок — по time.monotonic, общим для процессов: задача, дождавшаяся
+    свободного процесса слишком поздно, сразу завершается и не задерживает
+    следующие ходы.
+    :param task: (x, o, size, win_length, dims, срок или None, iterations, seed)
+    :return: (счётчики детей корня, число итераций)
+    """
+    x, o, size, win_length, dims, deadline, iterations, seed = task
+    time_limit = None if deadline is None else max(0.0, deadline - time.monotonic())
+    board = engine.Board(x, o, size=size, win_length=win_length, dims=dims)
+    tree = local_tree(board)
+    done = tree.search(random.Random(seed), time_limit, iterations)
+    return tree.root_counts(), done
+
+
+def get_pool(workers):
+    """
+    Пул процессов держится между ходами, чтобы не платить за запуск на каждом.
+    Процессы запускаются через spawn: fork процесса с потоками (окно, воркеры)
+    может унаследовать захваченные блокировки.
+    """
+    global _pool, _pool_workers
+    # Импорт пула процессов дорог, а нужен только параллельному поиску
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = ProcessPoolExecutor(max_workers=workers,
+                                    mp_context=multiprocessing.get_context("spawn"))
+        _pool_workers = workers
+    return _pool
+
+
+def wait_result(future, deadline, cancel):
+    """
+    Результат процесса пула, если он готов к сроку и поиск не отменён.
+    :param deadline: время time.monotonic, до которого ждать (None — без срока)
+    :return: результат или None
+    """
+    from concurrent.futures import TimeoutError as FutureTimeout
+    while cancel is None or not cancel.cancelled:
+        timeout = POLL_INTERVAL
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                break
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            continue
+    future.cancel()
+    return None
+
+
+def best_move(board, time_limit=DEFAULT_TIME_LIMIT, iterations=None, workers=None,
+              rng=random, cancel=None, stats=None):
+    """
+    Самый посещённый ход после поиска в пределах бюджета.
+    :param board: engine.Board
+    :param time_limit: бюджет на ход, секунды (None — только по итерациям)
+    :param iterations: бюджет итераций на одно дерево (None — только по времени)
+    :param workers: число деревьев, строящихся параллельно (по умолчанию 1 — без пула процессов)
+    :param rng: генератор случайных чисел
+    :param cancel: worker.CancelToken для досрочной остановки; ожидание процессов
+                   пула тоже прерывается
+    :param stats: stats.SearchStats для счётчиков поиска или None
+    :return: номер клетки или None, если ходов нет
+    """
+    if board.is_terminal():
+        return None
+    if stats is not None:
+        stats.source = "mcts"
+    if time_limit is None and iterations is None:
+        time_limit = DEFAULT_TIME_LIMIT
+    started = time.monotonic()
+    budget = None if time_limit is None else time_limit * (1 - SAFETY_MARGIN)
+    # Деревья процессов, не успевшие к сроку, в ход не идут
+    deadline = None if time_limit is None else started + time_limit
+    workers = workers or DEFAULT_WORKERS
+    futures = []
+    if workers > 1:
+        # Остальные деревья строятся в процессах пула, одно — в этом потоке
+        pool = get_pool(workers - 1)
+        # Процессу нужен запас на передачу задачи и результата, иначе он опоздает к сроку
+        remote = None if budget is None else started + budget * (1 - SAFETY_MARGIN)
+        futures = [
+            pool.submit(search_root, (board.x, board.o, board.size, board.win_length, board.dims,
+                                      remote, iterations, rng.getrandbits(32)))
+            for _ in range(workers - 1)
+        ]
+    tree = local_tree(board, stats)
+    if budget is not None:
+        budget = max(0.0, started + budget - time.monotonic())  # Запуск процессов пула — из бюджета
+    done = tree.search(rng, budget, iterations, cancel, stats)
+    totals = {m: list(v) for m, v in tree.root_counts().items()}
+    for future in futures:
+        result = wait_result(future, deadline, cancel)
+        if result is None:
+            continue
+        counts, worker_done = result
+        done += worker_done
+        for m, (visits, wins) in counts.items():
+            total = totals.setdefault(m, [0, 0.0])
+            total[0] += visits
+            total[1] += wins
+    if stats is not None:
+        stats.nodes += done
+    if not totals:
+        return tree.root.untried[0] if tree.root.untried else board.legal_moves()[0]
+    return max(totals, key=lambda m: (totals[m][0], totals[m][1]))
@@ -0,0 +1,387 @@
+"""
+Текстовый протокол движка по stdin/stdout, похожий на UCI в шахматах.
+
+Окно и безголовые скрипты запускают движок отдельным процессом и обмениваются
+с ним строками. Процессы держатся в пуле и переиспользуются между ходами и
+партиями. Встроенный движок (python protocol.py) говорит на том же протоколе,
+поэтому внешний движок подключается без изменений в игре.
+
+Команды игры:
+    uci                                 — знакомство; ответ: id name ..., uciok
+    isready                             — ответ readyok, когда движок свободен
+    setoption name level value hard     — уровень встроенного движка
+    ucinewgame                          — новая партия (движок может сбросить кэши)
+    position size 3 win 3 [board X...O....] [moves 4 0 8]
+                                        — поле по строкам ('.', 'X', 'O') и/или
+                                          ходы от него (номера клеток)
+    go [movetime 200] [level hard]      — найти ход за movetime мс
+    stop                                — закончить поиск как можно скорее
+    quit
+Ответы движка:
+    info source alphabeta nodes 1234 depth 5 time 180
+    bestmove 4                          — или bestmove none, если ходов нет
+
+Внешний движок задаётся переменной окружения TTT_ENGINE (командная строка),
+по умолчанию используется встроенный.
+"""
+
+import os
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+import ai
+import engine
+import worker
+from stats import SearchStats
+
+ENGINE_NAME = "KrestikiNoliki"
+DEFAULT_MOVETIME = 200  # мс, если в go не указано время
+ENGINE_LEVELS = ("easy", "medium", "hard", "mcts")  # Уровни встроенного движка
+START_TIMEOUT = 10.0  # Ожидание uciok от нового процесса, секунды
+RESPONSE_GRACE = 2.0  # Сверх movetime до признания движка зависшим, секунды
+POLL_INTERVAL = 0.01  # Период проверки отмены при ожидании ответа, секунды
+
+BUILTIN_COMMAND = (sys.executable, os.path.abspath(__file__))
+
+
+class EngineError(Exception):
+    """
+    Движок не запустился, завершился или не ответил вовремя.
+    """
+
+
+def default_command():
+    """
+    Команда движка из TTT_ENGINE или встроенный движок.
+    """
+    command = os.environ.get("TTT_ENGINE")
+    return tuple(shlex.split(command)) if command else BUILTIN_COMMAND
+
+
+def board_string(board):
+    """
+    Поле для команды position: клетки по строкам, '.', 'X' или 'O'.
+    """
+    return "".join(
+        engine.X if board.x >> k & 1 else engine.O if board.o >> k & 1 else "."
+        for k in range(board.cells)
+    )
+
+
+def parse_position(words):
+    """
+    Разбирает аргументы команды position.
+    :return: engine.Board
+    """
+    options = {}
+    moves = []
+    i = 0
+    while i < len(words):
+        if words[i] == "moves":
+            moves = [int(cell) for cell in words[i + 1:]]
+            break
+        options[words[i]] = words[i + 1]
+        i += 2
+    size = int(options.get("size", engine.SIZE))
+    board = engine.Board(size=size, win_length=int(options.get("win", size)))
+    cells = options.get("board", "")
+    if len(cells) not in (0, board.cells):
+        raise ValueError("Длина поля не совпадает с размером")
+    for k, mark in enumerate(cells):
+        if mark in engine.PLAYERS:
+            board.make(k, mark)
+    for cell in moves:
+        if not 0 <= cell < board.cells or not board.is_empty(cell):
+            raise ValueError(f"Недопустимый ход {cell}")
+        board.make(cell, board.to_move)
+    return board
+
+
+class BuiltinEngine:
+    """
+    Встроенный движок: читает команды и ищет ход стратегиями ai в фоновом потоке,
+    чтобы во время поиска принимать stop.
+    """
+
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.lock = threading.Lock()  # Строки из двух потоков не перемешиваются
+        self.board = engine.Board()
+        self.level = "hard"
+        self.search = None  # (поток, токен отмены) текущего поиска
+
+    def send(self, line):
+        with self.lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    def run(self, stream=sys.stdin):
+        for line in stream:
+            words = line.split()
+            if not words:
+                continue
+            try:
+                if not self.handle(words[0], words[1:]):
+                    break
+            except (ValueError, IndexError, KeyError) as error:
+                self.send(f"info string Ошибка: {error}")
+        self.finish_search()
+
+    def handle(self, command, args):
+        """
+        Выполняет одну команду.
+        :return: False для quit
+        """
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send("option name level type combo default hard "
+                      + " ".join(f"var {level}" for level in ENGINE_LEVELS))
+            self.send("uciok")
+        elif command == "isready":
+            self.finish_search()
+            self.send("readyok")
+        elif command == "setoption":
+            options = dict(zip(args[::2], args[1::2]))
+            if options.get("name") == "level":
+                self.level = self.check_level(options["value"])
+        elif command == "ucinewgame":
+            self.finish_search()
+            self.board = engine.Board()
+        elif command == "position":
+            self.finish_search()
+            self.board = parse_position(args)
+        elif command == "go":
+            self.finish_search()
+            options = dict(zip(args[::2], args[1::2]))
+            movetime = int(options.get("movetime", DEFAULT_MOVETIME))
+            level = self.check_level(options.get("level", self.level))
+            token = worker.CancelToken()
+            thread = threading.Thread(target=self.think, daemon=True,
+                                      args=(self.board.copy(), level, movetime / 1000, token))
+            self.search = (thread, token)
+            thread.start()
+        elif command == "stop":
+            if self.search is not None:
+                self.search[1].cancel()
+        elif command == "quit":
+            return False
+        else:
+            self.send(f"info string Неизвестная команда {command}")
+        return True
+
+    @staticmethod
+    def check_level(level):
+        if level not in ENGINE_LEVELS:
+            raise ValueError(f"Неизвестный уровень {level}")
+        return level
+
+    def think(self, board, level, time_limit, token):
+        stats = SearchStats()
+        if level in ("hard", "mcts"):
+            move = ai.LEVELS[level](board, time_limit=time_limit, cancel=token, stats=stats)
+        else:
+            move = ai.LEVELS[level](board, stats=stats)
+        self.send(f"info source {stats.source} nodes {stats.nodes} depth {stats.max_depth} "
+                  f"time {int(stats.elapsed * 1000)}")
+        self.send(f"bestmove {'none' if move is None else move}")
+
+    def finish_search(self):
+        """
+        Останавливает текущий поиск и ждёт его bestmove.
+        """
+        if self.search is not None:
+            thread, token = self.search
+            token.cancel()
+            thread.join()
+            self.search = None
+
+
+class EngineProcess:
+    """
+    Процесс движка со стороны игры.
+    """
+
+    def __init__(self, command):
+        self.command = tuple(command)
+        try:
+            self.proc = subprocess.Popen(self.command, stdin=subprocess.PIPE,
+                                         stdout=subprocess.PIPE, text=True, bufsize=1)
+        except OSError as error:
+            raise EngineError(f"Не удалось запустить движок: {error}") from None
+        self.lines = queue.Queue()
+        self.reader = threading.Thread(target=self._read, name="engine-reader", daemon=True)
+        self.reader.start()
+        self.position = None  # Последняя позиция, для которой искался ход
+        self.name = None
+        self.send("uci")
+        deadline = time.perf_counter() + START_TIMEOUT
+        while True:
+            line = self.read_line(deadline)
+            if line.startswith("id name "):
+                self.name = line[len("id name "):]
+            elif line == "uciok":
+                break
+
+    def _read(self):
+        for line in self.proc.stdout:
+            self.lines.put(line.strip())
+        self.lines.put(None)  # Процесс завершился
+
+    @property
+    def alive(self):
+        return self.proc.poll() is None
+
+    def send(self, line):
+        try:
+            self.proc.stdin.write(line + "\n")
+            self.proc.stdin.flush()
+        except (OSError, ValueError):
+            raise EngineError("Движок закрыл ввод") from None
+
+    def read_line(self, deadline, cancel=None, on_cancel=None):
+        """
+        Следующая строка движка.
+        :param on_cancel: вызывается один раз, когда срабатывает cancel
+        :raises EngineError: движок завершился или не ответил до deadline
+        """
+        while True:
+            if cancel is not None and on_cancel is not None and cancel.cancelled:
+                on_cancel()
+                on_cancel = None
+            try:
+                line = self.lines.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if time.perf_counter() > deadline:
+                    self.close()
+                    raise EngineError("Движок не ответил вовремя") from None
+                continue
+            if line is None:
+                raise EngineError("Движок завершился")
+            return line
+
+    def new_game(self):
+        self.send("ucinewgame")
+        self.send("isready")
+        deadline = time.perf_counter() + START_TIMEOUT
+        while self.read_line(deadline) != "readyok":
+            pass
+
+    def best_move(self, board, time_limit, level=None, cancel=None, stats=None):
+        """
+        Запрашивает ход для позиции.
+        :param time_limit: бюджет на ход, секунды
+        :param level: уровень встроенного движка или None (по setoption)
+        :param cancel: worker.CancelToken; при отмене движку посылается stop
+        :param stats: stats.SearchStats для счётчиков из info или None
+        :return: номер клетки или None
+        """
+        previous = self.position
+        # Позиция не продолжает прошлую — значит, началась новая партия
+        if previous is None or (board.geo is not previous.geo or previous.x & ~board.x
+                                or previous.o & ~board.o):
+            self.new_game()
+        self.position = board.copy()
+        self.send(f"position size {board.size} win {board.win_length} board {board_string(board)}")
+        go = f"go movetime {int(time_limit * 1000)}"
+        self.send(go if level is None else f"{go} level {level}")
+        deadline = time.perf_counter() + time_limit + RESPONSE_GRACE
+        while True:
+            line = self.read_line(deadline, cancel, lambda: self.send("stop"))
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == "info" and stats is not None:
+                info = dict(zip(words[1::2], words[2::2]))
+                stats.source = "engine"
+                try:
+                    stats.nodes += int(info.get("nodes", 0))
+                    stats.max_depth = max(stats.max_depth, int(info.get("depth", 0)))
+                except ValueError:
+                    pass  # Счётчики info необязательны
+            elif words[0] == "bestmove":
+                return self.parse_move(board, words[1] if len(words) > 1 else "none")
+
+    def parse_move(self, board, token):
+        """
+        Проверяет ход из bestmove: движку нельзя ставить фигуру вне поля или в занятую клетку.
+        :return: номер клетки или None, если ходов нет
+        :raises EngineError: недопустимый ход — вызывающий закрывает процесс
+        """
+        if token == "none" and board.is_terminal():
+            return None
+        try:
+            move = int(token)
+        except ValueError:
+            move = -1
+        if not 0 <= move < board.cells or not board.is_empty(move) or board.is_terminal():
+            raise EngineError(f"Недопустимый ход движка: {token}")
+        return move
+
+    def close(self):
+        if self.alive:
+            try:
+                self.send("quit")
+                self.proc.wait(timeout=1)
+            except (EngineError, subprocess.TimeoutExpired):
+                self.proc.kill()
+        self.proc.wait()
+
+
+class EnginePool:
+    """
+    Запущенные движки по командам; свободный процесс отдаётся следующему ходу.
+    """
+
+    def __init__(self):
+        self._idle = {}  # команда -> список свободных EngineProcess
+        self._lock = threading.Lock()
+
+    def acquire(self, command):
+        command = tuple(command)
+        with self._lock:
+            idle = self._idle.get(command, [])
+            while idle:
+                proc = idle.pop()
+                if proc.alive:
+                    return proc
+        return EngineProcess(command)
+
+    def release(self, proc):
+        if proc.alive:
+            with self._lock:
+                self._idle.setdefault(proc.command, []).append(proc)
+
+    def close(self):
+        with self._lock:
+            procs = [proc for idle in self._idle.values() for proc in idle]
+            self._idle.clear()
+        for proc in procs:
+            proc.close()
+
+
+pool = EnginePool()
+
+
+def best_move(board, time_limit=ai.AI_TIME_LIMIT, level=None, command=None, cancel=None,
+              stats=None):
+    """
+    Ход движка из пула.
+    :param command: команда движка (по умолчанию default_command())
+    :raises EngineError: движок недоступен
+    """
+    proc = pool.acquire(command or default_command())
+    try:
+        move = proc.best_move(board, time_limit, level, cancel, stats)
+    except EngineError:
+        proc.close()
+        raise
+    pool.release(proc)
+    return move
+
+
+if __name__ == "__main__":
+    BuiltinEngine().run()
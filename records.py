@@ -0,0 +1,233 @@
+"""
+Компактная запись сыгранных партий.
+
+Каждая партия — заголовок фиксированной длины, по одному байту на ход
+(номер клетки; на поле до 15×15 он помещается в байт) и CRC32 записи.
+Записи дописываются
+в конец журнала через буферизованный файл, поэтому сохранение партии не
+обращается к диску на каждом ходу.
+
+Чтение идёт генератором по отображённому в память файлу: миллионы партий
+можно переиграть или посчитать, не загружая журнал целиком. Обрезанная
+запись (например, после аварийного выхода) пропускается: чтение продолжается
+со следующего заголовка. Байты «TG» встречаются и среди ходов (клетки 84 и 71
+поля 15×15), поэтому найденный при поиске заголовок принимается, только если
+поля заголовка и ходы допустимы и сходится CRC; у старых записей без CRC
+(версии 1–2) — если за записью сразу идёт конец файла или следующий заголовок.
+
+Запуск: python records.py [games.log]  — сводка по журналу
+"""
+
+import mmap
+import os
+import struct
+import zlib
+
+import engine
+
+MAGIC = b"TG"
+VERSION = 3
+# magic, версия, режим, сложность, размер поля, длина линии, результат,
+# число ходов, время начала и конца (секунды Unix), размерность поля
+HEADER = struct.Struct("<2sBBBBBBBIIB")
+# Заголовок версии 1 — тот же без размерности: такие записи только плоские
+HEADER_V1 = struct.Struct("<2sBBBBBBBII")
+# За ходами записи версии 3 — CRC32 заголовка и ходов
+CRC = struct.Struct("<I")
+BUFFER_SIZE = 64 * 1024  # Размер буфера записи, байт
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "games.log")
+
+MODES = ("human", "ai", "network")
+DIFFICULTIES = (None, "easy", "medium", "hard", "mcts", "engine", "tuned")
+# Коды результата
+UNFINISHED, X_WON, O_WON, DRAW = 0, 1, 2, 3
+RESULTS = {UNFINISHED: None, X_WON: engine.X, O_WON: engine.O, DRAW: None}
+
+
+class GameRecord:
+    """
+    Одна партия: режим, сложность, вариант поля, результат, время и ходы.
+    """
+    __slots__ = ("mode", "difficulty", "size", "win_length", "result", "started", "finished",
+                 "moves", "dims")
+
+    def __init__(self, mode, difficulty, size, win_length, result, started, finished, moves,
+                 dims=2):
+        self.mode = mode  # 'human', 'ai' или 'network'
+        self.difficulty = difficulty  # Уровень ИИ или None
+        self.size = size
+        self.win_length = win_length
+        self.result = result  # UNFINISHED, X_WON, O_WON или DRAW
+        self.started = started
+        self.finished = finished
+        self.moves = bytes(moves)  # Номера клеток по порядку, X ходит первым
+        self.dims = dims  # 2 — плоское поле, 3 — куб
+
+    @property
+    def winner(self):
+        return RESULTS[self.result]
+
+    def pack(self):
+        data = HEADER.pack(MAGIC, VERSION, MODES.index(self.mode),
+                           DIFFICULTIES.index(self.difficulty), self.size, self.win_length,
+                           self.result, len(self.moves), int(self.started),
+                           int(self.finished), self.dims) + self.moves
+        return data + CRC.pack(zlib.crc32(data))
+
+    @classmethod
+    def unpack_from(cls, buffer, offset=0, strict=False):
+        """
+        Разбирает запись с позиции offset.
+        :param strict: запись без CRC (версии 1–2) принимается, только если за ней
+                       конец буфера или следующий заголовок — так проверяется
+                       заголовок, найденный поиском после повреждения
+        :return: (GameRecord, позиция следующей записи)
+        :raises ValueError: запись обрезана или повреждена
+        """
+        if offset + HEADER_V1.size > len(buffer):
+            raise ValueError("Обрезанный заголовок записи")
+        (magic, version, mode, difficulty, size, win_length, result, count,
+         started, finished) = HEADER_V1.unpack_from(buffer, offset)
+        if magic != MAGIC or version not in (1, 2, VERSION):
+            raise ValueError("Неизвестный формат записи")
+        header = HEADER_V1 if version == 1 else HEADER
+        if offset + header.size > len(buffer):
+            raise ValueError("Обрезанный заголовок записи")
+        dims = buffer[offset + HEADER_V1.size] if version > 1 else 2
+        cells = size ** dims if dims in (2, 3) else 0
+        if (mode >= len(MODES) or difficulty >= len(DIFFICULTIES) or result not in RESULTS
+                or not 0 < cells <= 256 or not 0 < win_length <= size or count > cells):
+            raise ValueError("Повреждённый заголовок записи")
+        start = offset + header.size
+        end = start + count
+        if end > len(buffer):
+            raise ValueError("Обрезанная запись")
+        moves = bytes(buffer[start:end])
+        if len(set(moves)) != count or (count and max(moves) >= cells):
+            raise ValueError("Повреждённые ходы записи")
+        if version == VERSION:
+            if end + CRC.size > len(buffer):
+                raise ValueError("Обрезанная запись")
+            (crc,) = CRC.unpack_from(buffer, end)
+            if zlib.crc32(buffer[offset:end]) != crc:
+                raise ValueError("Не сходится CRC записи")
+            end += CRC.size
+        elif strict and end < len(buffer) and buffer[end:end + len(MAGIC)] != MAGIC:
+            raise ValueError("За записью нет следующего заголовка")
+        record = cls(MODES[mode], DIFFICULTIES[difficulty], size, win_length, result,
+                     started, finished, moves, dims)
+        return record, end
+
+    def boards(self):
+        """
+        Позиции партии по порядку, начиная с пустого поля.
+        """
+        board = engine.Board(size=self.size, win_length=self.win_length, dims=self.dims)
+        yield board.copy()
+        player = engine.X
+        for cell in self.moves:
+            board.make(cell, player)
+            yield board.copy()
+            player = engine.opponent(player)
+
+    def __repr__(self):
+        shape = "x".join([str(self.size)] * self.dims)
+        return (f"GameRecord({self.mode}, {self.difficulty}, {shape}, "
+                f"result={self.result}, moves={list(self.moves)})")
+
+
+def result_of(board):
+    """
+    Код результата для позиции конца партии.
+    """
+    winner = board.winner()
+    if winner is not None:
+        return X_WON if winner == engine.X else O_WON
+    return DRAW if board.is_full() else UNFINISHED
+
+
+class GameLog:
+    """
+    Журнал партий с буферизованной дозаписью в конец файла.
+    Файл открывается при первой записи.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, buffer_size=BUFFER_SIZE):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._file = None
+
+    def append(self, record):
+        if self._file is None:
+            self._file = open(self.path, "ab", buffering=self.buffer_size)
+        self._file.write(record.pack())
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_records(path=DEFAULT_PATH):
+    """
+    Генератор записей журнала по отображённому в память файлу.
+    Отсутствующий или пустой журнал даёт пустую последовательность.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return
+    with data:
+        offset = 0
+        resync = False  # Заголовок найден поиском, а не следует за прошлой записью
+        while offset < len(data):
+            try:
+                record, offset = GameRecord.unpack_from(data, offset, strict=resync)
+            except ValueError:
+                # Недописанная запись: ищем начало следующей
+                offset = data.find(MAGIC, offset + 1)
+                if offset < 0:
+                    return
+                resync = True
+                continue
+            resync = False
+            yield record
+
+
+def summarize(records):
+    """
+    Сводка по партиям: число партий и ходов, исходы по режимам.
+    :param records: итерируемые GameRecord (например, read_records())
+    :return: словарь
+    """
+    summary = {"games": 0, "moves": 0, "by_mode": {}}
+    names = {UNFINISHED: "unfinished", X_WON: "x_won", O_WON: "o_won", DRAW: "draw"}
+    for record in records:
+        summary["games"] += 1
+        summary["moves"] += len(record.moves)
+        key = record.mode if record.difficulty is None else f"{record.mode}/{record.difficulty}"
+        counts = summary["by_mode"].setdefault(key, dict.fromkeys(names.values(), 0))
+        counts[names[record.result]] += 1
+    return summary
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Сводка по журналу партий")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH, help="файл журнала")
+    args = parser.parse_args(argv)
+    summary = summarize(read_records(args.path))
+    print(f"Партий: {summary['games']}, ходов: {summary['moves']}")
+    for key, counts in sorted(summary["by_mode"].items()):
+        print(f"  {key}: X {counts['x_won']}, O {counts['o_won']}, ничьих {counts['draw']},"
+              f" не доиграно {counts['unfinished']}")
+
+
+if __name__ == "__main__":
+    main()
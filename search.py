@@ -0,0 +1,282 @@
+"""
+Поиск хода на больших полях: альфа-бета с итеративным углублением.
+
+Полный минимакс годится только для 3×3. Для полей N×N с K в ряд используется
+негамакс с альфа-бета отсечением, таблицей транспозиций, упорядочиванием ходов
+(ход из таблицы, затем ходы рядом с центром и фигурами) и эвристической оценкой
+открытых линий. Углубление идёт, пока не исчерпан бюджет времени на ход, и
+возвращается ход последней полностью просчитанной глубины, поэтому ответ
+приходит за фиксированное время.
+
+Если в процессе подключена общая таблица позиций (sharedcache.py), поиск
+берёт из неё позиции, просчитанные другими процессами, и пишет в неё свои.
+"""
+
+import time
+
+import sharedcache
+from engine import X, O, cells_of
+
+WIN_SCORE = 1_000_000
+DEFAULT_TIME_LIMIT = 0.2  # Бюджет на ход, секунды
+CHECK_EVERY = 64  # Как часто (в узлах) сверяться с часами
+SAFETY_MARGIN = 0.1  # Доля бюджета, оставляемая на накладные расходы
+
+# Флаги записей таблицы транспозиций
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class Timeout(Exception):
+    """
+    Бюджет времени на ход исчерпан или поиск отменён.
+    """
+
+
+class AlphaBeta:
+    """
+    Один поиск хода для заданной позиции.
+    """
+
+    def __init__(self, board, time_limit=DEFAULT_TIME_LIMIT, max_depth=None, cancel=None,
+                 stats=None):
+        self.board = board.copy()
+        self.cancel = cancel  # worker.CancelToken или None
+        self.stats = stats  # stats.SearchStats или None
+        self.geo = board.geo
+        # Запас на упорядочивание ходов и выход из рекурсии после таймаута
+        self.deadline = time.perf_counter() + time_limit * (1 - SAFETY_MARGIN)
+        self.max_depth = max_depth or self.geo.cells
+        self.nodes = 0
+        self.tt = {}
+        # Общая с другими процессами таблица (sharedcache) и ключ Зобриста позиции
+        self.shared = sharedcache.table()
+        if self.shared is not None:
+            self.shared.new_search()
+            self.zobrist = sharedcache.zobrist(self.geo)
+            self.hash = sharedcache.position_key(self.board)
+        # Веса эвристики: линия, где у игрока n фигур и нет фигур соперника
+        k = self.geo.win_length
+        self.weights = [0] + [10 ** (n - 1) for n in range(1, k + 1)]
+        self.neighbors = self._neighbor_masks(radius=1 if self.geo.size > 5 else 2)
+        self.center_rank = self._center_rank()
+
+    def _neighbor_masks(self, radius):
+        size = self.geo.size
+        masks = []
+        for k in range(self.geo.cells):
+            row, col = divmod(k, size)
+            mask = 0
+            for r in range(max(0, row - radius), min(size, row + radius + 1)):
+                for c in range(max(0, col - radius), min(size, col + radius + 1)):
+                    mask |= 1 << (r * size + c)
+            masks.append(mask)
+        return masks
+
+    def _center_rank(self):
+        center = (self.geo.size - 1) / 2
+        return [
+            -(abs(k // self.geo.size - center) + abs(k % self.geo.size - center))
+            for k in range(self.geo.cells)
+        ]
+
+    def candidates(self):
+        """
+        Кандидаты в ходы: свободные клетки рядом с уже поставленными фигурами
+        (на пустом поле — центр). Если рядом свободных нет, а поле не заполнено
+        (маски соседей плоские, на кубе они не покрывают верхние слои), —
+        все свободные клетки, чтобы незаконченная позиция не считалась проигрышем.
+        """
+        board = self.board
+        occupied = board.x | board.o
+        if not occupied:
+            center = self.geo.size // 2
+            return [center * self.geo.size + center]
+        near = 0
+        for k in cells_of(occupied):
+            near |= self.neighbors[k]
+        free = ~occupied & self.geo.full
+        return cells_of(near & free or free)
+
+    def evaluate(self, player):
+        """
+        Эвристическая оценка для ходящего игрока по открытым линиям.
+        """
+        mine = self.board.x if player == X else self.board.o
+        theirs = self.board.o if player == X else self.board.x
+        weights = self.weights
+        score = 0
+        for line in self.geo.lines:
+            a = mine & line
+            b = theirs & line
+            if a and not b:
+                score += weights[a.bit_count()]
+            elif b and not a:
+                score -= weights[b.bit_count()]
+        return score
+
+    def order(self, moves, player, tt_move):
+        """
+        Упорядочивает ходы: ход из таблицы, затем по оценке линий через клетку.
+        """
+        mine = self.board.x if player == X else self.board.o
+        theirs = self.board.o if player == X else self.board.x
+        weights = self.weights
+        keyed = []
+        for move in moves:
+            value = self.center_rank[move]
+            for line in self.geo.cell_lines[move]:
+                a = mine & line
+                b = theirs & line
+                if not b:
+                    value += weights[a.bit_count() + 1]
+                if not a:
+                    value += weights[b.bit_count() + 1]
+            keyed.append((value, move))
+        keyed.sort(reverse=True)
+        ordered = [move for _, move in keyed]
+        if tt_move is not None and tt_move in ordered:
+            ordered.remove(tt_move)
+            ordered.insert(0, tt_move)
+        return ordered
+
+    def negamax(self, depth, ply, alpha, beta, player):
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0 and (
+                time.perf_counter() > self.deadline
+                or self.cancel is not None and self.cancel.cancelled):
+            raise Timeout
+        board = self.board
+        if board.x | board.o == self.geo.full:
+            return 0
+        if depth == 0:
+            return self.evaluate(player)
+
+        key = (board.x, board.o)
+        entry = self.tt.get(key)
+        shared = self.shared
+        if shared is not None and depth >= sharedcache.MIN_DEPTH and (
+                entry is None or entry[0] < depth):
+            # Другой процесс мог просчитать позицию глубже
+            found = shared.get(self.hash)
+            if found is not None and (entry is None or found[0] > entry[0]):
+                entry_depth, score, flag, tt_move = found
+                entry = self.tt[key] = (entry_depth, self._from_shared(score, ply), flag, tt_move)
+        tt_move = None
+        if self.stats is not None:
+            if entry is None:
+                self.stats.cache_misses += 1
+            else:
+                self.stats.cache_hits += 1
+        if entry is not None:
+            entry_depth, score, flag, tt_move = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return score
+                if flag == LOWER and score >= beta:
+                    return score
+                if flag == UPPER and score <= alpha:
+                    return score
+
+        original_alpha = alpha
+        other = O if player == X else X
+        zobrist = self.zobrist[0 if player == X else 1] if shared is not None else None
+        best_score = -WIN_SCORE - 1
+        best_move = None
+        for move in self.order(self.candidates(), player, tt_move):
+            board.make(move, player)
+            if board.wins_through(move, player):
+                score = WIN_SCORE - ply
+            else:
+                if zobrist is not None:
+                    self.hash ^= zobrist[move]
+                score = -self.negamax(depth - 1, ply + 1, -beta, -alpha, other)
+                if zobrist is not None:
+                    self.hash ^= zobrist[move]
+            board.unmake(move)
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if self.stats is not None:
+                    self.stats.cutoffs += 1
+                break
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt[key] = (depth, best_score, flag, best_move)
+        if shared is not None and depth >= sharedcache.MIN_DEPTH:
+            shared.put(self.hash, depth, self._to_shared(best_score, ply), flag, best_move)
+        return best_score
+
+    def _to_shared(self, score, ply):
+        # Оценка выигрыша зависит от расстояния до корня; в общую таблицу
+        # пишется расстояние от самой позиции, чтобы запись подходила любому поиску
+        if score >= WIN_SCORE - self.geo.cells:
+            return score + ply
+        if score <= -WIN_SCORE + self.geo.cells:
+            return score - ply
+        return score
+
+    def _from_shared(self, score, ply):
+        if score >= WIN_SCORE - self.geo.cells:
+            return score - ply
+        if score <= -WIN_SCORE + self.geo.cells:
+            return score + ply
+        return score
+
+    def run(self):
+        """
+        Итеративное углубление до исчерпания времени или максимальной глубины.
+        :return: (лучший ход, оценка, достигнутая глубина)
+        """
+        result = self._iterate()
+        if self.stats is not None:
+            self.stats.source = "alphabeta"
+            self.stats.nodes += self.nodes
+            self.stats.max_depth = max(self.stats.max_depth, result[2])
+        return result
+
+    def _iterate(self):
+        board = self.board
+        player = board.to_move
+        moves = self.order(self.candidates(), player, None)
+        if not moves:
+            return None, 0, 0
+        best_move, best_score, reached = moves[0], 0, 0
+        # Немедленная победа не требует поиска
+        for move in moves:
+            board.make(move, player)
+            won = board.wins_through(move, player)
+            board.unmake(move)
+            if won:
+                return move, WIN_SCORE, 1
+        empty = self.geo.cells - (board.x | board.o).bit_count()
+        for depth in range(1, min(self.max_depth, empty) + 1):
+            try:
+                score = self.negamax(depth, 0, -WIN_SCORE - 1, WIN_SCORE + 1, player)
+            except Timeout:
+                break
+            best_move = self.tt[(board.x, board.o)][3]
+            best_score, reached = score, depth
+            if abs(score) >= WIN_SCORE - self.geo.cells:
+                break  # Исход форсирован, глубже искать незачем
+        return best_move, best_score, reached
+
+
+def best_move(board, time_limit=DEFAULT_TIME_LIMIT, max_depth=None, cancel=None, stats=None):
+    """
+    Лучший ход для ходящего игрока в пределах бюджета времени.
+    :param board: engine.Board
+    :param time_limit: бюджет на ход, секунды
+    :param max_depth: ограничение глубины (по умолчанию — до конца партии)
+    :param cancel: worker.CancelToken для досрочной остановки
+    :param stats: stats.SearchStats для счётчиков поиска или None
+    :return: номер клетки или None, если ходов нет
+    """
+    return AlphaBeta(board, time_limit, max_depth, cancel, stats).run()[0]
@@ -0,0 +1,313 @@
+"""
+Сетевой игровой сервер на asyncio.
+
+Клиенты подключаются по TCP и обмениваются JSON-сообщениями, по одному
+на строку. Сервер ведёт много партий одновременно в одном процессе:
+подбирает соперников с одинаковым вариантом поля, проводит партии против
+компьютера и проверяет каждый ход по engine.Board. Состояние партии —
+пара масок и две ссылки на игроков, поэтому простаивающая партия почти
+не занимает памяти.
+
+Сообщения клиента:
+    {"op": "queue", "size": 3, "win": 3}        — найти соперника
+    {"op": "queue", "size": 4, "dims": 3}       — то же на кубе 4×4×4
+    {"op": "ai", "level": "hard", "size": 3}     — партия против компьютера
+    {"op": "move", "cell": 4}                    — ход
+    {"op": "leave"}                              — выйти из партии или очереди
+    {"op": "stats"}                              — число партий и подключений
+Сообщения сервера:
+    {"op": "waiting"}
+    {"op": "start", "match": 1, "you": "X", "size": 3, "win": 3, "dims": 2}
+    {"op": "moved", "cell": 4, "player": "X"}
+    {"op": "over", "winner": "X", "line": [0, 4, 8]}  — winner null при ничьей
+    {"op": "left"}                               — соперник покинул партию
+    {"op": "error", "msg": "..."}
+
+Запуск: python server.py --port 8765
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+
+import ai
+import engine
+import sharedcache
+from client import DEFAULT_HOST, DEFAULT_PORT
+
+MAX_LINE = 1024  # Ограничение длины сообщения, байт
+
+
+class Session:
+    """
+    Одно подключение клиента.
+    """
+    __slots__ = ("writer", "match", "mark", "variant")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.match = None  # Текущая партия
+        self.mark = None  # 'X' или 'O' в текущей партии
+        self.variant = None  # (size, win, dims) в очереди подбора
+
+    def send(self, **message):
+        if not self.writer.is_closing():
+            self.writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+
+
+class Match:
+    """
+    Партия: доска, игроки по меткам и уровень компьютера (если играет он).
+    """
+    __slots__ = ("id", "board", "x", "o", "ai_level", "over")
+
+    def __init__(self, match_id, board, x, o, ai_level=None):
+        self.id = match_id
+        self.board = board
+        self.x = x  # Session или None, если крестиками играет компьютер
+        self.o = o
+        self.ai_level = ai_level
+        self.over = False
+
+    def player(self, mark):
+        return self.x if mark == engine.X else self.o
+
+    def sessions(self):
+        return [s for s in (self.x, self.o) if s is not None]
+
+
+class GameServer:
+    """
+    Реестр партий и очередей подбора соперников.
+    """
+
+    def __init__(self, ai_time_limit=ai.AI_TIME_LIMIT):
+        self.ai_time_limit = ai_time_limit
+        self.matches = {}
+        self.waiting = {}  # (size, win) -> Session
+        self.connections = 0
+        self._next_id = 1
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Запускает TCP-сервер.
+        :return: asyncio.Server
+        """
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+
+    async def handle(self, reader, writer):
+        session = Session(writer)
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # Слишком длинная строка или разрыв соединения
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    handler = self.HANDLERS[message["op"]]
+                except (ValueError, KeyError, TypeError):
+                    session.send(op="error", msg="Некорректное сообщение")
+                    continue
+                await handler(self, session, message)
+        finally:
+            self.connections -= 1
+            self.leave(session)
+            writer.close()
+
+    def new_match(self, board, x, o, ai_level=None):
+        match = Match(self._next_id, board, x, o, ai_level)
+        self._next_id += 1
+        self.matches[match.id] = match
+        for mark, session in ((engine.X, x), (engine.O, o)):
+            if session is not None:
+                session.match = match
+                session.mark = mark
+                session.send(op="start", match=match.id, you=mark,
+                             size=board.size, win=board.win_length, dims=board.dims)
+        return match
+
+    @staticmethod
+    def variant(message):
+        """
+        Вариант поля из сообщения клиента.
+        Принимаются только варианты из engine.VARIANTS и engine.CUBE_VARIANTS:
+        таблицы линий большого поля строились бы секунды прямо в цикле событий.
+        :return: (размер, длина линии, размерность)
+        :raises ValueError: недопустимый вариант
+        """
+        size = int(message.get("size", 3))
+        win = int(message.get("win", size))
+        dims = int(message.get("dims", 2))
+        variants = {2: engine.VARIANTS, 3: engine.CUBE_VARIANTS}.get(dims, ())
+        if (size, win) not in variants:
+            raise ValueError(f"Недопустимый вариант поля: {size}, {win}, {dims}")
+        return size, win, dims
+
+    async def on_queue(self, session, message):
+        self.leave(session)
+        try:
+            variant = self.variant(message)
+        except (ValueError, TypeError):
+            session.send(op="error", msg="Недопустимый вариант поля")
+            return
+        opponent = self.waiting.pop(variant, None)
+        if opponent is None or opponent is session:
+            session.variant = variant
+            self.waiting[variant] = session
+            session.send(op="waiting")
+            return
+        opponent.variant = None
+        # Первым ходит тот, кто дольше ждал
+        size, win, dims = variant
+        self.new_match(engine.Board(size=size, win_length=win, dims=dims), opponent, session)
+
+    async def on_ai(self, session, message):
+        self.leave(session)
+        level = message.get("level", "hard")
+        if level not in ai.LEVELS:
+            session.send(op="error", msg="Неизвестный уровень ИИ")
+            return
+        try:
+            size, win, dims = self.variant(message)
+        except (ValueError, TypeError):
+            session.send(op="error", msg="Недопустимый вариант поля")
+            return
+        if dims == 3 and level not in ai.CUBE_LEVELS:
+            session.send(op="error", msg="Этот уровень ИИ не играет на кубе")
+            return
+        self.new_match(engine.Board(size=size, win_length=win, dims=dims), session, None,
+                       ai_level=level)
+
+    async def on_move(self, session, message):
+        match = session.match
+        if match is None or match.over:
+            session.send(op="error", msg="Нет активной партии")
+            return
+        board = match.board
+        if board.to_move != session.mark:
+            session.send(op="error", msg="Сейчас не ваш ход")
+            return
+        cell = message.get("cell")
+        # bool — подкласс int: true из JSON не должен стать клеткой 1
+        if (not isinstance(cell, int) or isinstance(cell, bool)
+                or not 0 <= cell < board.cells or not board.is_empty(cell)):
+            session.send(op="error", msg="Недопустимый ход")
+            return
+        self.apply(match, cell, session.mark)
+        if match.ai_level is not None and not match.over:
+            await self.ai_reply(match)
+
+    async def ai_reply(self, match):
+        board = match.board
+        if board.geo.is_classic and match.ai_level not in ai.SEARCH_LEVELS:
+            # Ход из книги — мгновенно, без выхода из цикла событий
+            cell = ai.choose_move(match.ai_level, board)
+        else:
+            loop = asyncio.get_running_loop()
+            snapshot = board.copy()
+            if match.ai_level in ("hard", "engine"):
+                search = functools.partial(ai.LEVELS[match.ai_level], snapshot,
+                                           time_limit=self.ai_time_limit)
+                cell = await loop.run_in_executor(None, search)
+            elif match.ai_level == "mcts":
+                # Без пула процессов: потоки сервера и так делят ядра между партиями
+                search = functools.partial(ai.mcts_move, snapshot, time_limit=self.ai_time_limit,
+                                           workers=1)
+                cell = await loop.run_in_executor(None, search)
+            else:
+                cell = await loop.run_in_executor(None, ai.choose_move, match.ai_level, snapshot)
+            if match.over or self.matches.get(match.id) is not match:
+                return  # Игрок ушёл, пока компьютер думал
+        self.apply(match, cell, board.to_move)
+
+    def apply(self, match, cell, mark):
+        """
+        Делает проверенный ход и рассылает его участникам партии.
+        """
+        board = match.board
+        board.make(cell, mark)
+        sessions = match.sessions()
+        for s in sessions:
+            s.send(op="moved", cell=cell, player=mark)
+        if board.wins_through(cell, mark):
+            start, step = board.geo.win_start(board.mask(mark))
+            line = [start + i * step for i in range(board.win_length)]
+            self.finish(match, mark, line)
+        elif board.is_full():
+            self.finish(match, None, [])
+
+    def finish(self, match, winner, line):
+        match.over = True
+        for s in match.sessions():
+            s.send(op="over", winner=winner, line=line)
+            s.match = None
+        self.matches.pop(match.id, None)
+
+    def leave(self, session):
+        """
+        Убирает игрока из очереди и из партии; соперник получает 'left'.
+        """
+        if session.variant is not None:
+            if self.waiting.get(session.variant) is session:
+                del self.waiting[session.variant]
+            session.variant = None
+        match = session.match
+        if match is None:
+            return
+        session.match = None
+        match.over = True
+        self.matches.pop(match.id, None)
+        other = match.player(engine.opponent(session.mark))
+        if other is not None:
+            other.match = None
+            other.send(op="left")
+
+    async def on_leave(self, session, message):
+        self.leave(session)
+
+    async def on_stats(self, session, message):
+        session.send(op="stats", matches=len(self.matches), connections=self.connections,
+                     waiting=len(self.waiting))
+
+    HANDLERS = {
+        "queue": on_queue,
+        "ai": on_ai,
+        "move": on_move,
+        "leave": on_leave,
+        "stats": on_stats,
+    }
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    game_server = GameServer()
+    server = await game_server.start(host, port)
+    print(f"Сервер слушает {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сервер сетевых партий в Крестики-Нолики")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--shared-cache", type=int, default=sharedcache.DEFAULT_SIZE_MB,
+                        metavar="MB", help="общая для партий таблица позиций, МБ (0 — отключить)")
+    args = parser.parse_args(argv)
+    if args.shared_cache:
+        # Потоки исполнителя ищут ходы всех партий через одну таблицу фиксированного размера
+        sharedcache.create(args.shared_cache)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sharedcache.release()
+
+
+if __name__ == "__main__":
+    main()
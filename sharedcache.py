@@ -0,0 +1,180 @@
+"""
+Таблица позиций в общей памяти процессов (multiprocessing.shared_memory).
+
+Альфа-бета поиск (search.py) держит свою таблицу транспозиций в словаре
+процесса и дополнительно пишет просчитанные позиции сюда, поэтому
+обработчики симулятора, турнира и сервера находят позиции, уже решённые
+другими. Размер таблицы задаётся при создании и не растёт с числом
+процессов.
+
+Таблица — массив корзин по BUCKET слотов, слот — два 64-битных слова:
+ключ XOR данные и данные. Блокировок нет: запись кладёт сначала данные,
+затем ключ; читатель принимает слот, только если ключ XOR данные совпадает
+с искомым ключом, поэтому недописанный или перезаписанный слот выглядит
+как промах, а не как чужая позиция. При заполнении корзины вытесняется
+слот из прошлых поисков, затем — с наименьшей глубиной.
+
+Ключ позиции — хеш Зобриста: случайное 64-битное число на каждую пару
+(клетка, игрок), одинаковое во всех процессах (генератор с фиксированным
+зерном), поиск обновляет его при каждом ходе.
+
+Процесс, создавший таблицу (create), удаляет её в release; обработчики
+подключаются по имени (attach, например, в initializer пула процессов).
+"""
+
+import atexit
+import random
+
+DEFAULT_SIZE_MB = 16
+BUCKET = 4  # Слотов в корзине: 64 байта, одна строка кэша
+MIN_DEPTH = 2  # Мельче позиции пишутся только в таблицу процесса
+
+SCORE_OFFSET = 1 << 31
+VALID = 1 << 63
+# Раскладка слова данных: оценка (32 бита), глубина (8), флаг (2), ход + 1 (8), поколение (8)
+DEPTH_SHIFT, FLAG_SHIFT, MOVE_SHIFT, GENERATION_SHIFT = 32, 40, 42, 50
+HEADER_WORDS = 2  # Слово 0 — номер поколения (поиска), слово 1 — выравнивание
+
+_table = None  # Таблица этого процесса или None
+_zobrist = {}  # Геометрия -> (ключи крестиков, ключи ноликов, ключ варианта)
+
+
+class SharedTable:
+    """
+    Таблица позиций поверх сегмента общей памяти.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner  # Создатель удаляет сегмент при закрытии
+        self.words = shm.buf.cast("Q")
+        self.buckets = (len(self.words) - HEADER_WORDS) // (2 * BUCKET)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def new_search(self):
+        """
+        Начинает новое поколение: записи прошлых поисков вытесняются первыми.
+        Счётчик общий, гонка двух процессов лишь пропускает номер.
+        """
+        self.words[0] = (self.words[0] + 1) & 0xFF
+
+    def get(self, key):
+        """
+        :return: (глубина, оценка, флаг, ход) или None
+        """
+        words = self.words
+        base = HEADER_WORDS + key % self.buckets * 2 * BUCKET
+        for i in range(base, base + 2 * BUCKET, 2):
+            data = words[i + 1]
+            if data and words[i] ^ data == key:
+                move = (data >> MOVE_SHIFT & 0xFF) - 1
+                return (data >> DEPTH_SHIFT & 0xFF, (data & 0xFFFFFFFF) - SCORE_OFFSET,
+                        data >> FLAG_SHIFT & 3, None if move < 0 else move)
+        return None
+
+    def put(self, key, depth, score, flag, move):
+        words = self.words
+        generation = words[0]
+        data = (VALID | (score + SCORE_OFFSET) | depth << DEPTH_SHIFT | flag << FLAG_SHIFT
+                | (0 if move is None else move + 1) << MOVE_SHIFT
+                | generation << GENERATION_SHIFT)
+        base = HEADER_WORDS + key % self.buckets * 2 * BUCKET
+        victim = base
+        victim_rank = 1 << 9
+        for i in range(base, base + 2 * BUCKET, 2):
+            old = words[i + 1]
+            if not old or words[i] ^ old == key:
+                victim = i
+                break
+            # Сначала вытесняются старые поколения, среди них — мелкие записи
+            rank = ((old >> GENERATION_SHIFT & 0xFF) == generation) << 8 | old >> DEPTH_SHIFT & 0xFF
+            if rank < victim_rank:
+                victim, victim_rank = i, rank
+        words[victim + 1] = data
+        words[victim] = key ^ data
+
+    def close(self):
+        self.words.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def zobrist(geo):
+    """
+    Ключи Зобриста для геометрии, одинаковые во всех процессах.
+    Зерно и ключ варианта зависят от размерности: поле 3×3 и куб 3×3×3 не смешиваются.
+    :return: (ключи клеток крестиков, ключи клеток ноликов, ключ варианта)
+    """
+    keys = _zobrist.get(geo)
+    if keys is None:
+        rng = random.Random(f"{geo.dims}:{geo.size}:{geo.win_length}")
+        x_keys = tuple(rng.getrandbits(64) for _ in range(geo.cells))
+        o_keys = tuple(rng.getrandbits(64) for _ in range(geo.cells))
+        keys = _zobrist[geo] = (x_keys, o_keys, rng.getrandbits(64))
+    return keys
+
+
+def position_key(board):
+    """
+    Ключ Зобриста позиции.
+    """
+    x_keys, o_keys, key = zobrist(board.geo)
+    for k in range(board.cells):
+        if board.x >> k & 1:
+            key ^= x_keys[k]
+        elif board.o >> k & 1:
+            key ^= o_keys[k]
+    return key
+
+
+def table():
+    """
+    Таблица, созданная или подключённая в этом процессе, или None.
+    """
+    return _table
+
+
+def create(size_mb=DEFAULT_SIZE_MB):
+    """
+    Создаёт сегмент и делает его таблицей этого процесса.
+    :return: имя сегмента для attach в других процессах
+    """
+    global _table
+    # Импорт нужен только процессам с таблицей
+    from multiprocessing import shared_memory
+    buckets = max(1, size_mb * 1024 * 1024 // (16 * BUCKET))
+    shm = shared_memory.SharedMemory(create=True, size=(HEADER_WORDS + 2 * BUCKET * buckets) * 8)
+    release()
+    _table = SharedTable(shm, owner=True)
+    atexit.register(release)
+    return shm.name
+
+
+def attach(name):
+    """
+    Подключает таблицу по имени (в процессе-обработчике).
+    """
+    global _table
+    if _table is not None and _table.name == name:
+        # Процесс создан через fork и унаследовал таблицу: удалять её не ему
+        _table.owner = False
+        return
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=name)
+    release()
+    _table = SharedTable(shm, owner=False)
+    atexit.register(release)
+
+
+def release():
+    """
+    Отключает таблицу этого процесса; создатель удаляет сегмент.
+    """
+    global _table
+    if _table is not None:
+        _table.close()
+        _table = None
@@ -0,0 +1,172 @@
+"""
+Безголовый симулятор партий компьютер против компьютера.
+
+Играет N партий между двумя уровнями ИИ на всех ядрах процессора и печатает
+статистику побед, ничьих и поражений первого уровня и скорость в партиях
+в секунду. Партии разбиты на пачки фиксированного размера, каждая пачка
+получает свой генератор случайных чисел от общего зерна, поэтому при одном
+и том же --seed результат не зависит от числа процессов.
+
+Запуск: python simulate.py easy hard -n 100000 --seed 1
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ai
+import engine
+import sharedcache
+
+CHUNK_SIZE = 1000  # Партий в одной задаче для процесса
+
+
+def level_move(level, board, rng, time_limit=ai.AI_TIME_LIMIT):
+    """
+    Ход уровня ИИ в процессе-обработчике.
+    :return: номер клетки
+    """
+    if level == "hard":
+        return ai.hard_move(board, rng, time_limit)
+    if level == "mcts":
+        # Симулятор сам занимает все ядра: деревья строятся в этом процессе
+        return ai.mcts_move(board, rng, time_limit, workers=1)
+    if level == "engine":
+        # Процесс движка остаётся запущенным между партиями пачки
+        return ai.engine_move(board, rng, time_limit)
+    return ai.choose_move(level, board, rng)
+
+
+def play_game(first, second, rng, size=3, win_length=3, time_limit=ai.AI_TIME_LIMIT):
+    """
+    Играет одну партию: first ходит крестиками, second — ноликами.
+    :param first: уровень ИИ первого игрока
+    :param second: уровень ИИ второго игрока
+    :param rng: random.Random для случайных ходов
+    :return: 'X', 'O' или None при ничьей
+    """
+    board = engine.Board(size=size, win_length=win_length)
+    levels = {engine.X: first, engine.O: second}
+    player = engine.X
+    while True:
+        cell = level_move(levels[player], board, rng, time_limit)
+        board.make(cell, player)
+        if board.wins_through(cell, player):
+            return player
+        if board.is_full():
+            return None
+        player = engine.opponent(player)
+
+
+def play_chunk(task):
+    """
+    Играет пачку партий в процессе-обработчике.
+    :param task: (first, second, games, seed, chunk, swap, size, win_length, time_limit)
+    :return: (победы first, ничьи, поражения first)
+    """
+    first, second, games, seed, chunk, swap, size, win_length, time_limit = task
+    rng = random.Random(seed * 1_000_003 + chunk)
+    wins = draws = losses = 0
+    for game in range(games):
+        # При swap уровни меняются цветами через партию
+        flipped = swap and (chunk * CHUNK_SIZE + game) % 2 == 1
+        if flipped:
+            winner = play_game(second, first, rng, size, win_length, time_limit)
+            first_mark = engine.O
+        else:
+            winner = play_game(first, second, rng, size, win_length, time_limit)
+            first_mark = engine.X
+        if winner is None:
+            draws += 1
+        elif winner == first_mark:
+            wins += 1
+        else:
+            losses += 1
+    return wins, draws, losses
+
+
+def simulate(first, second, games, seed=0, workers=None, swap=False,
+             size=3, win_length=3, time_limit=ai.AI_TIME_LIMIT,
+             shared_cache=sharedcache.DEFAULT_SIZE_MB):
+    """
+    Играет games партий на пуле процессов.
+    :param shared_cache: размер общей таблицы позиций процессов, МБ (0 — без неё)
+    :return: словарь со статистикой
+    :raises ValueError: неизвестный уровень или games <= 0
+    """
+    if games <= 0:
+        raise ValueError(f"Число партий должно быть положительным: {games}")
+    for level in (first, second):
+        if level not in ai.LEVELS:
+            raise ValueError(f"Неизвестный уровень ИИ: {level}")
+    tasks = []
+    for chunk, start in enumerate(range(0, games, CHUNK_SIZE)):
+        count = min(CHUNK_SIZE, games - start)
+        tasks.append((first, second, count, seed, chunk, swap, size, win_length, time_limit))
+    started = time.perf_counter()
+    wins = draws = losses = 0
+    shared = None
+    if workers == 1:
+        results = map(play_chunk, tasks)
+    else:
+        # На 3×3 ход берётся из книги, поиску на больших полях нужна общая таблица
+        if shared_cache and not engine.geometry(size, win_length).is_classic:
+            shared = sharedcache.create(shared_cache)
+        pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                   initializer=sharedcache.attach if shared else None,
+                                   initargs=(shared,) if shared else ())
+        results = pool.map(play_chunk, tasks)
+    try:
+        for w, d, l in results:
+            wins += w
+            draws += d
+            losses += l
+    finally:
+        if workers != 1:
+            pool.shutdown()
+        if shared is not None:
+            sharedcache.release()
+    elapsed = time.perf_counter() - started
+    return {
+        "first": first,
+        "second": second,
+        "games": games,
+        "wins": wins,
+        "draws": draws,
+        "losses": losses,
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed else float("inf"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Партии ИИ против ИИ без интерфейса")
+    parser.add_argument("first", choices=sorted(ai.LEVELS), help="уровень, играющий крестиками")
+    parser.add_argument("second", choices=sorted(ai.LEVELS), help="уровень, играющий ноликами")
+    parser.add_argument("-n", "--games", type=int, default=10000, help="число партий")
+    parser.add_argument("--seed", type=int, default=0, help="зерно генератора случайных чисел")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию — все ядра)")
+    parser.add_argument("--swap", action="store_true", help="менять цвета через партию")
+    parser.add_argument("--size", type=int, default=3, help="размер поля")
+    parser.add_argument("--win", type=int, default=None, help="длина линии для победы")
+    parser.add_argument("--time-limit", type=float, default=ai.AI_TIME_LIMIT,
+                        help="бюджет сложного ИИ на ход на больших полях и MCTS, секунды")
+    parser.add_argument("--shared-cache", type=int, default=sharedcache.DEFAULT_SIZE_MB,
+                        metavar="MB", help="общая таблица позиций процессов, МБ (0 — отключить)")
+    args = parser.parse_args(argv)
+    if args.games <= 0:
+        parser.error("число партий должно быть положительным")
+
+    stats = simulate(args.first, args.second, args.games, args.seed, args.workers, args.swap,
+                     args.size, args.win or args.size, args.time_limit, args.shared_cache)
+    games = stats["games"]
+    print(f"{stats['first']} против {stats['second']}: {games} партий")
+    for name, key in (("Победы", "wins"), ("Ничьи", "draws"), ("Поражения", "losses")):
+        print(f"  {name}: {stats[key]} ({100 * stats[key] / games:.2f}%)")
+    print(f"  Время: {stats['seconds']:.2f} с, {stats['games_per_second']:.0f} партий/с")
+
+
+if __name__ == "__main__":
+    main()
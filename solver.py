@@ -0,0 +1,184 @@
+"""
+Точный решатель Крестиков-Ноликов 3×3 с таблицей транспозиций.
+
+Позиции кэшируются по каноническому ключу, одинаковому для всех 8 поворотов
+и отражений доски, поэтому кэш общий для симметричных позиций и сохраняется
+между ходами и партиями. После прогрева ход сложного ИИ сводится к одному
+обращению к словарю.
+"""
+
+import time
+
+from engine import CELLS, FULL, MOVES_TABLE, SIZE, WIN_TABLE
+
+# Перестановки клеток для 8 симметрий квадрата: perm[k] — откуда берётся
+# клетка k преобразованной доски.
+SYMMETRIES = []
+for _rot in range(4):
+    for _flip in (False, True):
+        _perm = []
+        for _k in range(CELLS):
+            _r, _c = divmod(_k, SIZE)
+            if _flip:
+                _c = SIZE - 1 - _c
+            for _ in range(_rot):
+                _r, _c = _c, SIZE - 1 - _r
+            _perm.append(_r * SIZE + _c)
+        SYMMETRIES.append(tuple(_perm))
+del _rot, _flip, _perm, _k, _r, _c
+
+# Обратные перестановки: переводят клетку исходной доски в каноническую
+INVERSE = [tuple(perm.index(k) for k in range(CELLS)) for perm in SYMMETRIES]
+
+# SYM_TABLES[s][mask] — маска после применения симметрии s; строится при первом поиске
+SYM_TABLES = None
+
+WIN_SCORE = 10
+
+# Таблица транспозиций: канонический ключ -> (оценка, лучший ход в канонических координатах)
+_cache = {}
+
+
+def sym_tables():
+    """
+    Таблицы симметрий: маска строится из маски без младшего бита,
+    к которой добавляется образ этого бита.
+    """
+    global SYM_TABLES
+    if SYM_TABLES is None:
+        tables = []
+        for inverse in INVERSE:
+            table = [0] * (FULL + 1)
+            for mask in range(1, FULL + 1):
+                low = mask & -mask
+                table[mask] = table[mask ^ low] | 1 << inverse[low.bit_length() - 1]
+            tables.append(tuple(table))
+        SYM_TABLES = tables
+    return SYM_TABLES
+
+
+def canonical(x, o):
+    """
+    Возвращает канонический ключ позиции и индекс симметрии, которая к нему приводит.
+    :param x: маска крестиков
+    :param o: маска ноликов
+    :return: (ключ, индекс симметрии)
+    """
+    best_key = -1
+    best_sym = 0
+    for sym, table in enumerate(SYM_TABLES or sym_tables()):
+        key = table[x] << CELLS | table[o]
+        if best_key < 0 or key < best_key:
+            best_key = key
+            best_sym = sym
+    return best_key, best_sym
+
+
+def _solve(x, o, stats=None, ply=0):
+    """
+    Негамакс с мемоизацией по каноническому ключу. Ходящий определяется
+    по числу фигур (крестики ходят первыми).
+    :param x: маска крестиков
+    :param o: маска ноликов
+    :param stats: stats.SearchStats или None
+    :param ply: расстояние от корня поиска (для статистики)
+    :return: (оценка для ходящего, лучший ход или None)
+    """
+    key, sym = canonical(x, o)
+    entry = _cache.get(key)
+    if entry is not None:
+        if stats is not None:
+            stats.cache_hits += 1
+        score, move = entry
+        return score, (SYMMETRIES[sym][move] if move is not None else None)
+    if stats is not None:
+        stats.cache_misses += 1
+        stats.nodes += 1
+        if ply > stats.max_depth:
+            stats.max_depth = ply
+
+    x_to_move = bin(x).count("1") == bin(o).count("1")
+    if WIN_TABLE[o if x_to_move else x]:
+        result = (-WIN_SCORE, None)
+    elif x | o == FULL:
+        result = (0, None)
+    else:
+        best_score = None
+        best_move = None
+        for k in MOVES_TABLE[x | o]:
+            if x_to_move:
+                score = -_solve(x | 1 << k, o, stats, ply + 1)[0]
+            else:
+                score = -_solve(x, o | 1 << k, stats, ply + 1)[0]
+            # Быстрая победа ценнее долгой, долгое поражение лучше быстрого
+            if score > 0:
+                score -= 1
+            elif score < 0:
+                score += 1
+            if best_score is None or score > best_score:
+                best_score = score
+                best_move = k
+        result = (best_score, best_move)
+
+    score, move = result
+    # В кэш ход кладётся в координатах канонической доски
+    _cache[key] = (score, INVERSE[sym][move] if move is not None else None)
+    return result
+
+
+def best_move(board, stats=None):
+    """
+    Находит лучший ход для ходящего игрока при идеальной игре обеих сторон.
+    :param board: engine.Board
+    :param stats: stats.SearchStats для счётчиков поиска или None
+    :return: номер клетки или None, если ходов нет
+    """
+    if stats is None:
+        return _solve(board.x, board.o)[1]
+    started = time.perf_counter()
+    stats.source = "solver"
+    move = _solve(board.x, board.o, stats)[1]
+    stats.elapsed = time.perf_counter() - started
+    return move
+
+
+def evaluate(board):
+    """
+    Оценка позиции для ходящего игрока: >0 — выигрыш, 0 — ничья, <0 — проигрыш.
+    :param board: engine.Board
+    """
+    return _solve(board.x, board.o)[0]
+
+
+def move_scores(board):
+    """
+    Оценки всех ходов ходящего игрока в той же шкале, что и evaluate.
+    :param board: engine.Board
+    :return: словарь {клетка: оценка}
+    """
+    player = board.to_move
+    scores = {}
+    for k in board.legal_moves():
+        board.make(k, player)
+        score = -evaluate(board)
+        board.unmake(k)
+        if score > 0:
+            score -= 1
+        elif score < 0:
+            score += 1
+        scores[k] = score
+    return scores
+
+
+def cache_size():
+    """
+    Количество позиций в таблице транспозиций.
+    """
+    return len(_cache)
+
+
+def clear_cache():
+    """
+    Очищает таблицу транспозиций.
+    """
+    _cache.clear()
@@ -0,0 +1,51 @@
+"""
+Статистика поиска хода: узлы, глубина, отсечения, попадания в кэш и время.
+
+Функции поиска принимают необязательный аргумент stats. Если он None
+(по умолчанию), ничего не считается и не замеряется; иначе в переданный
+объект SearchStats записываются счётчики последнего поиска.
+"""
+
+
+class SearchStats:
+    """
+    Счётчики одного поиска хода.
+    """
+    __slots__ = ("source", "nodes", "max_depth", "cutoffs", "cache_hits", "cache_misses",
+                 "elapsed", "ui_time")
+
+    def __init__(self, source=""):
+        # Кто выбрал ход: book, solver, alphabeta, mcts, minimax, random, rules, engine, analysis
+        self.source = source
+        self.nodes = 0  # Просмотрено позиций
+        self.max_depth = 0  # Достигнутая глубина, полуходы
+        self.cutoffs = 0  # Альфа-бета отсечения
+        self.cache_hits = 0  # Попадания в кэш/таблицу
+        self.cache_misses = 0  # Промахи кэша
+        self.elapsed = 0.0  # Время поиска, секунды
+        self.ui_time = 0.0  # Время обновления окна после хода, секунды
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def summary(self):
+        """
+        Однострочное описание для отладочной панели.
+        """
+        parts = [self.source or "?"]
+        if self.nodes:
+            parts.append(f"узлов {self.nodes}")
+        if self.max_depth:
+            parts.append(f"глубина {self.max_depth}")
+        if self.cutoffs:
+            parts.append(f"отсечений {self.cutoffs}")
+        if self.cache_hits or self.cache_misses:
+            parts.append(f"кэш {self.cache_hits}/{self.cache_hits + self.cache_misses}")
+        if self.elapsed:
+            parts.append(f"поиск {self.elapsed * 1000:.2f} мс")
+        if self.ui_time:
+            parts.append(f"окно {self.ui_time * 1000:.2f} мс")
+        return ", ".join(parts)
+
+    def __repr__(self):
+        return f"SearchStats({self.summary()})"
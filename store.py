@@ -0,0 +1,271 @@
+"""
+Постоянное хранилище профилей, итогов партий и недоигранной партии (SQLite).
+
+Итоги хранятся счётчиками побед, ничьих и поражений на профиль, режим,
+сложность и вариант поля (размер, длина линии, плоское поле или куб),
+поэтому при запуске читается короткая сводка, а не вся история (полная
+история партий — в журнале records.py).
+Недоигранная партия хранится одной строкой на профиль: ходы и настройки,
+чтобы окно могло продолжить её при следующем запуске.
+
+Запись идёт в фоновом потоке: окно только кладёт изменения в очередь,
+поток раз в FLUSH_INTERVAL секунд записывает накопленное одной транзакцией.
+Из нескольких состояний одной недоигранной партии пишется последнее.
+Если транзакция не удалась (база заблокирована, только для чтения, диск
+заполнен), ошибка пишется в лог, изменения возвращаются в очередь и
+повторяются через FLUSH_INTERVAL; последняя ошибка видна в Store.error.
+"""
+
+import getpass
+import logging
+import os
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "games.db")
+FLUSH_INTERVAL = 0.5  # Период записи накопленных изменений, секунды
+CLOSE_ATTEMPTS = 3  # Попыток записать остаток при закрытии
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    profile INTEGER NOT NULL REFERENCES profiles(id),
+    mode TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    win_length INTEGER NOT NULL,
+    dims INTEGER NOT NULL,
+    wins INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (profile, mode, difficulty, size, win_length, dims)
+);
+CREATE TABLE IF NOT EXISTS current_game (
+    profile INTEGER PRIMARY KEY REFERENCES profiles(id),
+    mode TEXT NOT NULL,
+    difficulty TEXT,
+    strength REAL,
+    size INTEGER NOT NULL,
+    win_length INTEGER NOT NULL,
+    moves BLOB NOT NULL,
+    started REAL NOT NULL,
+    dims INTEGER NOT NULL
+);
+"""
+
+WIN, DRAW, LOSS = "wins", "draws", "losses"
+
+
+def default_profile():
+    """
+    Имя профиля по умолчанию — имя пользователя системы.
+    """
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):  # Нет учётной записи (контейнеры и т. п.)
+        return "player"
+
+
+class SavedGame:
+    """
+    Недоигранная партия профиля.
+    """
+    __slots__ = ("mode", "difficulty", "strength", "size", "win_length", "moves", "started", "dims")
+
+    def __init__(self, mode, difficulty, strength, size, win_length, moves, started, dims=2):
+        self.mode = mode  # 'human' или 'ai'
+        self.difficulty = difficulty
+        self.strength = strength  # Сила уровня tuned или None
+        self.size = size
+        self.win_length = win_length
+        self.moves = bytes(moves)  # Номера клеток по порядку, X ходит первым
+        self.started = started
+        self.dims = dims  # 2 — плоское поле, 3 — куб
+
+
+class Store:
+    """
+    Хранилище с фоновой пакетной записью. Чтение — только при открытии
+    (профиль, сводка и недоигранная партия), дальше сводка обновляется в памяти.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, profile=None, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.profile_name = profile or default_profile()
+        db = self._connect()
+        try:
+            db.executescript(SCHEMA)
+            with db:
+                db.execute("INSERT OR IGNORE INTO profiles (name, created) VALUES (?, ?)",
+                           (self.profile_name, time.time()))
+            self.profile = db.execute("SELECT id FROM profiles WHERE name = ?",
+                                      (self.profile_name,)).fetchone()[0]
+            self.summary = self._read_summary(db)
+            self.saved_game = self._read_saved_game(db)
+        finally:
+            db.close()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._results = []  # Итоги, ещё не записанные
+        self._game = None  # Последнее состояние недоигранной партии, ещё не записанное
+        self._game_changed = False
+        self._closing = threading.Event()
+        self.error = None  # Последняя ошибка записи или None, если запись идёт
+        self._thread = threading.Thread(target=self._run, name="store-writer", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        import sqlite3  # Модуль загружается при открытии хранилища, а не при импорте
+        db = sqlite3.connect(self.path, timeout=5)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _read_summary(self, db):
+        """
+        :return: словарь (режим, сложность, размер, длина линии, размерность) ->
+                 [победы, ничьи, поражения]
+        """
+        rows = db.execute("SELECT mode, difficulty, size, win_length, dims, wins, draws, losses "
+                          "FROM results WHERE profile = ?", (self.profile,))
+        return {tuple(row[:5]): list(row[5:]) for row in rows}
+
+    def _read_saved_game(self, db):
+        row = db.execute("SELECT mode, difficulty, strength, size, win_length, moves, started, "
+                         "dims FROM current_game WHERE profile = ?", (self.profile,)).fetchone()
+        return SavedGame(*row) if row is not None else None
+
+    def totals(self, mode=None):
+        """
+        Победы, ничьи и поражения профиля (в режиме mode или во всех).
+        """
+        totals = [0, 0, 0]
+        for key, counts in self.summary.items():
+            if mode is None or key[0] == mode:
+                for i in range(3):
+                    totals[i] += counts[i]
+        return tuple(totals)
+
+    # Изменения только ставятся в очередь: окно не ждёт диска
+    def add_result(self, mode, difficulty, size, win_length, outcome, dims=2):
+        """
+        :param outcome: WIN, DRAW или LOSS с точки зрения игрока профиля
+        """
+        key = (mode, difficulty or "", size, win_length, dims)
+        counts = self.summary.setdefault(key, [0, 0, 0])
+        counts[(WIN, DRAW, LOSS).index(outcome)] += 1
+        with self._lock:
+            self._results.append((*key, outcome))
+        self._wake.set()
+
+    def save_game(self, mode, difficulty, strength, size, win_length, moves, started, dims=2):
+        with self._lock:
+            self._game = SavedGame(mode, difficulty, strength, size, win_length, moves, started,
+                                   dims)
+            self._game_changed = True
+        self._wake.set()
+
+    def clear_game(self):
+        with self._lock:
+            self._game = None
+            self._game_changed = True
+        self._wake.set()
+
+    def _run(self):
+        import sqlite3
+        db = None
+        close_attempts = 0
+        while True:
+            closing = self._closing.is_set()
+            if not closing:
+                self._wake.wait()
+                # Изменения за интервал собираются в одну транзакцию; close прерывает ожидание
+                self._closing.wait(self.flush_interval)
+                self._wake.clear()
+            try:
+                if db is None:
+                    db = self._connect()
+                self._write(db)
+                self.error = None
+            except sqlite3.Error as error:
+                if self.error is None:
+                    log.warning("Хранилище %s: запись не удалась, повтор: %s", self.path, error)
+                self.error = error
+                self._wake.set()  # Повтор через flush_interval и без новых изменений
+            if closing:
+                close_attempts += 1
+                if self.error is None:
+                    break
+                if close_attempts >= CLOSE_ATTEMPTS:
+                    log.error("Хранилище %s: изменения не записаны при закрытии: %s",
+                              self.path, self.error)
+                    break
+                time.sleep(self.flush_interval)
+        if db is not None:
+            db.close()
+
+    def _write(self, db):
+        """
+        Записывает накопленное одной транзакцией.
+        :raises sqlite3.Error: изменения возвращены в очередь
+        """
+        with self._lock:
+            results, self._results = self._results, []
+            game, changed = self._game, self._game_changed
+            self._game_changed = False
+        if not results and not changed:
+            return
+        try:
+            self._apply(db, results, game, changed)
+        except Exception:
+            with self._lock:
+                self._results[:0] = results
+                # Более новое состояние партии, если оно появилось, важнее
+                self._game_changed = self._game_changed or changed
+            raise
+
+    def _apply(self, db, results, game, changed):
+        with db:
+            for mode, difficulty, size, win_length, dims, outcome in results:
+                db.execute("INSERT OR IGNORE INTO results (profile, mode, difficulty, size, "
+                           "win_length, dims) VALUES (?, ?, ?, ?, ?, ?)",
+                           (self.profile, mode, difficulty, size, win_length, dims))
+                # outcome — одно из имён столбцов WIN, DRAW, LOSS
+                db.execute(f"UPDATE results SET {outcome} = {outcome} + 1 WHERE profile = ? "
+                           "AND mode = ? AND difficulty = ? AND size = ? AND win_length = ? "
+                           "AND dims = ?",
+                           (self.profile, mode, difficulty, size, win_length, dims))
+            if changed and game is None:
+                db.execute("DELETE FROM current_game WHERE profile = ?", (self.profile,))
+            elif changed:
+                db.execute("INSERT OR REPLACE INTO current_game VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           (self.profile, game.mode, game.difficulty, game.strength, game.size,
+                            game.win_length, game.moves, game.started, game.dims))
+
+    def close(self):
+        """
+        Записывает накопленное и останавливает поток записи.
+        """
+        if self._closing.is_set():
+            return
+        self._closing.set()
+        self._wake.set()
+        self._thread.join()
+
+
+def open_store(path=DEFAULT_PATH, profile=None):
+    """
+    Хранилище или None, если база недоступна: окно работает и без неё.
+    """
+    import sqlite3
+    try:
+        return Store(path, profile)
+    except (sqlite3.Error, OSError):
+        return None
@@ -0,0 +1,64 @@
+import random
+
+import ai
+import analysis
+import engine
+import search
+
+
+def position():
+    board = engine.Board(size=15, win_length=5)
+    for cell, player in ((112, "X"), (113, "O"), (97, "X"), (127, "O")):
+        board.make(cell, player)
+    return board
+
+
+def timed_out(monkeypatch):
+    """
+    Поиск, не успевший пройти глубину 1.
+    """
+    def run(self):
+        return self.candidates()[0], 0, 0
+    monkeypatch.setattr(search.AlphaBeta, "run", run)
+
+
+def test_timed_out_scores_are_not_cached(monkeypatch):
+    analyzer = analysis.Analyzer()
+    timed_out(monkeypatch)
+    assert analyzer.move_scores(position()) is None
+    assert analyzer.cached(position()) is None
+
+
+def test_timed_out_review_is_not_labelled(monkeypatch):
+    timed_out(monkeypatch)
+    assert analysis.Analyzer().review([112, 113, 97], 15, 5) == []
+
+
+def test_tuned_move_respects_budget(monkeypatch):
+    budgets = []
+    original = analysis.Analyzer._search_scores
+
+    def search_scores(board, cells, cancel, time_limit):
+        budgets.append(time_limit)
+        return original(board, cells, cancel, time_limit)
+    monkeypatch.setattr(analysis.Analyzer, "_search_scores", staticmethod(search_scores))
+    monkeypatch.setattr(analysis, "analyzer", analysis.Analyzer())
+    move = ai.tuned_move(position(), random.Random(1), strength=0, time_limit=0.05)
+    assert budgets == [0.05]
+    assert position().is_empty(move)
+
+
+def test_tuned_move_without_labels_plays_near_pieces(monkeypatch):
+    timed_out(monkeypatch)
+    monkeypatch.setattr(analysis, "analyzer", analysis.Analyzer())
+    board = position()
+    move = ai.tuned_move(board, random.Random(1), strength=0)
+    assert move in analysis.Analyzer.candidates(board)
+
+
+def test_classic_scores_are_exact():
+    board = engine.Board()
+    board.make(0, engine.X)
+    scores = analysis.Analyzer().move_scores(board)
+    assert analysis.classify(scores, 4, board.geo) == analysis.BEST
+    assert analysis.classify(scores, 1, board.geo) == analysis.BLUNDER
@@ -0,0 +1,53 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import batch  # noqa: E402
+import engine  # noqa: E402
+
+
+def test_matches_engine_on_legal_positions():
+    boards = [engine.Board(), engine.Board(0b000000111, 0b000011000),
+              engine.Board(0b001010100, 0b100000001)]
+    result = batch.evaluate(batch.encode(boards))
+    assert [int(w) for w in result["winner"]] == [0, 1, 1]
+    assert result["terminal"].tolist() == [False, True, True]
+    assert int(result["value"][0]) == 0
+
+
+@pytest.mark.parametrize("code", [3, -1, 127])
+def test_invalid_codes(code):
+    boards = np.zeros((2, 9), dtype=np.int16)
+    boards[1, 4] = code
+    with pytest.raises(ValueError, match="Коды клеток"):
+        batch.evaluate(boards)
+    with pytest.raises(ValueError, match="Коды клеток"):
+        batch.values(boards)
+
+
+def test_float_codes_are_rejected():
+    with pytest.raises(ValueError):
+        batch.evaluate(np.full((1, 9), 0.5))
+
+
+def test_both_players_with_lines_are_rejected():
+    # X: верхняя строка, O: средняя строка, фигур поровну
+    board = [[1, 1, 1, 2, 2, 2, 0, 0, 0]]
+    with pytest.raises(ValueError, match="Доска 0"):
+        batch.evaluate(board)
+    with pytest.raises(ValueError, match="обоих"):
+        batch.evaluate(np.array([[1, 1, 1, 0, 2, 2, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0]]), size=4,
+                       win_length=3)
+
+
+def test_wrong_piece_counts_are_rejected():
+    with pytest.raises(ValueError, match="Доска 1"):
+        batch.evaluate([[0] * 9, [2, 0, 0, 0, 0, 0, 0, 0, 0]])
+    with pytest.raises(ValueError):
+        batch.evaluate([[1, 1, 0, 0, 0, 0, 0, 0, 0]])
+
+
+def test_play_after_win_is_rejected_by_values():
+    # X выиграл строкой, но O сделал ещё ход
+    with pytest.raises(ValueError, match="невозможна"):
+        batch.values([[1, 1, 1, 2, 2, 0, 2, 0, 0]])
@@ -0,0 +1,70 @@
+import pytest
+
+import engine
+
+
+def board_of(moves, size=3, win_length=3, dims=2):
+    board = engine.Board(size=size, win_length=win_length, dims=dims)
+    player = engine.X
+    for cell in moves:
+        board.make(cell, player)
+        player = engine.opponent(player)
+    return board
+
+
+@pytest.mark.parametrize("line", [(0, 1, 2), (3, 4, 5), (0, 3, 6), (2, 5, 8), (0, 4, 8), (2, 4, 6)])
+def test_every_line_wins_on_3x3(line):
+    board = engine.Board()
+    for cell in line:
+        board.make(cell, engine.X)
+    assert board.is_win(engine.X)
+    assert not board.is_win(engine.O)
+    assert board.winner() == engine.X
+    assert board.wins_through(line[-1], engine.X)
+    assert sorted(board.cell_of(*rc) for rc in board.winning_line(engine.X)) == list(line)
+
+
+def test_no_win_and_draw():
+    board = board_of([0, 1, 2, 4, 3, 5, 7, 6, 8])
+    assert board.winner() is None
+    assert board.is_full()
+    assert board.is_terminal()
+
+
+def test_five_in_a_row_on_15x15():
+    board = engine.Board(size=15, win_length=5)
+    diagonal = [board.cell_of(3 + i, 10 - i) for i in range(5)]
+    for cell in diagonal[:4]:
+        board.make(cell, engine.O)
+    assert not board.is_win(engine.O)
+    board.make(diagonal[4], engine.O)
+    assert board.is_win(engine.O)
+    assert board.wins_through(diagonal[0], engine.O)
+
+
+def test_row_does_not_wrap_around_the_edge():
+    board = engine.Board(size=15, win_length=5)
+    for cell in (12, 13, 14, 15, 16):  # Конец строки 0 и начало строки 1
+        board.make(cell, engine.X)
+    assert not board.is_win(engine.X)
+
+
+def test_space_diagonal_wins_on_cube():
+    board = engine.Board(size=4, win_length=4, dims=3)
+    for k in range(4):
+        board.make(k * 16 + k * 4 + k, engine.X)
+    assert board.is_win(engine.X)
+    assert len(engine.geometry(4, 4, 3).lines) == 76
+
+
+def test_make_and_unmake():
+    board = board_of([4, 0])
+    board.unmake(0)
+    assert board.is_empty(0)
+    assert board.to_move == engine.O
+    assert list(board.legal_moves()) == [0, 1, 2, 3, 5, 6, 7, 8]
+
+
+def test_impossible_variant():
+    with pytest.raises(ValueError):
+        engine.geometry(3, 4)
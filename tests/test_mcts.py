@@ -0,0 +1,55 @@
+import random
+import time
+from concurrent.futures import Future
+
+import engine
+import mcts
+import worker
+
+
+def count(node):
+    return 1 + sum(count(child) for child in node.children)
+
+
+def test_default_search_does_not_start_a_pool():
+    board = engine.Board(size=5, win_length=4)
+    move = mcts.best_move(board, time_limit=0.05, rng=random.Random(1))
+    assert board.is_empty(move)
+    assert mcts._pool is None
+
+
+def test_tree_size_after_advance():
+    board = engine.Board(size=7, win_length=5)
+    tree = mcts.Tree(board)
+    rng = random.Random(1)
+    for _ in range(2000):
+        tree.iterate(rng)
+    assert tree.size == count(tree.root) == tree.root.nodes
+    child = max(tree.root.children, key=lambda c: c.visits)
+    board.make(child.move, engine.X)
+    reply = max(child.children, key=lambda c: c.visits)
+    board.make(reply.move, engine.O)
+    assert tree.advance(board)
+    assert tree.size == count(tree.root)
+    for _ in range(500):
+        tree.iterate(rng)
+    assert tree.size == count(tree.root) == tree.root.nodes
+
+
+def test_wait_result_stops_at_deadline():
+    future = Future()
+    started = time.monotonic()
+    assert mcts.wait_result(future, started + 0.05, None) is None
+    assert time.monotonic() - started < 0.5
+
+
+def test_wait_result_stops_on_cancel():
+    token = worker.CancelToken()
+    token.cancel()
+    assert mcts.wait_result(Future(), None, token) is None
+
+
+def test_wait_result_returns_ready_result():
+    future = Future()
+    future.set_result(({4: (1, 1.0)}, 1))
+    assert mcts.wait_result(future, time.monotonic() + 1, None) == ({4: (1, 1.0)}, 1)
@@ -0,0 +1,78 @@
+import sys
+import textwrap
+
+import pytest
+
+import ai
+import engine
+import protocol
+
+FAKE_ENGINE = textwrap.dedent("""
+    import sys
+    for line in sys.stdin:
+        words = line.split()
+        if not words:
+            continue
+        if words[0] == "uci":
+            print("uciok", flush=True)
+        elif words[0] == "isready":
+            print("readyok", flush=True)
+        elif words[0] == "go":
+            print("bestmove " + sys.argv[1], flush=True)
+        elif words[0] == "quit":
+            break
+""")
+
+
+@pytest.fixture
+def fake_engine(tmp_path):
+    path = tmp_path / "fake_engine.py"
+    path.write_text(FAKE_ENGINE)
+    yield lambda answer: [sys.executable, str(path), answer]
+    protocol.pool.close()
+
+
+def position():
+    board = engine.Board()
+    board.make(4, engine.X)
+    return board
+
+
+@pytest.mark.parametrize("answer", ["4", "9", "-1", "abc", "1.5", "none"])
+def test_invalid_bestmove_raises(fake_engine, answer):
+    command = fake_engine(answer)
+    with pytest.raises(protocol.EngineError):
+        protocol.best_move(position(), 0.2, command=command)
+    # Процесс с недопустимым ответом не возвращается в пул
+    assert not protocol.pool._idle.get(tuple(command))
+
+
+def test_valid_bestmove(fake_engine):
+    assert protocol.best_move(position(), 0.2, command=fake_engine("0")) == 0
+
+
+def test_none_on_finished_game(fake_engine):
+    board = engine.Board()
+    for cell, player in ((0, "X"), (3, "O"), (1, "X"), (4, "O"), (2, "X")):
+        board.make(cell, player)
+    assert protocol.best_move(board, 0.2, command=fake_engine("none")) is None
+
+
+def test_engine_move_falls_back_to_hard(fake_engine, monkeypatch):
+    command = fake_engine("4")
+    monkeypatch.setenv("TTT_ENGINE", " ".join(command))
+    board = position()
+    move = ai.engine_move(board)
+    assert board.is_empty(move)
+
+
+def test_builtin_engine_plays_legal_moves():
+    board = engine.Board()
+    try:
+        while not board.is_terminal():
+            move = protocol.best_move(board, 0.2)
+            assert board.is_empty(move)
+            board.make(move, board.to_move)
+    finally:
+        protocol.pool.close()
+    assert board.winner() is None  # Идеальная игра на 3×3 — ничья
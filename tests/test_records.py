@@ -0,0 +1,131 @@
+import pytest
+
+import engine
+import records
+
+
+def record(moves, mode="ai", difficulty="hard", size=3, win_length=3, dims=2):
+    board = engine.Board(size=size, win_length=win_length, dims=dims)
+    player = engine.X
+    for cell in moves:
+        board.make(cell, player)
+        player = engine.opponent(player)
+    return records.GameRecord(mode, difficulty, size, win_length, records.result_of(board),
+                              1_700_000_000, 1_700_000_060, moves, dims)
+
+
+def fields(r):
+    return (r.mode, r.difficulty, r.size, r.win_length, r.result, r.started, r.finished,
+            r.moves, r.dims)
+
+
+def write(path, items):
+    log = records.GameLog(str(path))
+    for item in items:
+        log.append(item)
+    log.close()
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "games.log"
+    written = [
+        record([0, 3, 1, 4, 2]),
+        record([4, 0], mode="human", difficulty=None),
+        record([112, 113, 98], difficulty="mcts", size=15, win_length=5),
+        record([0, 1, 21], difficulty="easy", size=4, win_length=4, dims=3),
+    ]
+    write(path, written)
+    read = list(records.read_records(str(path)))
+    assert [fields(r) for r in read] == [fields(r) for r in written]
+    assert read[0].winner == engine.X
+    assert read[1].result == records.UNFINISHED
+
+
+def test_missing_and_empty_log(tmp_path):
+    assert list(records.read_records(str(tmp_path / "missing.log"))) == []
+    (tmp_path / "empty.log").write_bytes(b"")
+    assert list(records.read_records(str(tmp_path / "empty.log"))) == []
+
+
+def test_truncated_tail_is_skipped(tmp_path):
+    path = tmp_path / "games.log"
+    first, second = record([0, 3, 1, 4, 2]), record([4, 0, 8])
+    path.write_bytes(first.pack() + second.pack()[:-2])
+    assert [fields(r) for r in records.read_records(str(path))] == [fields(first)]
+
+
+def test_garbage_between_records_is_skipped(tmp_path):
+    path = tmp_path / "games.log"
+    first, second = record([0, 3, 1, 4, 2]), record([4, 0, 8])
+    path.write_bytes(first.pack() + b"\x00garbage" + second.pack())
+    assert [fields(r) for r in records.read_records(str(path))] == [fields(first), fields(second)]
+
+
+def test_version_1_records_are_read(tmp_path):
+    path = tmp_path / "games.log"
+    moves = bytes([4, 0, 8])
+    path.write_bytes(records.HEADER_V1.pack(records.MAGIC, 1, 1, 3, 3, 3, records.UNFINISHED,
+                                            len(moves), 1, 2) + moves)
+    [read] = records.read_records(str(path))
+    assert read.dims == 2 and read.moves == moves and read.difficulty == "hard"
+
+
+def test_summarize():
+    summary = records.summarize([record([0, 3, 1, 4, 2]), record([4, 0], mode="human",
+                                                                 difficulty=None)])
+    assert summary["games"] == 2
+    assert summary["moves"] == 7
+
+
+def test_version_2_records_are_read(tmp_path):
+    path = tmp_path / "games.log"
+    moves = bytes([0, 1, 21])
+    path.write_bytes(records.HEADER.pack(records.MAGIC, 2, 1, 1, 4, 4, records.UNFINISHED,
+                                         len(moves), 1, 2, 3) + moves)
+    [read] = records.read_records(str(path))
+    assert read.dims == 3 and read.moves == moves and read.difficulty == "easy"
+
+
+def test_crc_mismatch_is_rejected():
+    data = bytearray(record([0, 3, 1, 4, 2]).pack())
+    data[-5] = 8  # Последний ход
+    with pytest.raises(ValueError, match="CRC"):
+        records.GameRecord.unpack_from(bytes(data))
+
+
+def test_invalid_header_fields_are_rejected():
+    moves = bytes([4, 4])
+    for header in (records.HEADER_V1.pack(records.MAGIC, 1, 9, 3, 3, 3, 0, 0, 1, 2),
+                   records.HEADER_V1.pack(records.MAGIC, 1, 1, 3, 3, 7, 0, 0, 1, 2),
+                   records.HEADER_V1.pack(records.MAGIC, 1, 1, 3, 3, 3, 0, 10, 1, 2),
+                   records.HEADER_V1.pack(records.MAGIC, 1, 1, 3, 3, 3, 0, 2, 1, 2) + moves):
+        with pytest.raises(ValueError):
+            records.GameRecord.unpack_from(header + bytes(10))
+
+
+def false_start_log(make):
+    # Ходы 84, 71 на 15×15 дают в записи байты «TG», а следующие ходы похожи на
+    # заголовок версии 1 (поле 5×5, шесть ходов). Заголовок первой записи
+    # повреждён, и поиск натыкается на ложный раньше настоящего
+    damaged = bytearray(make([84, 71, 1, 0, 2, 5, 4, 3, 6, 10, 11, 12, 13, 14, 15, 16, 17,
+                              18, 19, 20, 21, 22, 23, 30, 31]))
+    damaged[0] = 0
+    good = record([4, 0, 8])
+    return bytes(damaged) + good.pack(), good
+
+
+def test_false_magic_inside_moves_is_skipped(tmp_path):
+    path = tmp_path / "games.log"
+    data, good = false_start_log(lambda moves: record(moves, size=15, win_length=5).pack())
+    path.write_bytes(data)
+    assert [fields(r) for r in records.read_records(str(path))] == [fields(good)]
+
+
+def test_false_magic_in_version_2_record_is_skipped(tmp_path):
+    def pack_v2(moves):
+        return records.HEADER.pack(records.MAGIC, 2, 1, 3, 15, 5, records.UNFINISHED,
+                                   len(moves), 1, 2, 2) + bytes(moves)
+    path = tmp_path / "games.log"
+    data, good = false_start_log(pack_v2)
+    path.write_bytes(data)
+    assert [fields(r) for r in records.read_records(str(path))] == [fields(good)]
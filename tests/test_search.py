@@ -0,0 +1,28 @@
+import engine
+import search
+
+
+def test_candidates_fall_back_to_free_cells():
+    # Маски соседей плоские: вокруг клетки верхнего слоя куба кандидатов нет
+    board = engine.Board(size=3, win_length=3, dims=3)
+    board.make(26, engine.X)
+    searcher = search.AlphaBeta(board, 0.5)
+    assert sorted(searcher.candidates()) == list(range(26))
+
+
+def test_unfinished_position_without_neighbors_is_not_a_loss():
+    board = engine.Board(size=15, win_length=5)
+    board.make(112, engine.X)
+    searcher = search.AlphaBeta(board, 0.5)
+    searcher.neighbors = [0] * board.geo.cells
+    score = searcher.negamax(1, 0, -search.WIN_SCORE - 1, search.WIN_SCORE + 1, engine.O)
+    assert abs(score) < search.WIN_SCORE
+
+
+def test_finds_immediate_win():
+    board = engine.Board(size=15, win_length=5)
+    for x, o in ((0, 30), (1, 31), (2, 32), (3, 33)):
+        board.make(x, engine.X)
+        board.make(o, engine.O)
+    move, score, _ = search.AlphaBeta(board, 0.5).run()
+    assert move == 4 and score == search.WIN_SCORE
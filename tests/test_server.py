@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import engine
+import server
+
+
+async def connect(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def send(**message):
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+    async def recv():
+        return json.loads(await asyncio.wait_for(reader.readline(), 5))
+
+    return send, recv, writer
+
+
+def run_session(scenario):
+    """
+    Запускает сервер на свободном порту и выполняет scenario(port, game_server).
+    """
+    async def main():
+        game_server = server.GameServer()
+        srv = await game_server.start("127.0.0.1", 0)
+        try:
+            return await scenario(srv.sockets[0].getsockname()[1], game_server)
+        finally:
+            srv.close()
+            await srv.wait_closed()
+    return asyncio.run(main())
+
+
+def test_oversized_variant_is_rejected():
+    async def scenario(port, game_server):
+        send, recv, writer = await connect(port)
+        replies = []
+        for message in ({"op": "queue", "size": 90, "win": 3},
+                        {"op": "ai", "level": "easy", "size": 60, "win": 5},
+                        {"op": "queue", "size": 5, "win": 3},
+                        {"op": "queue", "size": 5, "dims": 3}):
+            await send(**message)
+            replies.append(await recv())
+        writer.close()
+        return replies, dict(game_server.waiting)
+
+    replies, waiting = run_session(scenario)
+    assert all(reply == {"op": "error", "msg": "Недопустимый вариант поля"} for reply in replies)
+    assert not waiting
+    assert (90, 3, 2) not in engine._geometries
+
+
+def test_supported_variants_are_accepted():
+    for size, win in engine.VARIANTS:
+        assert server.GameServer.variant({"size": size, "win": win}) == (size, win, 2)
+    for size, win in engine.CUBE_VARIANTS:
+        assert server.GameServer.variant({"size": size, "win": win, "dims": 3}) == (size, win, 3)
+
+
+def test_move_validation():
+    async def scenario(port, game_server):
+        send, recv, writer = await connect(port)
+        await send(op="ai", level="easy")
+        start = await recv()
+        replies = []
+        for cell in (True, "4", 9, -1):
+            await send(op="move", cell=cell)
+            replies.append(await recv())
+        await send(op="move", cell=4)
+        moved = [await recv(), await recv()]
+        await send(op="move", cell=4)
+        replies.append(await recv())
+        writer.close()
+        return start, replies, moved
+
+    start, replies, moved = run_session(scenario)
+    assert start["op"] == "start" and start["you"] == engine.X
+    assert all(reply == {"op": "error", "msg": "Недопустимый ход"} for reply in replies)
+    assert moved[0] == {"op": "moved", "cell": 4, "player": engine.X}
+    assert moved[1]["player"] == engine.O and moved[1]["cell"] != 4
@@ -0,0 +1,102 @@
+import store
+
+
+def open_store(tmp_path, profile="tester"):
+    return store.Store(str(tmp_path / "games.db"), profile, flush_interval=0.01)
+
+
+def test_results_persist(tmp_path):
+    db = open_store(tmp_path)
+    db.add_result("ai", "hard", 3, 3, store.LOSS)
+    db.add_result("ai", "easy", 3, 3, store.WIN)
+    db.add_result("human", None, 3, 3, store.DRAW)
+    db.add_result("ai", "hard", 4, 4, store.WIN, dims=3)
+    assert db.totals("ai") == (2, 0, 1)
+    db.close()
+
+    db = open_store(tmp_path)
+    assert db.totals("ai") == (2, 0, 1)
+    assert db.totals() == (2, 1, 1)
+    assert db.summary[("ai", "hard", 4, 4, 3)] == [1, 0, 0]
+    db.close()
+
+
+def test_profiles_are_separate(tmp_path):
+    db = open_store(tmp_path, "first")
+    db.add_result("ai", "hard", 3, 3, store.WIN)
+    db.close()
+    db = open_store(tmp_path, "second")
+    assert db.totals() == (0, 0, 0)
+    db.close()
+
+
+def test_unfinished_game_is_resumed(tmp_path):
+    db = open_store(tmp_path)
+    assert db.saved_game is None
+    db.save_game("ai", "tuned", 0.7, 4, 4, [0, 21], 123.0, dims=3)
+    db.close()
+
+    db = open_store(tmp_path)
+    saved = db.saved_game
+    assert (saved.mode, saved.difficulty, saved.strength, saved.size, saved.win_length,
+            saved.moves, saved.started, saved.dims) == ("ai", "tuned", 0.7, 4, 4, bytes([0, 21]),
+                                                        123.0, 3)
+    db.clear_game()
+    db.close()
+
+    db = open_store(tmp_path)
+    assert db.saved_game is None
+    db.close()
+
+
+def test_last_saved_position_wins(tmp_path):
+    db = open_store(tmp_path)
+    for moves in ([4], [4, 0], [4, 0, 8]):
+        db.save_game("human", None, None, 3, 3, moves, 1.0)
+    db.close()
+    db = open_store(tmp_path)
+    assert db.saved_game.moves == bytes([4, 0, 8])
+    db.close()
+
+
+def test_unavailable_database(tmp_path):
+    assert store.open_store(str(tmp_path / "missing" / "games.db")) is None
+
+
+def test_failed_write_is_retried(tmp_path, monkeypatch, caplog):
+    import sqlite3
+    db = open_store(tmp_path)
+    original = store.Store._apply
+    failures = []
+
+    def flaky(self, *args):
+        if len(failures) < 2:
+            failures.append(1)
+            raise sqlite3.OperationalError("database is locked")
+        return original(self, *args)
+    monkeypatch.setattr(store.Store, "_apply", flaky)
+    db.add_result("ai", "hard", 3, 3, store.WIN)
+    db.save_game("human", None, None, 3, 3, [4], 1.0)
+    db.close()
+    assert len(failures) == 2
+    assert db.error is None
+    assert "запись не удалась" in caplog.text
+
+    db = open_store(tmp_path)
+    assert db.totals() == (1, 0, 0)
+    assert db.saved_game.moves == bytes([4])
+    db.close()
+
+
+def test_error_is_reported_when_writes_keep_failing(tmp_path, monkeypatch, caplog):
+    import sqlite3
+
+    def broken(self, *args):
+        raise sqlite3.OperationalError("disk I/O error")
+    db = open_store(tmp_path)
+    monkeypatch.setattr(store.Store, "_apply", broken)
+    db.add_result("ai", "hard", 3, 3, store.WIN)
+    db.close()
+    assert isinstance(db.error, sqlite3.OperationalError)
+    assert "не записаны при закрытии" in caplog.text
+    assert db._thread.is_alive() is False
@@ -0,0 +1,70 @@
+import math
+from types import SimpleNamespace
+
+import pytest
+
+import tournament
+
+
+def match(first, second, wins, draws, losses):
+    options = SimpleNamespace(games=100, min_games=10, confidence=0.95, resolution=50)
+    result = tournament.Match(first, second, options)
+    result.wins, result.draws, result.losses = wins, draws, losses
+    return result
+
+
+def test_elo_of_score():
+    assert tournament.elo_of(0.5) == 0.0
+    assert tournament.elo_of(0.75) == pytest.approx(400 * math.log10(3))
+    assert tournament.elo_of(0.25) == pytest.approx(-400 * math.log10(3))
+    assert math.isfinite(tournament.elo_of(1.0))
+
+
+def test_score_interval():
+    assert tournament.score_interval(0, 0, 0) == (0.5, 0.0, 1.0)
+    score, low, high = tournament.score_interval(60, 20, 20)
+    assert score == pytest.approx(0.7)
+    assert low < score < high
+    _, wide_low, wide_high = tournament.score_interval(6, 2, 2)
+    assert wide_high - wide_low > high - low
+
+
+def test_ratings_follow_scores():
+    players = ["hard", "medium", "easy"]
+    table = tournament.ratings(players, [match("hard", "medium", 30, 10, 0),
+                                         match("medium", "easy", 30, 5, 5),
+                                         match("hard", "easy", 38, 2, 0)], anchor="easy")
+    assert table["easy"][0] == 0.0
+    assert table["hard"][0] > table["medium"][0] > 0
+    assert all(margin > 0 for _, margin in table.values())
+
+
+def test_equal_players_get_equal_ratings():
+    table = tournament.ratings(["a", "b"], [match("a", "b", 10, 0, 10)])
+    assert table["a"][0] == pytest.approx(0.0, abs=1e-6)
+    assert table["b"][0] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_match_consumes_batches_in_order():
+    m = match("a", "b", 0, 0, 0)
+    m.options.games = 4 * tournament.BATCH_PAIRS
+    m.receive(1, (1, 0, 0))
+    assert m.games == 0  # Пачка 0 ещё не пришла
+    m.receive(0, (0, 1, 0))
+    assert (m.wins, m.draws, m.consumed) == (1, 1, 2)
+    assert m.finished
+
+
+def test_parse_player():
+    assert tournament.parse_player("hard") == ("hard", None)
+    assert tournament.parse_player("mine=python engine.py") == ("mine", "python engine.py")
+    with pytest.raises(ValueError):
+        tournament.parse_player("unknown")
+    with pytest.raises(ValueError):
+        tournament.parse_player("=cmd")
+
+
+def test_swiss_pairs_avoid_rematches():
+    points = {"a": 3, "b": 2, "c": 1, "d": 0}
+    pairs = tournament.swiss_pairs(list(points), points, {frozenset(("a", "b"))})
+    assert pairs == [("a", "c"), ("b", "d")]
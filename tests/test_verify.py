@@ -0,0 +1,7 @@
+import verify
+
+
+def test_all_positions_match_reference_minimax():
+    lines = []
+    failures = verify.run(workers=1, out=lines.append)
+    assert failures == 0, "\n".join(lines)
@@ -0,0 +1,472 @@
+"""
+Турнир уровней ИИ и версий движков с рейтингом Эло.
+
+Участник — уровень ИИ из ai.LEVELS или внешний движок по протоколу
+protocol.py в виде имя=команда (например, v2="./engine --fast"): так
+сравниваются версии движков между собой и со встроенными уровнями.
+
+Круговая система играет все пары, швейцарская (--swiss N) — N туров, в
+каждом участники с близкими очками играют с теми, с кем ещё не встречались.
+Матч — пары партий с одним зерном и сменой цветов, пачки пар играются на
+всех ядрах. Матч останавливается досрочно, когда доверительный интервал
+счёта исключает равенство или уже --resolution пунктов Эло.
+
+Рейтинги считаются методом максимального правдоподобия (модель Брэдли —
+Терри, ничья — пол-очка) по всем матчам, интервалы — по информации Фишера.
+Сыгранные матчи сохраняются в tournament.json: повторный запуск с теми же
+настройками играет только новые пары (--fresh — всё заново).
+
+Запуск:
+    python tournament.py easy medium hard mcts -n 200
+    python tournament.py hard v1="python old/protocol.py" v2="python protocol.py" --swiss 3
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import shlex
+import statistics
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import ai
+import engine
+import protocol
+import sharedcache
+import simulate
+
+DEFAULT_PLAYERS = ("easy", "medium", "hard", "mcts")
+DEFAULT_GAMES = 200  # Наибольшее число партий в матче
+MIN_GAMES = 20  # Раньше этого матч не останавливается
+BATCH_PAIRS = 5  # Пар партий (со сменой цветов) в одной задаче для процесса
+CONFIDENCE = 0.95
+RESOLUTION = 20.0  # Полуширина интервала, пункты Эло, при которой матч считается решённым
+ELO_SCALE = 400 / math.log(10)
+MLE_ITERATIONS = 10000
+MLE_TOLERANCE = 1e-9
+
+DEFAULT_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tournament.json")
+CACHE_VERSION = 1
+
+
+def parse_player(spec):
+    """
+    Разбирает участника: уровень ИИ или имя=команда внешнего движка.
+    :return: (имя, команда или None)
+    """
+    name, sep, command = spec.partition("=")
+    if sep:
+        if not name or not command:
+            raise ValueError(f"Ожидается имя=команда: {spec}")
+        return name, command
+    if spec not in ai.LEVELS:
+        raise ValueError(f"Неизвестный уровень ИИ: {spec}")
+    return spec, None
+
+
+def player_move(spec, board, rng, time_limit):
+    """
+    Ход участника или None, если внешний движок не дал допустимого хода.
+    """
+    name, command = parse_player(spec)
+    if command is None:
+        return simulate.level_move(name, board, rng, time_limit)
+    try:
+        return protocol.best_move(board, time_limit, command=shlex.split(command))
+    except protocol.EngineError:
+        return None
+
+
+def play_game(first, second, rng, size, win_length, time_limit):
+    """
+    Партия first (крестики) против second (нолики). Движок без допустимого
+    хода проигрывает.
+    :return: 'X', 'O' или None при ничьей
+    """
+    board = engine.Board(size=size, win_length=win_length)
+    players = {engine.X: first, engine.O: second}
+    player = engine.X
+    while True:
+        cell = player_move(players[player], board, rng, time_limit)
+        if cell is None:
+            return engine.opponent(player)
+        board.make(cell, player)
+        if board.wins_through(cell, player):
+            return player
+        if board.is_full():
+            return None
+        player = engine.opponent(player)
+
+
+def play_batch(task):
+    """
+    Играет пачку пар партий в процессе-обработчике. В паре оба участника
+    по разу играют крестиками с одним и тем же генератором.
+    :param task: (first, second, batch, seed, pairs, size, win_length, time_limit)
+    :return: (победы first, ничьи, поражения first)
+    """
+    first, second, batch, seed, pairs, size, win_length, time_limit = task
+    wins = draws = losses = 0
+    for pair in range(pairs):
+        for flipped in (False, True):
+            # Строковое зерно не зависит от PYTHONHASHSEED и порядка задач
+            rng = random.Random(f"{seed}:{first}:{second}:{batch}:{pair}")
+            if flipped:
+                winner = play_game(second, first, rng, size, win_length, time_limit)
+                first_mark = engine.O
+            else:
+                winner = play_game(first, second, rng, size, win_length, time_limit)
+                first_mark = engine.X
+            if winner is None:
+                draws += 1
+            elif winner == first_mark:
+                wins += 1
+            else:
+                losses += 1
+    return wins, draws, losses
+
+
+def elo_of(score):
+    """
+    Разница Эло, соответствующая доле очков score.
+    """
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -ELO_SCALE * math.log(1 / score - 1) + 0.0  # Без «-0» при равном счёте
+
+
+def z_value(confidence=CONFIDENCE):
+    return statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def score_interval(wins, draws, losses, confidence=CONFIDENCE):
+    """
+    Доля очков и её доверительный интервал по нормальному приближению.
+    :return: (доля, нижняя граница, верхняя граница)
+    """
+    games = wins + draws + losses
+    if not games:
+        return 0.5, 0.0, 1.0
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2
+                + losses * score ** 2) / games
+    margin = z_value(confidence) * math.sqrt(variance / games)
+    return score, max(score - margin, 0.0), min(score + margin, 1.0)
+
+
+class Match:
+    """
+    Матч двух участников: пачки пар партий и правило досрочной остановки.
+    Результаты пачек учитываются строго по порядку номеров, поэтому итог не
+    зависит от того, в каком порядке их вернули процессы.
+    """
+
+    def __init__(self, first, second, options):
+        self.first = first
+        self.second = second
+        self.options = options
+        self.wins = self.draws = self.losses = 0
+        self.submitted = 0  # Пачек отправлено на игру
+        self.consumed = 0  # Пачек учтено
+        self.results = {}  # Номер пачки -> результат, ещё не учтённый
+        self.finished = False
+        self.cached = False
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    @property
+    def max_batches(self):
+        return math.ceil(self.options.games / (2 * BATCH_PAIRS))
+
+    def key(self):
+        return cache_key(self.first, self.second, self.options)
+
+    def wants_batch(self):
+        return not self.finished and self.submitted < self.max_batches
+
+    def task(self):
+        task = (self.first, self.second, self.submitted, self.options.seed, BATCH_PAIRS,
+                self.options.size, self.options.win_length, self.options.time_limit)
+        self.submitted += 1
+        return task
+
+    def receive(self, batch, result):
+        self.results[batch] = result
+        while not self.finished and self.consumed in self.results:
+            w, d, l = self.results.pop(self.consumed)
+            self.wins += w
+            self.draws += d
+            self.losses += l
+            self.consumed += 1
+            self.finished = self.consumed >= self.max_batches or self.decided()
+
+    def decided(self):
+        """
+        Интервал исключает равенство или достаточно узок.
+        """
+        if self.games < self.options.min_games:
+            return False
+        _, low, high = score_interval(self.wins, self.draws, self.losses,
+                                      self.options.confidence)
+        if low > 0.5 or high < 0.5:
+            return True
+        return elo_of(high) - elo_of(low) <= 2 * self.options.resolution
+
+    def points(self, player):
+        if player == self.first:
+            return self.wins + 0.5 * self.draws
+        return self.losses + 0.5 * self.draws
+
+
+def cache_key(first, second, options):
+    return json.dumps([first, second, options.size, options.win_length, options.time_limit,
+                       options.games, options.seed, options.min_games, options.confidence,
+                       options.resolution])
+
+
+def load_cache(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("matches", {})
+
+
+def save_cache(path, matches):
+    data = {"version": CACHE_VERSION, "matches": matches}
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def play_matches(matches, pool=None, workers=1):
+    """
+    Доигрывает матчи: пачки всех матчей делят процессы пула, у остановленного
+    матча ещё не начатые пачки отменяются.
+    """
+    if pool is None:
+        for match in matches:
+            while match.wants_batch():
+                batch = match.submitted
+                match.receive(batch, play_batch(match.task()))
+        return
+    inflight = {}  # future -> (матч, номер пачки)
+    active = [match for match in matches if not match.finished]
+    while active or inflight:
+        added = True
+        while added and len(inflight) < 2 * workers:
+            added = False
+            for match in active:
+                if len(inflight) >= 2 * workers:
+                    break
+                if match.wants_batch():
+                    batch = match.submitted
+                    inflight[pool.submit(play_batch, match.task())] = (match, batch)
+                    added = True
+        if not inflight:
+            break
+        done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+        for future in done:
+            match, batch = inflight.pop(future)
+            match.receive(batch, future.result())
+            if match.finished:
+                for other, (owner, _) in list(inflight.items()):
+                    if owner is match and other.cancel():
+                        del inflight[other]
+        active = [match for match in active if not match.finished]
+
+
+def swiss_pairs(players, points, played):
+    """
+    Пары тура: по убыванию очков, каждый — с ближайшим, с кем ещё не играл.
+    Нечётный последний участник пропускает тур.
+    """
+    free = sorted(players, key=lambda p: -points[p])  # sorted устойчива: равные — по порядку ввода
+    pairs = []
+    while len(free) >= 2:
+        first = free.pop(0)
+        second = next((p for p in free if frozenset((first, p)) not in played), free[0])
+        free.remove(second)
+        pairs.append((first, second))
+    return pairs
+
+
+def ratings(players, matches, anchor=None, confidence=CONFIDENCE):
+    """
+    Рейтинги Эло по результатам матчей.
+    Каждой сыгранной паре добавляется одна виртуальная ничья, чтобы
+    рейтинг участника без поражений оставался конечным.
+    :param anchor: участник с рейтингом 0 (по умолчанию — средний рейтинг 0)
+    :return: словарь участник -> (Эло, полуширина интервала)
+    """
+    games = {p: {} for p in players}
+    score = dict.fromkeys(players, 0.0)
+    for match in matches:
+        a, b = match.first, match.second
+        n = match.games + 1
+        games[a][b] = games[a].get(b, 0) + n
+        games[b][a] = games[b].get(a, 0) + n
+        score[a] += match.points(a) + 0.5
+        score[b] += match.points(b) + 0.5
+    strength = dict.fromkeys(players, 1.0)
+    # Итерации Зермело (minorization-maximization) сходятся к оценке максимального правдоподобия
+    for _ in range(MLE_ITERATIONS):
+        change = 0.0
+        for p in players:
+            denominator = sum(n / (strength[p] + strength[q]) for q, n in games[p].items())
+            if denominator:
+                updated = score[p] / denominator
+                change = max(change, abs(math.log(updated / strength[p])))
+                strength[p] = updated
+        if change < MLE_TOLERANCE:
+            break
+    elo = {p: ELO_SCALE * math.log(strength[p]) for p in players}
+    shift = elo[anchor] if anchor is not None else sum(elo.values()) / len(players)
+    z = z_value(confidence)
+    result = {}
+    for p in players:
+        information = sum(n * strength[p] * strength[q] / (strength[p] + strength[q]) ** 2
+                          for q, n in games[p].items())
+        margin = z * ELO_SCALE / math.sqrt(information) if information else math.inf
+        result[p] = (elo[p] - shift, margin)
+    return result
+
+
+def run(players, options, workers=None, cache_path=DEFAULT_CACHE, fresh=False, out=print):
+    """
+    Проводит турнир.
+    :param players: участники (уровни или имя=команда)
+    :param options: argparse.Namespace с настройками матчей (games, min_games, confidence,
+                    resolution, size, win_length, time_limit, seed, swiss, anchor,
+                    shared_cache)
+    :return: (матчи, рейтинги по участникам)
+    """
+    names = {}  # Имя -> участник
+    for spec in players:
+        name, _ = parse_player(spec)
+        if name in names:
+            raise ValueError(f"Участник {name} указан дважды")
+        names[name] = spec
+    if len(names) < 2:
+        raise ValueError("Нужно хотя бы два участника")
+    if options.anchor is not None and options.anchor not in names:
+        raise ValueError(f"--anchor {options.anchor}: нет такого участника")
+    anchor = names.get(options.anchor)
+    cache = {} if fresh or not cache_path else load_cache(cache_path)
+    pool = None
+    shared = None
+    if workers != 1:
+        workers = workers or os.cpu_count() or 1
+        if options.shared_cache and not engine.geometry(options.size,
+                                                        options.win_length).is_classic:
+            shared = sharedcache.create(options.shared_cache)
+        pool = ProcessPoolExecutor(max_workers=workers,
+                                   initializer=sharedcache.attach if shared else None,
+                                   initargs=(shared,) if shared else ())
+    finished = []
+    played = set()
+    points = dict.fromkeys(players, 0.0)
+    rounds = options.swiss or 1
+    try:
+        for number in range(rounds):
+            if options.swiss:
+                pairs = swiss_pairs(players, points, played)
+            else:
+                pairs = [(a, b) for i, a in enumerate(players) for b in players[i + 1:]]
+            matches = []
+            for a, b in pairs:
+                # Ключ кэша не зависит от порядка участников в паре
+                first, second = sorted((a, b))
+                match = Match(first, second, options)
+                stored = cache.get(match.key())
+                if stored is not None:
+                    match.wins, match.draws, match.losses = stored
+                    match.finished = match.cached = True
+                matches.append(match)
+            started = time.perf_counter()
+            play_matches(matches, pool, workers or 1)
+            for match in matches:
+                cache[match.key()] = [match.wins, match.draws, match.losses]
+                played.add(frozenset((match.first, match.second)))
+                points[match.first] += match.points(match.first)
+                points[match.second] += match.points(match.second)
+            finished.extend(matches)
+            if cache_path:
+                save_cache(cache_path, cache)
+            if options.swiss:
+                out(f"Тур {number + 1}: матчей {len(matches)}, "
+                    f"{time.perf_counter() - started:.1f} с")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if shared is not None:
+            sharedcache.release()
+    return finished, ratings(players, finished, anchor, options.confidence)
+
+
+def report(players, matches, table, confidence=CONFIDENCE, out=print):
+    def name(spec):
+        return parse_player(spec)[0]
+
+    out("Матчи (счёт первого участника):")
+    for match in matches:
+        score, low, high = score_interval(match.wins, match.draws, match.losses, confidence)
+        note = " (кэш)" if match.cached else ""
+        out(f"  {name(match.first)} — {name(match.second)}: +{match.wins} ={match.draws} -{match.losses}, "
+            f"Эло {elo_of(score):+.0f} [{elo_of(low):+.0f}; {elo_of(high):+.0f}]{note}")
+    out(f"Рейтинг (интервал {confidence:.0%}):")
+    games = dict.fromkeys(players, 0)
+    for match in matches:
+        games[match.first] += match.games
+        games[match.second] += match.games
+    ranked = sorted(players, key=lambda p: -table[p][0])
+    for place, player in enumerate(ranked, 1):
+        elo, margin = table[player]
+        out(f"  {place}. {name(player):<12} {elo:+7.0f} ± {margin:.0f}  партий {games[player]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Турнир уровней ИИ и движков с рейтингом Эло")
+    parser.add_argument("players", nargs="*", default=list(DEFAULT_PLAYERS),
+                        help="уровни ИИ или имя=команда внешнего движка")
+    parser.add_argument("-n", "--games", type=int, default=DEFAULT_GAMES,
+                        help="наибольшее число партий в матче")
+    parser.add_argument("--min-games", type=int, default=MIN_GAMES,
+                        help="партий до первой проверки досрочной остановки")
+    parser.add_argument("--confidence", type=float, default=CONFIDENCE,
+                        help="уровень доверия интервалов")
+    parser.add_argument("--resolution", type=float, default=RESOLUTION,
+                        help="полуширина интервала Эло, при которой матч считается решённым")
+    parser.add_argument("--swiss", type=int, default=0, metavar="ROUNDS",
+                        help="швейцарская система на ROUNDS туров вместо круговой")
+    parser.add_argument("--anchor", default=None, help="участник с рейтингом 0")
+    parser.add_argument("--seed", type=int, default=0, help="зерно генератора случайных чисел")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="число процессов (по умолчанию — все ядра)")
+    parser.add_argument("--size", type=int, default=3, help="размер поля")
+    parser.add_argument("--win", dest="win_length", type=int, default=None,
+                        help="длина линии для победы")
+    parser.add_argument("--time-limit", type=float, default=ai.AI_TIME_LIMIT,
+                        help="бюджет на ход для поиска и движков, секунды")
+    parser.add_argument("--shared-cache", type=int, default=sharedcache.DEFAULT_SIZE_MB,
+                        metavar="MB", help="общая таблица позиций процессов, МБ (0 — отключить)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="файл сыгранных матчей")
+    parser.add_argument("--fresh", action="store_true", help="не брать матчи из кэша")
+    args = parser.parse_args(argv)
+    args.win_length = args.win_length or args.size
+    try:
+        matches, table = run(args.players, args, args.workers, args.cache, args.fresh)
+    except ValueError as error:
+        parser.error(str(error))
+    report(args.players, matches, table, args.confidence)
+
+
+if __name__ == "__main__":
+    main()
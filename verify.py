@@ -0,0 +1,425 @@
+"""
+Полная сверка ИИ и проверок победы на всех позициях 3×3.
+
+Обходит все 5478 позиций, достижимых в партии, и сравнивает каждую
+ускоренную реализацию с эталоном — простым минимаксом по списку клеток
+без битовых масок, симметрий и кэшей:
+    engine   — битовая доска: победитель, выигрышная линия, свободные клетки;
+    windows  — check_winner, is_board_full и minimax обоих окон;
+    solver   — значение позиции и оценки ходов (с холодным и тёплым кэшем);
+    book     — ход из book.bin оптимален;
+    ai       — ходы hard и среднего уровня (выигрыш/блокировка), анализ;
+    batch    — пакетная оценка на NumPy (если numpy установлен);
+    parallel — альфа-бета search.py в пуле процессов с общей таблицей позиций.
+Отдельно проверяется, что hard не проигрывает ни крестиками, ни ноликами
+против любых ходов соперника.
+
+Значение позиции — в шкале solver.evaluate: для ходящего, выигрыш через
+n полуходов — 10 - n, ничья — 0. Проверка занимает секунды, поэтому её
+удобно запускать после каждой оптимизации; код возврата 1 — расхождения.
+
+Запуск:
+    python verify.py                  # все проверки
+    python verify.py --only solver,book --workers 1
+    python verify.py --full           # minimax окон на всех позициях (медленно)
+    python -m pytest tests            # вместе с остальными тестами (tests/test_verify.py)
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ai
+import analysis
+import book
+import engine
+import main
+import main_DeepSeek
+import search
+import sharedcache
+import solver
+from bench import headless
+
+try:
+    import batch
+except ImportError:  # Пакетная оценка требует numpy
+    batch = None
+
+POSITIONS = 5478  # Достижимых позиций 3×3, включая пустую и конечные
+WIN_SCORE = 10
+# Выигрышные линии эталона, выписанные вручную
+LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8),
+         (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6))
+MINIMAX_PIECES = 3  # minimax окон проверяется на позициях не меньше чем с этим числом фигур
+MAX_ERRORS = 20  # Сколько расхождений печатать на проверку
+CHUNK_SIZE = 250  # Позиций в задаче для процесса
+
+_values = {}  # Эталон: позиция -> значение для ходящего
+
+
+# Эталон: позиция — кортеж из 9 клеток None, 'X' или 'O'
+
+def to_move(cells):
+    return "X" if cells.count("X") == cells.count("O") else "O"
+
+
+def lines_of(cells, player):
+    """
+    Все целые линии игрока.
+    """
+    return [line for line in LINES if all(cells[k] == player for k in line)]
+
+
+def free_cells(cells):
+    return [k for k in range(9) if cells[k] is None]
+
+
+def play(cells, k, player):
+    return cells[:k] + (player,) + cells[k + 1:]
+
+
+def is_terminal(cells):
+    return bool(lines_of(cells, "X") or lines_of(cells, "O")) or None not in cells
+
+
+def value(cells):
+    """
+    Значение позиции для ходящего при идеальной игре обеих сторон.
+    """
+    result = _values.get(cells)
+    if result is None:
+        player = to_move(cells)
+        if lines_of(cells, "O" if player == "X" else "X"):
+            result = -WIN_SCORE
+        elif None not in cells:
+            result = 0
+        else:
+            result = max(move_scores(cells).values())
+        _values[cells] = result
+    return result
+
+
+def move_scores(cells):
+    """
+    Оценки ходов ходящего: значение после хода со сдвигом на полуход к нулю.
+    """
+    player = to_move(cells)
+    scores = {}
+    for k in free_cells(cells):
+        score = -value(play(cells, k, player))
+        scores[k] = score - 1 if score > 0 else score + 1 if score < 0 else 0
+    return scores
+
+
+def positions():
+    """
+    Все достижимые позиции в порядке обхода в ширину (от пустой доски).
+    """
+    empty = (None,) * 9
+    order = [empty]
+    seen = {empty}
+    for cells in order:
+        if is_terminal(cells):
+            continue
+        player = to_move(cells)
+        for k in free_cells(cells):
+            child = play(cells, k, player)
+            if child not in seen:
+                seen.add(child)
+                order.append(child)
+    return order
+
+
+def to_board(cells):
+    x = sum(1 << k for k in range(9) if cells[k] == "X")
+    o = sum(1 << k for k in range(9) if cells[k] == "O")
+    return engine.Board(x, o)
+
+
+def optimal(cells, move):
+    """
+    Ход допустим и ведёт к тому же исходу, что и лучший (победа, ничья, поражение).
+    """
+    scores = move_scores(cells)
+    if move not in scores:
+        return False
+    best = max(scores.values())
+    return (scores[move] > 0) - (scores[move] < 0) == (best > 0) - (best < 0)
+
+
+# Проверки одной позиции: возвращают список описаний расхождений
+
+def check_engine(cells):
+    board = to_board(cells)
+    errors = []
+    if list(board.legal_moves()) != free_cells(cells):
+        errors.append(f"legal_moves {list(board.legal_moves())}")
+    if board.to_move != to_move(cells):
+        errors.append(f"to_move {board.to_move}")
+    for player in engine.PLAYERS:
+        lines = lines_of(cells, player)
+        if board.is_win(player) != bool(lines):
+            errors.append(f"is_win({player}) {board.is_win(player)}")
+        line = board.winning_line(player)
+        found = tuple(board.cell_of(row, col) for row, col in line) if line else None
+        if (found is None) != (not lines) or found is not None and found not in lines:
+            errors.append(f"winning_line({player}) {line}")
+    winner = board.winner()
+    expected = "X" if lines_of(cells, "X") else "O" if lines_of(cells, "O") else None
+    if winner != expected:
+        errors.append(f"winner {winner}")
+    if board.is_full() != (None not in cells) or board.is_terminal() != is_terminal(cells):
+        errors.append("is_full/is_terminal")
+    for k in range(9):
+        if cells[k] is not None and board.wins_through(k, cells[k]) != any(
+                k in line for line in lines_of(cells, cells[k])):
+            errors.append(f"wins_through({k})")
+    return errors
+
+
+def check_windows(cells, minimax=True):
+    board = to_board(cells)
+    errors = []
+    for cls in (main.TicTacToe, main_DeepSeek.TicTacToe):
+        game = headless(cls, board)
+        for player in engine.PLAYERS:
+            if game.check_winner(player) != bool(lines_of(cells, player)):
+                errors.append(f"{cls.__module__}.check_winner({player})")
+    game = headless(main_DeepSeek.TicTacToe, board)
+    if game.is_board_full() != (None not in cells):
+        errors.append("is_board_full")
+    if minimax:
+        # minimax окна считает за нолики: 10 - глубина при их победе
+        player = to_move(cells)
+        expected = value(cells) if player == "O" else -value(cells)
+        score = game.minimax(0, player == "O")
+        if score != expected:
+            errors.append(f"minimax {score} != {expected}")
+    return errors
+
+
+def check_solver(cells):
+    board = to_board(cells)
+    errors = []
+    if solver.evaluate(board) != value(cells):
+        errors.append(f"evaluate {solver.evaluate(board)} != {value(cells)}")
+    if solver.move_scores(board) != move_scores(cells):
+        errors.append(f"move_scores {solver.move_scores(board)}")
+    move = solver.best_move(board)
+    if is_terminal(cells) != (move is None) or move is not None and (
+            move_scores(cells)[move] != value(cells)):
+        errors.append(f"best_move {move}")
+    return errors
+
+
+def check_book(cells):
+    move = book.lookup(to_board(cells))
+    if is_terminal(cells):
+        return [] if move is None else [f"ход {move} в конечной позиции"]
+    return [] if move is not None and optimal(cells, move) else [f"lookup {move}"]
+
+
+def check_ai(cells):
+    if is_terminal(cells):
+        return []
+    board = to_board(cells)
+    errors = []
+    move = ai.hard_move(board)
+    if not optimal(cells, move):
+        errors.append(f"hard_move {move}")
+    for cls in (main.TicTacToe, main_DeepSeek.TicTacToe):
+        game = headless(cls, board)
+        if cls is main.TicTacToe:
+            found = game.find_best_move(board)
+            move = board.cell_of(*found) if found else None
+        else:
+            move = game.hard_ai_move(board)
+        if not optimal(cells, move):
+            errors.append(f"{cls.__module__} hard {move}")
+    # Средний уровень: выигрывает, если может, иначе блокирует линию соперника
+    player = to_move(cells)
+    other = "O" if player == "X" else "X"
+    move = ai.winning_or_blocking_move(board)
+    free = free_cells(cells)
+    wins = [k for k in free if lines_of(play(cells, k, player), player)]
+    blocks = [k for k in free if lines_of(play(cells, k, other), other)]
+    expected = wins or blocks
+    if move not in (expected or [None]):
+        errors.append(f"winning_or_blocking_move {move}, ожидался один из {expected}")
+    if analysis.analyzer.move_scores(board) != move_scores(cells):
+        errors.append("analysis.move_scores")
+    return errors
+
+
+def check_search(cells):
+    """
+    Альфа-бета search.py без ограничения времени: исход и ход оптимальны.
+    """
+    if is_terminal(cells):
+        return []
+    best, score, _ = search.AlphaBeta(to_board(cells), time_limit=60).run()
+    expected = value(cells)
+    errors = []
+    if (score > 0) - (score < 0) != (expected > 0) - (expected < 0):
+        errors.append(f"alphabeta оценка {score}, эталон {expected}")
+    if not optimal(cells, best):
+        errors.append(f"alphabeta ход {best}")
+    return errors
+
+
+def search_chunk(chunk):
+    """
+    Проверка альфа-бета поиска на пачке позиций в процессе-обработчике.
+    :return: список (позиция, описание)
+    """
+    return [(cells, error) for cells in chunk for error in check_search(cells)]
+
+
+def check_batch(order):
+    """
+    Пакетная оценка всех позиций сразу.
+    :return: список (позиция, описание)
+    """
+    codes = {None: batch.EMPTY, "X": batch.X_CELL, "O": batch.O_CELL}
+    boards = batch.np.array([[codes[c] for c in cells] for cells in order], dtype=batch.np.int8)
+    result = batch.evaluate(boards)
+    errors = []
+    for i, cells in enumerate(order):
+        expected = "X" if lines_of(cells, "X") else "O" if lines_of(cells, "O") else None
+        winner = {batch.NO_WINNER: None, batch.X_CELL: "X", batch.O_CELL: "O"}[int(result["winner"][i])]
+        if winner != expected:
+            errors.append((cells, f"winner {winner}"))
+        if bool(result["terminal"][i]) != is_terminal(cells):
+            errors.append((cells, "terminal"))
+        if [k for k in range(9) if result["legal"][i][k]] != free_cells(cells):
+            errors.append((cells, "legal"))
+        # Значение пакета — с точки зрения крестиков
+        expected = value(cells) if to_move(cells) == "X" else -value(cells)
+        if int(result["value"][i]) != expected:
+            errors.append((cells, f"value {int(result['value'][i])} != {expected}"))
+    return errors
+
+
+def check_parallel(order, workers=None, shared_cache=sharedcache.DEFAULT_SIZE_MB):
+    """
+    Альфа-бета поиск всех позиций на пуле процессов с общей таблицей позиций.
+    :return: список (позиция, описание)
+    """
+    chunks = [order[i:i + CHUNK_SIZE] for i in range(0, len(order), CHUNK_SIZE)]
+    if workers == 1:
+        return [error for chunk in chunks for error in search_chunk(chunk)]
+    shared = sharedcache.create(shared_cache) if shared_cache else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=sharedcache.attach if shared else None,
+                                 initargs=(shared,) if shared else ()) as pool:
+            return [error for result in pool.map(search_chunk, chunks) for error in result]
+    finally:
+        if shared is not None:
+            sharedcache.release()
+
+
+def hard_never_loses():
+    """
+    Партии hard против всех возможных ходов соперника, hard за обе стороны.
+    :return: список (позиция, описание) для проигранных партий
+    """
+    errors = []
+    for side in engine.PLAYERS:
+        stack = [(None,) * 9]
+        while stack:
+            cells = stack.pop()
+            if lines_of(cells, side):
+                continue
+            if lines_of(cells, "O" if side == "X" else "X"):
+                errors.append((cells, f"hard проиграл за {side}"))
+                continue
+            if None not in cells:
+                continue
+            player = to_move(cells)
+            if player == side:
+                stack.append(play(cells, ai.hard_move(to_board(cells)), player))
+            else:
+                stack.extend(play(cells, k, player) for k in free_cells(cells))
+    return errors
+
+
+def report(name, errors, started, out=print):
+    status = "ok" if not errors else f"{len(errors)} расхождений"
+    out(f"{name:10} {status:>20}   {time.perf_counter() - started:6.2f} с")
+    for cells, error in errors[:MAX_ERRORS]:
+        board = "".join(c or "." for c in cells)
+        out(f"    {board[:3]}/{board[3:6]}/{board[6:]}: {error}")
+
+
+def run(checks=None, workers=None, full=False, out=print):
+    """
+    Запускает проверки.
+    :param checks: имена проверок или None — все
+    :param workers: процессы для проверки parallel (1 — в этом процессе)
+    :param full: minimax окон на всех позициях, а не только с MINIMAX_PIECES фигур
+    :return: число расхождений
+    """
+    started = time.perf_counter()
+    order = positions()
+    for cells in order:
+        value(cells)
+    failures = 0 if len(order) == POSITIONS else 1
+    out(f"Эталон: {len(order)} позиций за {time.perf_counter() - started:.2f} с")
+    if failures:
+        out(f"Ожидалось {POSITIONS} позиций")
+
+    def per_position(check):
+        return lambda: [(cells, error) for cells in order for error in check(cells)]
+
+    def cold_then_warm():
+        solver.clear_cache()
+        cold = per_position(check_solver)()
+        return cold + per_position(check_solver)()
+
+    def windows():
+        return per_position(lambda cells: check_windows(
+            cells, full or 9 - cells.count(None) >= MINIMAX_PIECES))()
+
+    suite = [
+        ("engine", per_position(check_engine)),
+        ("windows", windows),
+        ("solver", cold_then_warm),
+        ("book", per_position(check_book) if book.load() else None),
+        ("ai", per_position(check_ai)),
+        ("hard", hard_never_loses),
+        ("batch", (lambda: check_batch(order)) if batch is not None else None),
+        ("parallel", lambda: check_parallel(order, workers)),
+    ]
+    for name, check in suite:
+        if checks and name not in checks:
+            continue
+        if check is None:
+            out(f"{name:10} {'пропущено':>20}")
+            continue
+        started = time.perf_counter()
+        errors = check()
+        failures += len(errors)
+        report(name, errors, started, out)
+    return failures
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Сверка ИИ с эталонным минимаксом на всех позициях 3×3")
+    parser.add_argument("--only", default="", help="проверки через запятую (engine,windows,solver,"
+                                                   "book,ai,hard,batch,parallel)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="процессы для проверки parallel (по умолчанию — все ядра)")
+    parser.add_argument("--full", action="store_true", help="minimax окон на всех позициях")
+    args = parser.parse_args(argv)
+    checks = [name for name in args.only.split(",") if name]
+    failures = run(checks, args.workers, args.full)
+    print("Расхождений нет" if not failures else f"Всего расхождений: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
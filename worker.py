@@ -0,0 +1,80 @@
+"""
+Фоновый поиск хода компьютера вне главного потока tkinter.
+
+Окно отправляет задачу в AIWorker и опрашивает результат через root.after,
+поэтому интерфейс не замирает, пока ИИ думает. Каждая задача получает
+CancelToken: отменённая задача пропускается, а уже идущий поиск прерывается
+при следующей проверке токена и его результат отбрасывается.
+"""
+
+import queue
+import threading
+
+
+class CancelToken:
+    """
+    Флаг отмены одной задачи поиска.
+    """
+    __slots__ = ("_event",)
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class AIWorker:
+    """
+    Один фоновый поток, выполняющий задачи поиска по очереди.
+    Результаты кладутся в потокобезопасную очередь и забираются методом poll
+    из главного потока.
+    """
+
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="ai-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Ставит задачу в очередь. func вызывается как func(*args, cancel=token, **kwargs).
+        :return: CancelToken задачи
+        """
+        token = CancelToken()
+        self._jobs.put((token, func, args, kwargs))
+        return token
+
+    def poll(self, token):
+        """
+        Забирает готовый результат задачи, не блокируя поток.
+        Результаты других (отменённых) задач отбрасываются.
+        :return: (True, результат) или (False, None), если результата ещё нет
+        """
+        while True:
+            try:
+                done_token, result, error = self._results.get_nowait()
+            except queue.Empty:
+                return False, None
+            if done_token is token:
+                if error is not None:
+                    raise error
+                return True, result
+
+    def _run(self):
+        while True:
+            token, func, args, kwargs = self._jobs.get()
+            if token.cancelled:
+                continue
+            result = error = None
+            try:
+                result = func(*args, cancel=token, **kwargs)
+            except Exception as exc:  # Ошибка передаётся в главный поток через poll
+                error = exc
+            if not token.cancelled:
+                self._results.put((token, result, error))